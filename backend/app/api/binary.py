@@ -0,0 +1,144 @@
+"""
+二进制响应（Arrow IPC / 原始 float64 数组）
+直接使用内存中的列式数组，客户端（pandas/numpy）无需解析JSON
+
+原始格式（application/octet-stream）按列连续存放，行数见 X-Rows，列顺序见 X-Columns：
+    date  : int64 小端，自1970-01-01起的天数
+    其他列: float64 小端，空值为 NaN
+
+Python 读取示例:
+    n = int(r.headers["X-Rows"]); names = r.headers["X-Columns"].split(",")
+    dates = np.frombuffer(r.content, dtype="<i8", count=n).astype("datetime64[D]")
+    values = np.frombuffer(r.content, dtype="<f8").reshape(len(names), n)[1:]  # 对应 names[1:]
+"""
+from typing import Dict, Iterator
+import json
+
+import numpy as np
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from ..services.columnar import ColumnarTable
+from .conditional import Validators
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+BINARY_MEDIA_TYPE = "application/octet-stream"
+
+
+def _iter_buffers(table: ColumnarTable) -> Iterator[memoryview]:
+    """逐列输出底层内存（小端连续数组无需复制）"""
+    # cast('B')：按字节计长度（与 Content-Length 一致）
+    yield memoryview(np.ascontiguousarray(table.dates.view('<i8'))).cast('B')
+    for values in table.columns.values():
+        yield memoryview(np.ascontiguousarray(values, dtype='<f8')).cast('B')
+
+
+def binary_response(header: Dict, table: ColumnarTable, validators: Validators) -> StreamingResponse:
+    """
+    构造原始 float64 数组响应（统计指标请通过 /metrics 接口获取）
+
+    Args:
+        header: 导出头信息
+        table: 列式数据表
+        validators: 缓存校验信息
+
+    Returns:
+        StreamingResponse
+    """
+    names = ["date", *table.columns]
+    response = StreamingResponse(
+        _iter_buffers(table),
+        media_type=BINARY_MEDIA_TYPE,
+        headers={
+            "Content-Length": str(len(table) * 8 * len(names)),
+            "X-Indicator-Id": header["indicator_id"],
+            "X-Columns": ",".join(names),
+            "X-Rows": str(len(table)),
+        },
+    )
+    validators.apply(response)
+    return response
+
+
+# Arrow 流中每个 record batch 的行数（按批写出，不在内存中拼出整个流）
+ARROW_BATCH_ROWS = 8192
+
+
+class _ChunkSink:
+    """收集 Arrow IPC 写入器的输出，每写完一批取出一次"""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_batch(pa, schema, table: ColumnarTable):
+    """
+    把列式表包装为 Arrow record batch
+
+    float64 列直接引用 numpy（或共享内存映射）的数据缓冲区，不复制；NaN 通过有效位图标记为 null。
+    date32 为32位天数，日期列需要转换一次（每行4字节）。
+    """
+    n = len(table)
+    arrays = [pa.Array.from_buffers(pa.date32(), n, [None, pa.py_buffer(table.dates.view('<i8').astype('<i4'))])]
+    for values in table.columns.values():
+        values = np.ascontiguousarray(values, dtype='<f8')
+        valid = ~np.isnan(values)
+        null_count = n - int(np.count_nonzero(valid))
+        bitmap = pa.py_buffer(np.packbits(valid, bitorder='little')) if null_count else None
+        arrays.append(pa.Array.from_buffers(pa.float64(), n, [bitmap, pa.py_buffer(values)], null_count=null_count))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _iter_arrow_stream(pa, schema, table: ColumnarTable) -> Iterator[bytes]:
+    """逐批输出 Arrow IPC 流（schema、每个 record batch、结束标记）"""
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(pa.PythonFile(sink, mode='w'), schema) as writer:
+        for lo in range(0, len(table), ARROW_BATCH_ROWS):
+            writer.write_batch(_arrow_batch(pa, schema, table.take(lo, lo + ARROW_BATCH_ROWS)))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def arrow_response(header: Dict, table: ColumnarTable, validators: Validators) -> StreamingResponse:
+    """
+    构造 Arrow IPC 流响应，头信息（指标名称、统计指标等）写在 schema 元数据的 indicator 键中
+
+    需要安装 pyarrow，未安装时返回406
+
+    Args:
+        header: 导出头信息
+        table: 列式数据表
+        validators: 缓存校验信息
+
+    Returns:
+        StreamingResponse
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(status_code=406, detail="服务器未安装pyarrow，请使用 format=binary")
+
+    schema = pa.schema(
+        [pa.field("date", pa.date32())] + [pa.field(name, pa.float64()) for name in table.columns],
+        metadata={"indicator": json.dumps(header, ensure_ascii=False)},
+    )
+    response = StreamingResponse(_iter_arrow_stream(pa, schema, table), media_type=ARROW_MEDIA_TYPE)
+    validators.apply(response)
+    return response
@@ -1,10 +1,14 @@
 """
 BOCIASI模块API路由
 """
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from typing import Optional
-from ..models.indicators import IndicatorData, IndicatorMetrics, IndicatorInfo
+from ..models.indicators import IndicatorData, IndicatorMetrics, IndicatorInfo, PercentileHistory, IndicatorBatch
 from ..services.bociasi_service import bociasi_service
+from .conditional import build_validators, check_conditional
+from .streaming import ndjson_response
+from .binary import arrow_response, binary_response
+from .params import check_date_range
 
 router = APIRouter(prefix="/bociasi", tags=["bociasi"])
 
@@ -20,11 +24,56 @@ async def get_indicators():
     return bociasi_service.get_indicators()
 
 
+@router.get("/data", response_model=IndicatorBatch)
+async def get_batch_data(
+    request: Request,
+    response: Response,
+    ids: Optional[str] = Query(None, description="逗号分隔的指标ID，为空时返回全部子指标"),
+    start_date: Optional[str] = Query(None, description="开始日期，格式：YYYY-MM-DD"),
+    end_date: Optional[str] = Query(None, description="结束日期，格式：YYYY-MM-DD")
+):
+    """
+    批量获取多个子指标的数据和统计指标
+    
+    所有子指标共享同一张底表和日期轴，每个子指标只返回 value 取自的列和统计指标，
+    前端按 value_column 还原各子指标的时间序列
+    
+    Args:
+        ids: 指标ID列表，如 slow_line,fast_line,rsi
+        start_date: 开始日期（可选）
+        end_date: 结束日期（可选）
+        
+    Returns:
+        批量指标数据
+    """
+    indicator_ids = [i.strip() for i in ids.split(",") if i.strip()] if ids else []
+    check_date_range(start_date, end_date)
+    validators = build_validators(
+        bociasi_service.get_generation(), "bociasi", "batch", ",".join(indicator_ids), start_date, end_date
+    )
+    not_modified = check_conditional(request, response, validators)
+    if not_modified:
+        return not_modified
+    
+    try:
+        return await bociasi_service.fetch_batch(indicator_ids, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取批量数据失败: {str(e)}")
+
+
 @router.get("/{indicator_id}/data", response_model=IndicatorData)
 async def get_indicator_data(
+    request: Request,
+    response: Response,
     indicator_id: str,
     start_date: Optional[str] = Query(None, description="开始日期，格式：YYYY-MM-DD"),
-    end_date: Optional[str] = Query(None, description="结束日期，格式：YYYY-MM-DD")
+    end_date: Optional[str] = Query(None, description="结束日期，格式：YYYY-MM-DD"),
+    format: str = Query(
+        "json", pattern="^(json|ndjson|arrow|binary)$",
+        description="响应格式：json、ndjson（流式导出）、arrow（Arrow IPC流）或 binary（原始float64数组）"
+    )
 ):
     """
     获取指定指标的时间序列数据
@@ -33,17 +82,39 @@ async def get_indicator_data(
         indicator_id: 指标ID
         start_date: 开始日期（可选）
         end_date: 结束日期（可选）
+        format: ndjson 时流式返回：第一行为指标信息和统计指标，之后每行一个数据点；
+            arrow / binary 时返回列式二进制数据（格式说明见 binary.py）
         
     Returns:
         指标数据
     """
+    check_date_range(start_date, end_date)
+    validators = build_validators(
+        bociasi_service.get_generation(), "bociasi", "data", indicator_id, start_date, end_date, format
+    )
+    not_modified = check_conditional(request, response, validators)
+    if not_modified:
+        return not_modified
+    
     try:
+        if format == "ndjson":
+            header, rows = await bociasi_service.fetch_indicator_stream(indicator_id, start_date, end_date)
+            return ndjson_response(header, rows, validators)
+        
+        if format in ("arrow", "binary"):
+            header, table = await bociasi_service.fetch_indicator_columns(indicator_id, start_date, end_date)
+            if format == "arrow":
+                return arrow_response(header, table, validators)
+            return binary_response(header, table, validators)
+        
         data = await bociasi_service.fetch_indicator_data(
             indicator_id=indicator_id,
             start_date=start_date,
             end_date=end_date
         )
         return data
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -51,7 +122,7 @@ async def get_indicator_data(
 
 
 @router.get("/{indicator_id}/metrics", response_model=IndicatorMetrics)
-async def get_indicator_metrics(indicator_id: str):
+async def get_indicator_metrics(request: Request, response: Response, indicator_id: str):
     """
     获取指定指标的统计指标
     
@@ -61,6 +132,11 @@ async def get_indicator_metrics(indicator_id: str):
     Returns:
         统计指标
     """
+    validators = build_validators(bociasi_service.get_generation(), "bociasi", "metrics", indicator_id)
+    not_modified = check_conditional(request, response, validators)
+    if not_modified:
+        return not_modified
+    
     try:
         metrics = await bociasi_service.fetch_indicator_metrics(indicator_id)
         return metrics
@@ -68,3 +144,38 @@ async def get_indicator_metrics(indicator_id: str):
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取统计指标失败: {str(e)}")
+
+
+@router.get("/{indicator_id}/percentile_history", response_model=PercentileHistory)
+async def get_percentile_history(
+    request: Request,
+    response: Response,
+    indicator_id: str,
+    start_date: Optional[str] = Query(None, description="开始日期，格式：YYYY-MM-DD"),
+    end_date: Optional[str] = Query(None, description="结束日期，格式：YYYY-MM-DD")
+):
+    """
+    获取指定指标滚动5年分位数的历史走势
+    
+    Args:
+        indicator_id: 指标ID
+        start_date: 开始日期（可选）
+        end_date: 结束日期（可选）
+        
+    Returns:
+        分位数历史
+    """
+    check_date_range(start_date, end_date)
+    validators = build_validators(
+        bociasi_service.get_generation(), "bociasi", "percentile_history", indicator_id, start_date, end_date
+    )
+    not_modified = check_conditional(request, response, validators)
+    if not_modified:
+        return not_modified
+    
+    try:
+        return await bociasi_service.fetch_percentile_history(indicator_id, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取分位数历史失败: {str(e)}")
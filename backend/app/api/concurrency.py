@@ -0,0 +1,97 @@
+"""
+API并发限制
+同时处理的API请求超过上限时排队，排队超时返回503，避免数据重新加载期间请求无限堆积
+
+名额在响应发送完毕后才释放：StreamingResponse（ndjson、arrow）的响应体在路由函数返回之后才生成，
+生成和发送期间同样占用名额
+"""
+from typing import Callable, Dict
+import asyncio
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from ..config import settings
+
+
+class ConcurrencyLimiter:
+    """HTTP中间件：限制同时处理的API请求数"""
+
+    def __init__(self, limit: int, queue_timeout: float, prefix: str, exempt: tuple = ()):
+        """
+        Args:
+            limit: 最大并发请求数
+            queue_timeout: 排队等待的最长时间（秒）
+            prefix: 受限制的路径前缀
+            exempt: 不受限制的路径前缀（管理、监控接口）
+        """
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self.prefix = prefix
+        self.exempt = exempt
+        self._semaphore = asyncio.Semaphore(limit)
+        self._in_flight = 0
+        self._waiting = 0
+        self._rejected = 0
+
+    async def __call__(self, request: Request, call_next):
+        path = request.url.path
+        if not path.startswith(self.prefix) or path.startswith(self.exempt):
+            return await call_next(request)
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            return JSONResponse(
+                status_code=503,
+                content={"detail": "服务器繁忙，请稍后重试"},
+                headers={"Retry-After": str(max(1, int(self.queue_timeout)))},
+            )
+        finally:
+            self._waiting -= 1
+
+        self._in_flight += 1
+        try:
+            response = await call_next(request)
+        except BaseException:
+            self._release()
+            raise
+        return _ReleaseAfterSend(response, self._release)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict:
+        """当前并发和排队情况"""
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "rejected": self._rejected,
+        }
+
+
+class _ReleaseAfterSend:
+    """包装响应：响应发送结束（包括连接断开、发送出错）后执行回调"""
+
+    def __init__(self, response, callback: Callable[[], None]):
+        self.response = response
+        self.callback = callback
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.response(scope, receive, send)
+        finally:
+            self.callback()
+
+
+# 全局并发限制实例
+concurrency_limiter = ConcurrencyLimiter(
+    limit=settings.MAX_CONCURRENT_REQUESTS,
+    queue_timeout=settings.REQUEST_QUEUE_TIMEOUT,
+    prefix=settings.API_PREFIX,
+    exempt=(f"{settings.API_PREFIX}/admin",),
+)
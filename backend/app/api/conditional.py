@@ -0,0 +1,86 @@
+"""
+HTTP条件请求支持（ETag / Last-Modified）
+数据只随工作簿版本变化，命中时直接返回304，不做任何数据计算和序列化
+"""
+from datetime import date
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+import hashlib
+
+from fastapi import Request, Response
+
+from ..config import settings
+
+
+class Validators:
+    """一个响应的缓存校验信息"""
+
+    def __init__(self, etag: str, last_modified: Optional[str] = None, generation: Optional[float] = None):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.generation = generation
+
+    def apply(self, response: Response) -> None:
+        """写入响应头"""
+        response.headers["ETag"] = self.etag
+        if self.last_modified:
+            response.headers["Last-Modified"] = self.last_modified
+        # 允许缓存，但每次使用前必须向服务器校验
+        response.headers["Cache-Control"] = "no-cache"
+
+
+def build_validators(generation: Optional[float], *key_parts) -> Validators:
+    """
+    根据数据版本和请求参数生成强ETag
+
+    Args:
+        generation: 数据版本（工作簿修改时间戳）
+        *key_parts: 影响响应内容的其他参数（路由、指标ID、日期范围等）
+
+    Returns:
+        Validators
+    """
+    # 默认日期范围依赖"今天"，因此当天日期也作为版本的一部分
+    parts = [settings.APP_VERSION, repr(generation), date.today().isoformat()]
+    parts.extend("" if p is None else str(p) for p in key_parts)
+    digest = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:20]
+    last_modified = formatdate(generation, usegmt=True) if generation else None
+    return Validators(etag=f'"{digest}"', last_modified=last_modified, generation=generation)
+
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    """判断客户端缓存是否仍然有效"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match 优先于 If-Modified-Since
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return "*" in tags or validators.etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and validators.generation:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP日期精度为秒
+        return int(validators.generation) <= since
+    return False
+
+
+def not_modified_response(validators: Validators) -> Response:
+    """构造304响应"""
+    response = Response(status_code=304)
+    validators.apply(response)
+    return response
+
+
+def check_conditional(request: Request, response: Response, validators: Validators) -> Optional[Response]:
+    """
+    处理条件请求
+
+    命中缓存时返回304响应（调用方直接返回它）；否则把校验头写入正常响应并返回None
+    """
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+    validators.apply(response)
+    return None
@@ -0,0 +1,60 @@
+"""
+API请求耗时统计
+按路由模板（例如 /api/bociasi/{indicator_id}/data）记录耗时直方图，避免每个具体路径各占一组标签
+"""
+import time
+
+from fastapi import Request
+
+from ..monitoring import HTTP_REQUEST_SECONDS
+
+
+def _route_template(request: Request) -> str:
+    """
+    请求对应的路由模板：把路径中的参数值换回参数名
+    （不同FastAPI版本中 scope["route"].path 不一定带路由前缀，因此不直接使用）
+
+    Returns:
+        路由模板，未进入路由时返回 unmatched
+    """
+    scope = request.scope
+    if "endpoint" not in scope:
+        # 未进入路由就返回的请求（404、排队超时的503）统一归为 unmatched，避免标签随路径无限增长
+        return "unmatched"
+
+    names = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    segments = scope["path"].split("/")
+    return "/".join(f"{{{names[s]}}}" if s in names else s for s in segments)
+
+
+class RequestMetrics:
+    """HTTP中间件：记录每个请求到响应开始发送的耗时"""
+
+    def __init__(self, exempt: tuple = ()):
+        """
+        Args:
+            exempt: 不记录的路径（例如 /metrics 本身）
+        """
+        self.exempt = exempt
+
+    async def __call__(self, request: Request, call_next):
+        if request.url.path in self.exempt:
+            return await call_next(request)
+
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=request.method,
+                route=_route_template(request),
+                status=str(status),
+            )
+
+
+# 全局请求统计实例
+request_metrics = RequestMetrics(exempt=("/metrics",))
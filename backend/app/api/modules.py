@@ -1,11 +1,12 @@
 """
 模块管理API路由
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from typing import List
 from ..models.indicators import ModuleInfo, ModuleListResponse
 from ..services.bociasi_service import bociasi_service
 from ..services.wind2x_service import wind2x_service
+from .conditional import build_validators, check_conditional
 
 router = APIRouter(prefix="/modules", tags=["modules"])
 
@@ -16,14 +17,27 @@ MODULE_REGISTRY = {
 }
 
 
+def _registry_generation():
+    """所有模块中最新的数据版本"""
+    generations = [g for g in (s.get_generation() for s in MODULE_REGISTRY.values()) if g]
+    return max(generations) if generations else None
+
+
 @router.get("", response_model=ModuleListResponse)
-async def get_modules():
+async def get_modules(request: Request, response: Response):
     """
     获取所有可用的数据模块列表
     
     Returns:
         模块列表
     """
+    validators = build_validators(
+        _registry_generation(), "modules", ",".join(MODULE_REGISTRY)
+    )
+    not_modified = check_conditional(request, response, validators)
+    if not_modified:
+        return not_modified
+    
     modules = [service.get_module_info() for service in MODULE_REGISTRY.values()]
     return ModuleListResponse(
         modules=modules,
@@ -32,7 +46,7 @@ async def get_modules():
 
 
 @router.get("/{module_id}", response_model=ModuleInfo)
-async def get_module(module_id: str):
+async def get_module(request: Request, response: Response, module_id: str):
     """
     获取指定模块的详细信息
     
@@ -46,4 +60,9 @@ async def get_module(module_id: str):
         raise HTTPException(status_code=404, detail=f"模块不存在: {module_id}")
     
     service = MODULE_REGISTRY[module_id]
+    validators = build_validators(service.get_generation(), "modules", module_id)
+    not_modified = check_conditional(request, response, validators)
+    if not_modified:
+        return not_modified
+    
     return service.get_module_info()
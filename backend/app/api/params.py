@@ -0,0 +1,29 @@
+"""
+查询参数校验
+"""
+from datetime import date
+from typing import Optional
+import re
+
+from fastapi import HTTPException
+
+_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def check_date_range(start_date: Optional[str], end_date: Optional[str]) -> None:
+    """
+    校验日期范围参数（YYYY-MM-DD），格式无效时返回422，不进入服务层
+
+    Args:
+        start_date: 开始日期（可选）
+        end_date: 结束日期（可选）
+    """
+    for name, value in (("start_date", start_date), ("end_date", end_date)):
+        if value is None:
+            continue
+        try:
+            if not _DATE_PATTERN.fullmatch(value):
+                raise ValueError(value)
+            date.fromisoformat(value)
+        except ValueError:
+            raise HTTPException(status_code=422, detail=f"日期格式无效: {name}={value}，应为 YYYY-MM-DD")
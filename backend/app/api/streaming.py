@@ -0,0 +1,61 @@
+"""
+流式导出（NDJSON）
+全历史数据逐块编码逐块发送：不构建完整的响应模型，内存占用与数据长度无关，
+首字节时间也不随历史长度增长
+"""
+from typing import Dict, Iterable, Iterator
+import json
+
+from fastapi.responses import StreamingResponse
+
+from .conditional import Validators
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# 每次发送的行数
+CHUNK_ROWS = 500
+
+
+def _encode(obj: Dict) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def iter_ndjson(header: Dict, rows: Iterable[Dict], chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    """
+    编码NDJSON：第一行为头信息（指标、统计指标等），之后每行一个数据点
+
+    Args:
+        header: 头信息
+        rows: 数据行（惰性迭代）
+        chunk_rows: 每块行数
+
+    Yields:
+        文本块
+    """
+    yield _encode(header)
+    chunk = []
+    for row in rows:
+        chunk.append(_encode(row))
+        if len(chunk) >= chunk_rows:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def ndjson_response(header: Dict, rows: Iterable[Dict], validators: Validators) -> StreamingResponse:
+    """
+    构造NDJSON流式响应
+
+    Args:
+        header: 头信息
+        rows: 数据行（惰性迭代）
+        validators: 缓存校验信息
+
+    Returns:
+        StreamingResponse
+    """
+    response = StreamingResponse(iter_ndjson(header, rows), media_type=NDJSON_MEDIA_TYPE)
+    validators.apply(response)
+    # 反向代理（nginx）不要缓冲整个响应，收到一块转发一块
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
@@ -1,10 +1,14 @@
 """
 Wind 2X ERP模块API路由
 """
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from typing import Optional
-from ..models.indicators import IndicatorData, IndicatorMetrics, IndicatorInfo
+from ..models.indicators import IndicatorData, IndicatorMetrics, IndicatorInfo, PercentileHistory
 from ..services.wind2x_service import wind2x_service
+from .conditional import build_validators, check_conditional
+from .streaming import ndjson_response
+from .binary import arrow_response, binary_response
+from .params import check_date_range
 
 router = APIRouter(prefix="/wind_2x_erp", tags=["wind_2x_erp"])
 
@@ -22,8 +26,14 @@ async def get_indicators():
 
 @router.get("/data", response_model=IndicatorData)
 async def get_erp_data(
+    request: Request,
+    response: Response,
     start_date: Optional[str] = Query(None, description="开始日期，格式：YYYY-MM-DD"),
-    end_date: Optional[str] = Query(None, description="结束日期，格式：YYYY-MM-DD")
+    end_date: Optional[str] = Query(None, description="结束日期，格式：YYYY-MM-DD"),
+    format: str = Query(
+        "json", pattern="^(json|ndjson|arrow|binary)$",
+        description="响应格式：json、ndjson（流式导出）、arrow（Arrow IPC流）或 binary（原始float64数组）"
+    )
 ):
     """
     获取ERP 2X数据
@@ -31,31 +41,89 @@ async def get_erp_data(
     Args:
         start_date: 开始日期（可选）
         end_date: 结束日期（可选）
+        format: ndjson 时流式返回：第一行为指标信息和统计指标，之后每行一个数据点；
+            arrow / binary 时返回列式二进制数据（格式说明见 binary.py）
         
     Returns:
         指标数据
     """
+    check_date_range(start_date, end_date)
+    validators = build_validators(
+        wind2x_service.get_generation(), "wind_2x_erp", "data", start_date, end_date, format
+    )
+    not_modified = check_conditional(request, response, validators)
+    if not_modified:
+        return not_modified
+    
     try:
+        if format == "ndjson":
+            header, rows = await wind2x_service.fetch_indicator_stream("erp_2x", start_date, end_date)
+            return ndjson_response(header, rows, validators)
+        
+        if format in ("arrow", "binary"):
+            header, table = await wind2x_service.fetch_indicator_columns("erp_2x", start_date, end_date)
+            if format == "arrow":
+                return arrow_response(header, table, validators)
+            return binary_response(header, table, validators)
+        
         data = await wind2x_service.fetch_indicator_data(
             indicator_id="erp_2x",
             start_date=start_date,
             end_date=end_date
         )
         return data
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取数据失败: {str(e)}")
 
 
 @router.get("/metrics", response_model=IndicatorMetrics)
-async def get_erp_metrics():
+async def get_erp_metrics(request: Request, response: Response):
     """
     获取ERP 2X统计指标
     
     Returns:
         统计指标
     """
+    validators = build_validators(wind2x_service.get_generation(), "wind_2x_erp", "metrics")
+    not_modified = check_conditional(request, response, validators)
+    if not_modified:
+        return not_modified
+    
     try:
         metrics = await wind2x_service.fetch_indicator_metrics("erp_2x")
         return metrics
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取统计指标失败: {str(e)}")
+
+
+@router.get("/percentile_history", response_model=PercentileHistory)
+async def get_erp_percentile_history(
+    request: Request,
+    response: Response,
+    start_date: Optional[str] = Query(None, description="开始日期，格式：YYYY-MM-DD"),
+    end_date: Optional[str] = Query(None, description="结束日期，格式：YYYY-MM-DD")
+):
+    """
+    获取ERP 2X滚动5年分位数的历史走势
+    
+    Args:
+        start_date: 开始日期（可选）
+        end_date: 结束日期（可选）
+        
+    Returns:
+        分位数历史
+    """
+    check_date_range(start_date, end_date)
+    validators = build_validators(
+        wind2x_service.get_generation(), "wind_2x_erp", "percentile_history", start_date, end_date
+    )
+    not_modified = check_conditional(request, response, validators)
+    if not_modified:
+        return not_modified
+    
+    try:
+        return await wind2x_service.fetch_percentile_history("erp_2x", start_date, end_date)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取分位数历史失败: {str(e)}")
@@ -3,6 +3,7 @@
 """
 from pydantic_settings import BaseSettings
 from typing import List
+from pathlib import Path
 
 
 class Settings(BaseSettings):
@@ -31,10 +32,24 @@ class Settings(BaseSettings):
     
     # 数据缓存配置
     CACHE_TTL: int = 300  # 缓存时间（秒）
+    CACHE_MAX_ENTRIES: int = 1024  # 响应缓存的最大条目数，超出时先清理过期条目，再淘汰最早写入的条目
     
     # Wind数据接口配置
     WIND_ENABLED: bool = True
     WIND_TIMEOUT: int = 30
+    WIND_BACKEND: str = "windpy"  # windpy 或 simulator（backend/wind_simulator.py，无Wind终端时压测用）
+    
+    # 阻塞任务与并发控制
+    EXECUTOR_WORKERS: int = 4  # Excel解析、统计计算等阻塞任务的线程数
+    MAX_CONCURRENT_REQUESTS: int = 32  # 同时处理的API请求上限
+    REQUEST_QUEUE_TIMEOUT: float = 10.0  # 超过上限时排队等待的最长时间（秒），超时返回503
+    
+    # 多进程部署配置
+    # 多个worker时开启：持有调度锁的进程解析Excel并发布到内存映射文件，其他worker只读挂载
+    SHARED_DATASET: bool = False
+    SHARED_DATASET_WAIT: int = 60  # worker等待主进程发布新版本数据的最长时间（秒），超时后自行解析
+    SHARED_DATASET_REFRESH: int = 5  # 主进程检查工作簿版本、重新发布的间隔（秒）
+    RUNTIME_DIR: str = ""  # 锁文件和共享数据文件目录，默认 backend/runtime
     
     class Config:
         case_sensitive = True
@@ -43,3 +58,10 @@ class Settings(BaseSettings):
 
 # 全局配置实例
 settings = Settings()
+
+
+def get_runtime_dir() -> Path:
+    """锁文件和共享数据文件目录"""
+    if settings.RUNTIME_DIR:
+        return Path(settings.RUNTIME_DIR)
+    return Path(__file__).resolve().parent.parent / "runtime"
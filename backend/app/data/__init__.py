@@ -1,7 +1,7 @@
 """
 数据访问层
 """
-from .wind_client import WindDataClient
+from .wind_client import WindDataClient, WindConnectionManager
 from .cache import DataCache
 
-__all__ = ["WindDataClient", "DataCache"]
+__all__ = ["WindDataClient", "WindConnectionManager", "DataCache"]
@@ -1,14 +1,23 @@
 from typing import Any, Optional, Dict
 import time
 
+from ..config import settings
+from ..monitoring import registry
+
 class DataCache:
     """
     简单的内存缓存实现
     用于缓存API响应和计算结果，减少重复计算和IO
     """
-    def __init__(self):
+    def __init__(self, max_entries: int = 1024):
+        """
+        :param max_entries: 最大条目数
+        """
+        self.max_entries = max_entries
         self._cache: Dict[str, Any] = {}
         self._expiry: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
 
     def get(self, key: str) -> Optional[Any]:
         """
@@ -21,8 +30,11 @@ class DataCache:
             if key in self._expiry:
                 if time.time() > self._expiry[key]:
                     self.delete(key)
+                    self.misses += 1
                     return None
+            self.hits += 1
             return self._cache[key]
+        self.misses += 1
         return None
 
     def set(self, key: str, value: Any, ttl: int = 300) -> None:
@@ -32,6 +44,10 @@ class DataCache:
         :param value: 值
         :param ttl: 过期时间(秒)，默认5分钟。设置为0表示不过期。
         """
+        # 重新写入的键移到末尾（淘汰顺序按写入时间）
+        self._cache.pop(key, None)
+        if len(self._cache) >= self.max_entries:
+            self._evict()
         self._cache[key] = value
         if ttl > 0:
             self._expiry[key] = time.time() + ttl
@@ -45,10 +61,36 @@ class DataCache:
         if key in self._expiry:
             del self._expiry[key]
             
+    def delete_prefix(self, prefix: str) -> int:
+        """
+        删除以 prefix 开头的所有缓存（如数据重新加载后删除该模块旧版本的响应）
+        :return: 删除的条目数
+        """
+        keys = [key for key in self._cache if key.startswith(prefix)]
+        for key in keys:
+            self.delete(key)
+        return len(keys)
+
+    def _evict(self) -> None:
+        """先删除所有已过期的条目，仍然达到上限时删除最早写入的条目"""
+        now = time.time()
+        for key in [key for key, expiry in self._expiry.items() if now > expiry]:
+            self.delete(key)
+        while len(self._cache) >= self.max_entries:
+            self.delete(next(iter(self._cache)))
+
     def clear(self) -> None:
         """清空所有缓存"""
         self._cache.clear()
         self._expiry.clear()
 
+    def stats(self) -> Dict[str, int]:
+        """命中、未命中次数和当前条目数"""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._cache)}
+
 # 全局单例缓存实例
-cache = DataCache()
+cache = DataCache(settings.CACHE_MAX_ENTRIES)
+
+registry.callback("cache_hits_total", "DataCache命中次数", (), lambda: {(): cache.stats()["hits"]}, kind="counter")
+registry.callback("cache_misses_total", "DataCache未命中次数（含过期）", (), lambda: {(): cache.stats()["misses"]}, kind="counter")
+registry.callback("cache_entries", "DataCache当前条目数", (), lambda: {(): cache.stats()["entries"]})
@@ -0,0 +1,94 @@
+"""
+跨进程文件锁
+多worker部署时保证定时任务、共享数据发布只在一个进程中进行。
+锁随进程存在：进程退出（包括崩溃）后由操作系统自动释放，其他进程可以接管。
+"""
+from pathlib import Path
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessLock:
+    """非阻塞的独占文件锁（POSIX 使用 fcntl，Windows 使用 msvcrt）"""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: 锁文件路径
+        """
+        self.path = Path(path)
+        self._fd = None
+        # 同一进程内的多个线程也互斥
+        self._thread_lock = threading.Lock()
+
+    @property
+    def held(self) -> bool:
+        """当前进程是否持有锁"""
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """
+        尝试获取锁（不等待，不可重入）
+
+        Returns:
+            是否获取成功
+        """
+        if not self._thread_lock.acquire(blocking=False):
+            return False
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            logger.error(f"无法创建锁文件 {self.path}: {e}")
+            self._thread_lock.release()
+            return False
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            self._thread_lock.release()
+            return False
+
+        # 写入持有者PID，便于排查
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        logger.info(f"进程 {os.getpid()} 获得锁: {self.path}")
+        return True
+
+    def release(self) -> None:
+        """释放锁"""
+        if self._fd is None:
+            return
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+            self._thread_lock.release()
+
+
+def _runtime_path(name: str) -> Path:
+    from ..config import get_runtime_dir
+    return get_runtime_dir() / name
+
+
+# 调度锁：持有者运行定时任务，并负责解析和发布共享数据
+scheduler_lock = ProcessLock(_runtime_path("scheduler.lock"))
+# 更新锁：同一时间只允许一个数据更新任务（定时或手动触发）
+update_lock = ProcessLock(_runtime_path("update.lock"))
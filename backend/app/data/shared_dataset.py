@@ -0,0 +1,129 @@
+"""
+多进程共享数据集
+持有调度锁的主进程解析Excel后，把列式数据写入运行目录下的二进制文件，
+其他worker以只读内存映射挂载：同一份数据在操作系统页缓存中只有一份，worker无需各自解析Excel。
+
+文件布局（每个模块、每个数据版本一组）:
+    {key}.{版本}.bin   按列连续存放：date（int64天数）+ 各数值列（float64，空值NaN），小端
+    {key}.{版本}.json  列名、行数、数据版本（写完 .bin 之后才写入，存在即表示发布完成）
+"""
+from pathlib import Path
+from typing import Optional
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from ..services.columnar import ColumnarTable
+
+logger = logging.getLogger(__name__)
+
+# 等待主进程发布数据时的轮询间隔（秒）
+POLL_INTERVAL = 0.5
+
+
+class SharedDataset:
+    """共享数据集的发布与挂载"""
+
+    def __init__(self, directory: Path):
+        """
+        Args:
+            directory: 数据文件目录
+        """
+        self.directory = Path(directory)
+
+    def _paths(self, key: str, generation: float):
+        token = str(int(generation * 1e6))
+        return self.directory / f"{key}.{token}.bin", self.directory / f"{key}.{token}.json"
+
+    def publish(self, key: str, generation: float, table: ColumnarTable) -> None:
+        """
+        发布数据（主进程调用）
+
+        Args:
+            key: 模块ID
+            generation: 数据版本（工作簿修改时间）
+            table: 列式数据表
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data_path, meta_path = self._paths(key, generation)
+
+        tmp_path = data_path.with_name(data_path.name + f".{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(np.ascontiguousarray(table.dates.view('<i8')).tobytes())
+            for values in table.columns.values():
+                f.write(np.ascontiguousarray(values, dtype='<f8').tobytes())
+        os.replace(tmp_path, data_path)
+
+        meta = {"columns": list(table.columns), "rows": len(table), "generation": generation}
+        tmp_path = meta_path.with_name(meta_path.name + f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(meta), encoding='utf-8')
+        os.replace(tmp_path, meta_path)
+
+        logger.info(f"已发布共享数据: {data_path.name}（{len(table)} 行）")
+        self._cleanup(key, data_path, meta_path)
+
+    def attach(self, key: str, generation: float) -> Optional[ColumnarTable]:
+        """
+        只读挂载已发布的数据
+
+        Args:
+            key: 模块ID
+            generation: 数据版本
+
+        Returns:
+            列式数据表（数组为内存映射视图），尚未发布时返回None
+        """
+        data_path, meta_path = self._paths(key, generation)
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+        names, rows = meta["columns"], meta["rows"]
+        if rows == 0:
+            return ColumnarTable.empty(names)
+
+        matrix = np.memmap(data_path, dtype='<f8', mode='r', shape=(len(names) + 1, rows))
+        dates = matrix[0].view('<i8').view('datetime64[D]')
+        return ColumnarTable(dates, {name: matrix[i + 1] for i, name in enumerate(names)})
+
+    def wait_for(self, key: str, generation: float, timeout: float) -> Optional[ColumnarTable]:
+        """
+        等待主进程发布指定版本的数据（阻塞，在线程池中调用）
+
+        Args:
+            key: 模块ID
+            generation: 数据版本
+            timeout: 最长等待时间（秒），0 表示只检查一次
+
+        Returns:
+            列式数据表，超时返回None
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            table = self.attach(key, generation)
+            if table is not None or time.monotonic() >= deadline:
+                return table
+            time.sleep(POLL_INTERVAL)
+
+    def _cleanup(self, key: str, *keep: Path) -> None:
+        """删除该模块的旧版本文件（Windows下仍被映射的文件会删除失败，下次发布时重试）"""
+        for path in self.directory.glob(f"{key}.*"):
+            if path in keep or path.suffix == '.tmp':
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def _dataset_dir() -> Path:
+    from ..config import get_runtime_dir
+    return get_runtime_dir() / "dataset"
+
+
+# 全局共享数据集实例
+shared_dataset = SharedDataset(_dataset_dir())
@@ -4,44 +4,123 @@ Wind数据接口封装
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
 
-class WindDataClient:
-    """Wind数据客户端封装"""
+# 连接失败后，再次尝试连接前的冷却时间（秒）
+RETRY_COOLDOWN = 60
+
+
+class WindConnectionManager:
+    """
+    WindPy连接管理器
+    
+    WindPy 在进程内只有一个全局连接（w），这里负责在首次真正使用时才导入和连接，
+    之后所有调用共享该连接；断开后自动重连，连接失败时在冷却时间内不再重复尝试。
+    导入本模块不会导入 WindPy，也不会连接。
+    """
     
-    def __init__(self):
-        """初始化Wind客户端"""
-        self._initialized = False
+    def __init__(self, enabled: bool = True, timeout: int = 30, backend: str = "windpy"):
+        """
+        Args:
+            enabled: 是否启用Wind（关闭时始终返回None，调用方使用模拟数据）
+            timeout: 连接超时（秒）
+            backend: windpy 或 simulator（使用 backend/wind_simulator.py 的模拟器）
+        """
+        self.enabled = enabled
+        self.timeout = timeout
+        self.backend = backend
         self._w = None
-        self._init_connection()
+        self._available = True
+        self._last_failure = 0.0
+        self._lock = threading.Lock()
+    
+    @property
+    def started(self) -> bool:
+        """是否已经建立过连接"""
+        return self._w is not None
     
-    def _init_connection(self) -> None:
-        """初始化Wind连接"""
+    def is_connected(self) -> bool:
+        """当前是否已连接（不会触发连接）"""
         try:
-            from WindPy import w
-            self._w = w
-            if not self._w.isconnected():
-                result = self._w.start()
-                if result.ErrorCode == 0:
-                    self._initialized = True
-                    logger.info("Wind API连接成功")
+            return self._w is not None and bool(self._w.isconnected())
+        except Exception:
+            return False
+    
+    def acquire(self):
+        """
+        获取已连接的 WindPy 对象，必要时导入并连接
+        
+        Returns:
+            WindPy 的 w 对象；未安装、未启用或连接失败时返回None
+        """
+        if not self.enabled or not self._available:
+            return None
+        if self.is_connected():
+            return self._w
+        
+        with self._lock:
+            if self.is_connected():
+                return self._w
+            if time.monotonic() - self._last_failure < RETRY_COOLDOWN:
+                return None
+            
+            try:
+                if self.backend == "simulator":
+                    from wind_simulator import w
                 else:
+                    from WindPy import w
+            except ImportError:
+                logger.warning("WindPy未安装，将使用模拟数据")
+                self._available = False
+                return None
+            
+            try:
+                # 其他模块（如更新脚本）可能已经连接
+                result = None if w.isconnected() else w.start(waitTime=self.timeout)
+                if result is not None and result.ErrorCode != 0:
                     logger.error(f"Wind API连接失败: {result.Data}")
-            else:
-                self._initialized = True
-                logger.info("Wind API已连接")
-        except ImportError:
-            logger.warning("WindPy未安装，将使用模拟数据")
-            self._initialized = False
-        except Exception as e:
-            logger.error(f"Wind API初始化异常: {str(e)}")
-            self._initialized = False
+                    self._last_failure = time.monotonic()
+                    return None
+            except Exception as e:
+                logger.error(f"Wind API初始化异常: {str(e)}")
+                self._last_failure = time.monotonic()
+                return None
+            
+            self._w = w
+            logger.info("Wind API连接成功")
+            return self._w
+    
+    def close(self) -> None:
+        """关闭连接（从未连接过时什么也不做）"""
+        with self._lock:
+            if self._w is None:
+                return
+            try:
+                self._w.stop()
+                logger.info("Wind API连接已关闭")
+            except Exception as e:
+                logger.error(f"关闭Wind连接异常: {str(e)}")
+            finally:
+                self._w = None
+
+
+class WindDataClient:
+    """Wind数据客户端封装"""
+    
+    def __init__(self, manager: WindConnectionManager):
+        """
+        Args:
+            manager: Wind连接管理器（首次取数时才连接）
+        """
+        self._manager = manager
     
     def is_connected(self) -> bool:
         """检查是否已连接"""
-        return self._initialized and self._w is not None and self._w.isconnected()
+        return self._manager.is_connected()
     
     def fetch_timeseries(
         self,
@@ -64,12 +143,13 @@ class WindDataClient:
         Returns:
             包含dates和values的字典
         """
-        if not self.is_connected():
+        w = self._manager.acquire()
+        if w is None:
             logger.warning("Wind未连接，返回模拟数据")
             return self._get_mock_data(start_date, end_date)
         
         try:
-            result = self._w.wsd(codes, fields, start_date, end_date, options)
+            result = w.wsd(codes, fields, start_date, end_date, options)
             
             if result.ErrorCode != 0:
                 logger.error(f"Wind数据获取失败: {result.Data}")
@@ -151,13 +231,16 @@ class WindDataClient:
     
     def close(self) -> None:
         """关闭Wind连接"""
-        if self._w and self._initialized:
-            try:
-                self._w.stop()
-                logger.info("Wind API连接已关闭")
-            except Exception as e:
-                logger.error(f"关闭Wind连接异常: {str(e)}")
+        self._manager.close()
+
+
+def _create_manager() -> WindConnectionManager:
+    from ..config import settings
+    return WindConnectionManager(
+        enabled=settings.WIND_ENABLED, timeout=settings.WIND_TIMEOUT, backend=settings.WIND_BACKEND.lower()
+    )
 
 
-# 全局Wind客户端实例
-wind_client = WindDataClient()
+# 全局Wind连接管理器和客户端实例（导入时不连接）
+wind_manager = _create_manager()
+wind_client = WindDataClient(wind_manager)
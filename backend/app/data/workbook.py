@@ -0,0 +1,114 @@
+"""
+工作簿版本（generation）信息
+数据每天只在18:00更新任务后变化一次，以Excel文件的修改时间作为数据版本号
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+import logging
+import os
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def get_workbook_path() -> Path:
+    """获取数据工作簿路径"""
+    from config import EXCEL_PATH
+    return Path(EXCEL_PATH)
+
+
+def get_workbook_generation() -> Optional[float]:
+    """
+    获取当前工作簿的数据版本
+
+    Returns:
+        文件修改时间（时间戳），文件不存在时返回None
+    """
+    try:
+        return os.path.getmtime(get_workbook_path())
+    except OSError:
+        return None
+
+
+def decode_sheet(df, start_row: int, columns: Dict[str, int]) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """
+    按列解码 read_excel 读出的数据（不逐行处理）
+
+    第0列为日期，整列解析一次，无法解析的行（空行、文本）丢弃；
+    数值列整列转换，#N/A 等无法转换的单元格为 NaN。结果按日期升序排列。
+
+    Args:
+        df: pd.read_excel 的结果（header=None）
+        start_row: 数据开始的行
+        columns: 字段名 -> df 中的列位置
+
+    Returns:
+        (日期字符串列表 YYYY-MM-DD, 字段名 -> float64 数组)
+    """
+    import pandas as pd
+
+    frame = df.iloc[start_row:]
+    dates = pd.to_datetime(frame.iloc[:, 0], errors='coerce', format='mixed')
+    values = {
+        name: pd.to_numeric(frame.iloc[:, position], errors='coerce').to_numpy(dtype=float)
+        for name, position in columns.items()
+    }
+    return _sort_by_date(dates, values)
+
+
+def _sort_by_date(dates, values: Dict[str, np.ndarray]) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """丢弃日期无效的行，按日期升序（稳定排序）排列"""
+    valid = dates.notna().to_numpy()
+    dates = dates[valid]
+    order = np.argsort(dates.to_numpy(), kind='stable')
+    values = {name: array[valid][order] for name, array in values.items()}
+    return dates.dt.strftime('%Y-%m-%d').to_numpy()[order].tolist(), values
+
+
+def load_sheet_columns(
+    path,
+    sheet: Union[str, int],
+    start_row: int,
+    columns: Dict[str, int],
+    date_column: int = 0
+) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """
+    读取工作表的指定列并解码（结果与 decode_sheet 相同）
+
+    优先使用流式读取（xlsx_reader），文件结构不符合预期（xlsx_reader.READ_ERRORS）时回退到 pd.read_excel；
+    其他异常（文件不存在、权限等）直接抛出
+
+    Args:
+        path: 工作簿路径
+        sheet: 工作表名称或序号
+        start_row: 数据开始的行（从0开始）
+        columns: 字段名 -> 工作表中的列序号（从0开始，A=0）
+        date_column: 日期列序号
+
+    Returns:
+        (日期字符串列表 YYYY-MM-DD, 字段名 -> float64 数组)
+    """
+    import pandas as pd
+
+    from .xlsx_reader import READ_ERRORS, excel_serial_to_datetime64, read_columns
+
+    try:
+        serials, texts, values, date1904 = read_columns(path, sheet, start_row, columns, date_column)
+        dates = pd.Series(excel_serial_to_datetime64(serials, date1904))
+        if texts:
+            # 以文本保存的日期单元格
+            positions = list(texts)
+            dates.iloc[positions] = pd.to_datetime(
+                pd.Series([texts[i] for i in positions]), errors='coerce', format='mixed'
+            ).to_numpy()
+        return _sort_by_date(dates, values)
+    except READ_ERRORS as e:
+        logger.warning(f"流式读取失败，改用 read_excel: {path} ({e})")
+
+    usecols = sorted({date_column, *columns.values()})
+    df = pd.read_excel(path, sheet_name=sheet, header=None, usecols=usecols)
+    if len(df) <= start_row:
+        return [], {name: np.empty(0) for name in columns}
+    position = {col: i for i, col in enumerate(usecols)}
+    frame = df.iloc[:, [position[date_column]] + [position[col] for col in columns.values()]]
+    return decode_sheet(frame, start_row, {name: i + 1 for i, name in enumerate(columns)})
@@ -0,0 +1,301 @@
+"""
+xlsx 流式列读取
+用事件解析器（iterparse）从压缩包中流式解析工作表 XML（xl/worksheets/sheetN.xml，不整体解压到内存），
+只保留需要的列和起始行之后的行，已处理的行随即释放；
+数值（含公式的缓存值）直接写入预分配的 numpy 数组，不构建 DataFrame。
+共享字符串表只在遇到需要的字符串单元格时才加载。
+
+读取结果与 pd.read_excel(header=None) + decode_sheet 相同（见 workbook.load_sheet_columns）。
+"""
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Dict, Tuple, Union
+import numpy as np
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_ROW = _NS + "row"
+_VALUE = _NS + "v"
+_INLINE = _NS + "is"
+_TEXT = _NS + "t"
+_DIMENSION = _NS + "dimension"
+_SHEET_DATA = _NS + "sheetData"
+
+_REF = re.compile(r"([A-Z]+)(\d+)")
+
+# 未知行数时的初始容量
+_INITIAL_CAPACITY = 4096
+
+# 文件不是预期的 xlsx 结构时读取抛出的异常（调用方可据此回退到 pd.read_excel）：
+# 不是zip包、缺少工作表/部件、XML损坏、单元格内容或共享字符串索引无效
+READ_ERRORS = (zipfile.BadZipFile, KeyError, IndexError, ValueError, ET.ParseError)
+
+
+def column_letter(index: int) -> str:
+    """列序号（从0开始）-> 列字母，如 31 -> AF"""
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def column_index(letters: str) -> int:
+    """列字母 -> 列序号（从0开始），如 AF -> 31"""
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - 64
+    return index - 1
+
+
+class XlsxColumnReader:
+    """按列读取 xlsx 工作表的单个区域"""
+
+    def __init__(self, path):
+        self.path = path
+        self._zip = None
+        self._shared_strings = None
+        self._date1904 = False
+
+    def __enter__(self):
+        self._zip = zipfile.ZipFile(self.path)
+        return self
+
+    def __exit__(self, *exc):
+        self._zip.close()
+        return False
+
+    def _sheet_path(self, sheet: Union[str, int]) -> str:
+        """工作表名称或序号 -> 压缩包内的XML路径"""
+        workbook = ET.fromstring(self._zip.read("xl/workbook.xml"))
+        props = workbook.find(_NS + "workbookPr")
+        if props is not None and props.get("date1904") in ("1", "true"):
+            self._date1904 = True
+
+        sheets = workbook.findall(f"{_NS}sheets/{_NS}sheet")
+        if isinstance(sheet, int):
+            entry = sheets[sheet] if -len(sheets) <= sheet < len(sheets) else None
+        else:
+            entry = next((s for s in sheets if s.get("name") == sheet), None)
+        if entry is None:
+            raise KeyError(f"工作表不存在: {sheet}")
+
+        rels = ET.fromstring(self._zip.read("xl/_rels/workbook.xml.rels"))
+        rel_id = entry.get(_REL_NS + "id")
+        target = next((r.get("Target") for r in rels.iter(_PKG_REL_NS + "Relationship") if r.get("Id") == rel_id), None)
+        if target is None:
+            raise KeyError(f"工作表关系不存在: {rel_id}")
+        # Target 可能是绝对路径（/xl/worksheets/sheet1.xml）或相对 xl/ 的路径
+        return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+
+    def _shared_string(self, index: int) -> str:
+        if self._shared_strings is None:
+            self._shared_strings = []
+            try:
+                data = self._zip.open("xl/sharedStrings.xml")
+            except KeyError:
+                data = None
+            if data is not None:
+                with data:
+                    for _, elem in ET.iterparse(data):
+                        if elem.tag == _NS + "si":
+                            self._shared_strings.append("".join(t.text or "" for t in elem.iter(_TEXT)))
+                            elem.clear()
+        return self._shared_strings[index]
+
+    def _cell_value(self, cell) -> Union[float, str, None]:
+        """单元格的值：数值、文本，空单元格和错误值（#N/A等）为None"""
+        kind = cell.get("t")
+        if kind == "inlineStr":
+            inline = cell.find(_INLINE)
+            return None if inline is None else "".join(t.text or "" for t in inline.iter(_TEXT))
+        v = cell.find(_VALUE)
+        if v is None or v.text is None:
+            return None
+        if kind is None or kind == "n":
+            return float(v.text)
+        if kind == "s":
+            return self._shared_string(int(v.text))
+        if kind == "b":
+            return float(v.text)
+        if kind == "e":
+            return None
+        # str（公式文本结果）、d（ISO日期）
+        return v.text
+
+    def read(
+        self,
+        sheet: Union[str, int],
+        start_row: int,
+        columns: Dict[str, int],
+        date_column: int = 0
+    ) -> Tuple[np.ndarray, Dict[int, str], Dict[str, np.ndarray]]:
+        """
+        读取区域
+
+        Args:
+            sheet: 工作表名称或序号
+            start_row: 开始行（从0开始，与 read_excel(header=None) 的行号一致）
+            columns: 字段名 -> 列序号（从0开始）
+            date_column: 日期列序号
+
+        Returns:
+            (日期列的Excel序列号数组（非数值为NaN）, 行号 -> 日期列文本, 字段名 -> float64 数组)，
+            行从 start_row 起连续排列，到工作表最后一行为止
+        """
+        first_row = start_row + 1  # Excel 行号从1开始
+        wanted = [(name, col) for name, col in columns.items()]
+        targets = [(col, column_letter(col)) for col in [date_column, *columns.values()]]
+
+        capacity = _INITIAL_CAPACITY
+        dates = np.full(capacity, np.nan)
+        values = {name: np.full(capacity, np.nan) for name in columns}
+        texts: Dict[int, str] = {}
+        last = -1
+
+        row_number = 0
+        skip = False
+        sheet_data = None
+        with self._zip.open(self._sheet_path(sheet)) as stream:
+            for event, elem in ET.iterparse(stream, events=("start", "end")):
+                tag = elem.tag
+                if event == "start":
+                    # 行号在开始标签上即可确定：起始行之前的行不取单元格
+                    if tag == _ROW:
+                        r = elem.get("r")
+                        row_number = int(r) if r else row_number + 1
+                        skip = row_number < first_row
+                    elif tag == _SHEET_DATA:
+                        sheet_data = elem
+                    continue
+
+                if tag == _DIMENSION:
+                    match = _REF.search(elem.get("ref", "").split(":")[-1])
+                    if match and int(match.group(2)) >= first_row:
+                        capacity = int(match.group(2)) - start_row
+                        dates = np.full(capacity, np.nan)
+                        values = {name: np.full(capacity, np.nan) for name in columns}
+                    continue
+                if tag != _ROW:
+                    continue
+                if skip:
+                    # 已解析的行从 sheetData 中移除，内存占用与行数无关
+                    sheet_data.clear()
+                    continue
+
+                i = row_number - first_row
+                if i >= capacity:
+                    capacity = max(capacity * 2, i + 1)
+                    dates = _grow(dates, capacity)
+                    values = {name: _grow(array, capacity) for name, array in values.items()}
+
+                cells = self._row_cells(elem, row_number, targets)
+                date_value = cells.get(date_column)
+                if isinstance(date_value, float):
+                    dates[i] = date_value
+                elif date_value is not None:
+                    texts[i] = date_value
+                for name, col in wanted:
+                    value = cells.get(col)
+                    if value is None:
+                        continue
+                    if isinstance(value, str):
+                        value = _to_float(value)
+                    values[name][i] = value
+                last = i
+                sheet_data.clear()
+
+        n = last + 1
+        return dates[:n], texts, {name: array[:n] for name, array in values.items()}
+
+    def _row_cells(self, row, row_number, targets) -> Dict[int, Union[float, str, None]]:
+        """
+        取一行中需要的单元格（列序号 -> 值）
+
+        单元格按列升序排列，第k列的单元格位于第k个或更靠前的位置（省略了空单元格时），
+        因此从第k个位置向前查找，通常第一次就命中
+        """
+        result = {}
+        n = len(row)
+        suffix = str(row_number)
+        for col, letter in targets:
+            k = min(col, n - 1)
+            while k >= 0:
+                cell = row[k]
+                ref = cell.get("r")
+                if ref is None:
+                    return self._row_cells_sequential(row, targets)
+                if ref == letter + suffix:
+                    result[col] = self._cell_value(cell)
+                    break
+                if column_index(_REF.match(ref).group(1)) < col:
+                    break  # 该列为空
+                k -= 1
+        return result
+
+    def _row_cells_sequential(self, row, targets) -> Dict[int, Union[float, str, None]]:
+        """单元格没有引用（r属性）时按顺序计列"""
+        needed = {col for col, _ in targets}
+        result = {}
+        position = -1
+        for cell in row:
+            ref = cell.get("r")
+            position = column_index(_REF.match(ref).group(1)) if ref else position + 1
+            if position in needed:
+                result[position] = self._cell_value(cell)
+        return result
+
+
+def _grow(array: np.ndarray, capacity: int) -> np.ndarray:
+    grown = np.full(capacity, np.nan)
+    grown[:len(array)] = array
+    return grown
+
+
+def _to_float(text: str) -> float:
+    """文本单元格按数值解析（与 pd.to_numeric(errors='coerce') 一致，无法解析时为NaN）"""
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+def excel_serial_to_datetime64(serials: np.ndarray, date1904: bool = False) -> np.ndarray:
+    """
+    Excel日期序列号 -> datetime64[D]（NaN 为 NaT）
+
+    1900日期系统中序列号60是不存在的1900-02-29，60以前的日期按Excel的约定向后偏移一天
+    """
+    days = np.floor(serials)
+    if date1904:
+        epoch = np.datetime64("1904-01-01", "D")
+    else:
+        epoch = np.datetime64("1899-12-30", "D")
+        days = np.where(days < 60, days + 1, days)
+    valid = ~np.isnan(days)
+    result = np.full(len(days), np.datetime64("NaT"), dtype="datetime64[D]")
+    result[valid] = epoch + days[valid].astype("int64")
+    return result
+
+
+def read_columns(
+    path,
+    sheet: Union[str, int],
+    start_row: int,
+    columns: Dict[str, int],
+    date_column: int = 0
+) -> Tuple[np.ndarray, Dict[int, str], Dict[str, np.ndarray], bool]:
+    """
+    读取工作表的指定列（见 XlsxColumnReader.read）
+
+    Returns:
+        (日期序列号数组, 行号 -> 日期文本, 字段名 -> float64 数组, 是否1904日期系统)
+    """
+    with XlsxColumnReader(path) as reader:
+        dates, texts, values = reader.read(sheet, start_row, columns, date_column)
+        return dates, texts, values, reader._date1904
@@ -2,9 +2,14 @@
 中银策略数据可视化平台 - FastAPI主应用
 """
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
 from .api import modules_router, bociasi_router, wind2x_router
+from .api.concurrency import concurrency_limiter
+from .api.instrumentation import request_metrics
+from .monitoring import registry
+from .services.executor import blocking_executor
 import logging
 
 # 配置日志
@@ -24,6 +29,13 @@ app = FastAPI(
     redoc_url="/api/redoc",
 )
 
+# 限制同时处理的API请求数，数据重新加载期间多余的请求排队或返回503
+# （先注册，CORS中间件在外层，503响应同样带CORS头）
+app.middleware("http")(concurrency_limiter)
+
+# 请求耗时统计（在并发限制外层，耗时包含排队时间）
+app.middleware("http")(request_metrics)
+
 # 配置CORS
 app.add_middleware(
     CORSMiddleware,
@@ -31,30 +43,64 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified"],
 )
 
-# 注册路由
 # 注册路由
 app.include_router(modules_router, prefix=settings.API_PREFIX)
 app.include_router(bociasi_router, prefix=settings.API_PREFIX)
 app.include_router(wind2x_router, prefix=settings.API_PREFIX)
 
 # --- 任务调度配置 ---
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
-from . import update_excel_wrapper  # Helper module we need to create to bridge imports
+# apscheduler 和更新任务只在获得调度锁的进程中导入（见 startup_event），其他worker不加载
+from .data.process_lock import scheduler_lock
+
+scheduler = None
 
-scheduler = BackgroundScheduler()
+
+def refresh_shared_dataset():
+    """主进程定期检查工作簿版本，变化后重新解析Excel并发布共享数据（在调度线程中运行）"""
+    import asyncio
+    from .data.workbook import get_workbook_generation
+    from .services.bociasi_service import bociasi_service
+    from .services.wind2x_service import wind2x_service
+
+    generation = get_workbook_generation()
+    if generation is None or generation == getattr(refresh_shared_dataset, "generation", None):
+        return
+
+    async def refresh():
+        await bociasi_service.warm_cache()
+        await wind2x_service.warm_cache()
+
+    asyncio.run(refresh())
+    refresh_shared_dataset.generation = generation
 
 @app.post("/api/admin/update")
 async def trigger_update():
     """手动触发数据更新（仅限本地环境使用）"""
     # Run in a separate thread to not block API
     import threading
+    from . import update_excel_wrapper
     thread = threading.Thread(target=update_excel_wrapper.run_update)
     thread.start()
     return {"status": "started", "message": "后台更新任务已启动，请稍候..."}
 
+@app.get("/api/admin/stats")
+async def runtime_stats():
+    """运行状态：阻塞任务队列深度、API并发情况和各模块预热耗时"""
+    from .api.modules import MODULE_REGISTRY
+    return {
+        "executor": blocking_executor.stats(),
+        "requests": concurrency_limiter.stats(),
+        "warmup_seconds": {key: m.warmup_seconds for key, m in MODULE_REGISTRY.items()},
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """运行指标（Prometheus文本格式）：请求耗时、缓存命中、数据加载、更新任务各阶段耗时"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/")
 async def root():
     """根路径"""
@@ -79,13 +125,37 @@ async def startup_event():
     logger.info(f"API文档: http://110.40.129.184:8000/api/docs")
     
     # 启动调度器
-    # 每天 18:00 自动运行更新
-    trigger = CronTrigger(hour=18, minute=0, timezone='Asia/Shanghai')
-    scheduler.add_job(update_excel_wrapper.run_update, trigger=trigger, id='daily_update')
-    scheduler.start()
-    logger.info("📅 每日自动更新任务已设定 (18:00 CST)")
+    # 多worker部署时只有获得调度锁的进程运行定时任务（并负责发布共享数据）
+    global scheduler
+    if scheduler_lock.acquire():
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from apscheduler.triggers.cron import CronTrigger
+        from apscheduler.triggers.interval import IntervalTrigger
+        from datetime import datetime
+        from . import update_excel_wrapper  # Helper module we need to create to bridge imports
+
+        scheduler = BackgroundScheduler()
+        # 每天 18:00 自动运行更新
+        trigger = CronTrigger(hour=18, minute=0, timezone='Asia/Shanghai')
+        scheduler.add_job(update_excel_wrapper.run_update, trigger=trigger, id='daily_update')
+        if settings.SHARED_DATASET:
+            # 立即执行一次：主进程的预热和首次发布都由该任务完成
+            scheduler.add_job(
+                refresh_shared_dataset,
+                trigger=IntervalTrigger(seconds=settings.SHARED_DATASET_REFRESH),
+                id='shared_dataset_refresh',
+                next_run_time=datetime.now(),
+                max_instances=1,
+                coalesce=True,
+            )
+        scheduler.start()
+        logger.info("📅 每日自动更新任务已设定 (18:00 CST)")
+    else:
+        logger.info("调度锁由其他worker持有，本进程不运行定时任务")
     
-    # 异步预热数据
+    # 异步预热数据（共享模式下主进程由 refresh_shared_dataset 预热，其他worker等待其发布）
+    if settings.SHARED_DATASET and scheduler_lock.held:
+        return
     from .services.bociasi_service import bociasi_service
     from .services.wind2x_service import wind2x_service
     import asyncio
@@ -97,6 +167,10 @@ async def startup_event():
 async def shutdown_event():
     """应用关闭事件"""
     logger.info(f"{settings.APP_NAME} 正在关闭")
+    if scheduler is not None and scheduler.running:
+        scheduler.shutdown(wait=False)
+    scheduler_lock.release()
+    blocking_executor.shutdown()
     # 清理资源
     from .data.wind_client import wind_client
     wind_client.close()
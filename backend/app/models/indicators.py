@@ -2,7 +2,7 @@
 指标数据模型定义
 """
 from pydantic import BaseModel, Field
-from typing import List, Optional, Literal
+from typing import Dict, List, Optional, Literal, Union
 from datetime import date
 
 
@@ -66,6 +66,32 @@ class IndicatorData(BaseModel):
     last_update: str = Field(..., description="最后更新时间")
 
 
+class PercentileHistory(BaseModel):
+    """滚动5年分位数历史走势"""
+    indicator_id: str = Field(..., description="指标ID")
+    dates: List[str] = Field(..., description="日期列表，格式：YYYY-MM-DD")
+    values: List[float] = Field(..., description="指标数值")
+    percentile_5y: List[float] = Field(..., description="当日数值在过去5年中的分位数（%）")
+
+
+class BatchIndicator(BaseModel):
+    """批量响应中的单个子指标"""
+    indicator_id: str = Field(..., description="指标ID")
+    indicator_name: str = Field(..., description="指标名称")
+    value_column: str = Field(..., description="value 取自底表的哪一列")
+    metrics: IndicatorMetrics = Field(..., description="统计指标")
+    last_update: str = Field(..., description="最后更新时间")
+
+
+class IndicatorBatch(BaseModel):
+    """多个子指标共享同一日期轴的批量响应"""
+    columns: List[str] = Field(..., description="底表数据列")
+    indicators: Dict[str, BatchIndicator] = Field(..., description="指标ID -> 指标信息")
+    data_points: List[Dict[str, Union[str, float]]] = Field(
+        ..., description="共享底表，每行包含 date 和非空的数据列"
+    )
+
+
 class IndicatorInfo(BaseModel):
     """指标信息模型"""
     id: str = Field(..., description="指标ID")
@@ -0,0 +1,325 @@
+"""
+运行指标（Prometheus文本格式）
+进程内的指标注册表，无需外部服务：API进程通过 /metrics 暴露，更新任务在同一进程中运行时也记录到这里
+
+多worker部署时每个进程各有一份指标，更新任务的指标只记录在运行该次更新的进程中
+"""
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+import math
+import threading
+import time
+
+# 默认直方图分桶（秒），覆盖缓存命中到整表解析
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 更新任务阶段耗时分桶（秒），Wind取数、重算公式、Git同步可能需要数分钟
+STAGE_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """指标基类：按标签值分组保存样本"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        """
+        Args:
+            name: 指标名
+            documentation: 说明（HELP）
+            labelnames: 标签名
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} 需要标签 {self.labelnames}，收到 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """只增计数器"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(_Metric):
+    """可设置的数值"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        """当前各标签组合的值"""
+        with self._lock:
+            return dict(self._values)
+
+    def _samples(self) -> List[str]:
+        items = sorted(self.values().items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class CallbackMetric(_Metric):
+    """抓取时才计算的指标（例如缓存条目数、数据年龄）"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...],
+        func: Callable[[], Dict[Tuple[str, ...], float]],
+        kind: str = "gauge"
+    ):
+        """
+        Args:
+            func: 返回 {标签值元组: 数值}
+            kind: gauge 或 counter
+        """
+        super().__init__(name, documentation, labelnames)
+        self.func = func
+        self.kind = kind
+
+    def _samples(self) -> List[str]:
+        items = sorted(self.func().items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Histogram(_Metric):
+    """分桶直方图"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # 标签值 -> [各桶计数（非累计）, 总和, 次数]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """记录 with 块的耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """
+        注册指标（同名指标重复注册时返回已有的实例）
+
+        Returns:
+            注册表中的指标
+        """
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...],
+        func: Callable[[], Dict[Tuple[str, ...], float]],
+        kind: str = "gauge"
+    ) -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, labelnames, func, kind))
+
+    def render(self) -> str:
+        """
+        输出Prometheus文本格式（0.0.4）
+
+        Returns:
+            全部指标文本
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class StageTimer:
+    """累计一次任务中各阶段的耗时（同一阶段可多次进入），结束时一次性记入直方图"""
+
+    def __init__(self, histogram: Histogram):
+        """
+        Args:
+            histogram: 以 stage 为标签的直方图
+        """
+        self.histogram = histogram
+        self.durations: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """记录 with 块的耗时，计入阶段 name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - start
+
+    def observe(self) -> Dict[str, float]:
+        """
+        把各阶段耗时记入直方图
+
+        Returns:
+            {阶段: 秒}
+        """
+        for name, seconds in self.durations.items():
+            self.histogram.observe(seconds, stage=name)
+        return dict(self.durations)
+
+
+# 全局指标注册表
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds",
+    "API请求耗时（到响应开始发送）",
+    ("method", "route", "status"),
+)
+WORKBOOK_RELOADS = registry.counter(
+    "workbook_reloads_total",
+    "数据重新加载次数（source=excel 解析工作簿，shared 挂载共享数据）",
+    ("module", "source"),
+)
+WORKBOOK_RELOAD_SECONDS = registry.histogram(
+    "workbook_reload_duration_seconds",
+    "数据重新加载耗时",
+    ("module", "source"),
+)
+DATA_GENERATION = registry.gauge(
+    "data_generation_timestamp_seconds",
+    "当前加载的数据版本（工作簿修改时间）",
+    ("module",),
+)
+UPDATER_STAGE_SECONDS = registry.histogram(
+    "updater_stage_duration_seconds",
+    "每日更新任务各阶段耗时",
+    ("stage",),
+    buckets=STAGE_BUCKETS,
+)
+UPDATER_RUNS = registry.counter(
+    "updater_runs_total",
+    "每日更新任务运行次数",
+    ("status",),
+)
+UPDATER_LAST_RUN = registry.gauge(
+    "updater_last_run_timestamp_seconds",
+    "每日更新任务最近一次结束时间",
+    ("status",),
+)
+
+
+def _data_age() -> Dict[Tuple[str, ...], float]:
+    now = time.time()
+    return {key: now - generation for key, generation in DATA_GENERATION.values().items()}
+
+
+registry.callback("data_age_seconds", "当前加载的数据距工作簿修改的时间", ("module",), _data_age)
@@ -3,7 +3,8 @@
 所有数据模块必须继承此基类，确保接口统一
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import List, Dict, Any, Optional
 from ..models.indicators import (
     ModuleInfo,
     IndicatorInfo,
@@ -11,6 +12,8 @@ from ..models.indicators import (
     IndicatorMetrics,
     DataPoint
 )
+from .columnar import ColumnarTable
+from ..monitoring import WORKBOOK_RELOADS, WORKBOOK_RELOAD_SECONDS, DATA_GENERATION
 
 
 class BaseDataModule(ABC):
@@ -29,6 +32,8 @@ class BaseDataModule(ABC):
         self.module_name = module_name
         self.description = description
         self._indicators: List[IndicatorInfo] = []
+        # 最近一次预热耗时（秒），尚未预热时为None
+        self.warmup_seconds: Optional[float] = None
     
     @abstractmethod
     def initialize(self) -> None:
@@ -45,7 +50,7 @@ class BaseDataModule(ABC):
         start_date: str = None,
         end_date: str = None,
         **kwargs
-    ) -> IndicatorData:
+    ) -> Dict[str, Any]:
         """
         获取指标数据
         
@@ -56,7 +61,7 @@ class BaseDataModule(ABC):
             **kwargs: 其他参数
             
         Returns:
-            IndicatorData: 指标数据
+            与 IndicatorData 结构相同的字典（服务内部使用 DataRow，接口的 response_model 负责校验和序列化）
         """
         pass
     
@@ -76,6 +81,81 @@ class BaseDataModule(ABC):
         """
         pass
     
+    def get_generation(self) -> Optional[float]:
+        """
+        获取模块当前的数据版本
+        用于生成ETag/Last-Modified，版本不变则响应内容不变
+        
+        Returns:
+            数据版本（数据源修改时间戳），无数据源时返回None
+        """
+        from ..data.workbook import get_workbook_generation
+        return get_workbook_generation()
+    
+    def get_last_update(self) -> str:
+        """
+        获取数据最后更新时间（取自数据版本，保证同一版本的响应内容一致）
+        
+        Returns:
+            时间字符串，格式：YYYY-MM-DD HH:MM:SS
+        """
+        generation = self.get_generation()
+        moment = datetime.fromtimestamp(generation) if generation else datetime.now()
+        return moment.strftime('%Y-%m-%d %H:%M:%S')
+    
+    def uses_shared_data(self) -> bool:
+        """多进程共享模式下，当前进程是否从主进程挂载数据（而不是自行解析Excel）"""
+        from ..config import settings
+        from ..data.process_lock import scheduler_lock
+        return settings.SHARED_DATASET and not scheduler_lock.held
+    
+    def is_shared_publisher(self) -> bool:
+        """多进程共享模式下，当前进程是否负责发布数据"""
+        from ..config import settings
+        from ..data.process_lock import scheduler_lock
+        return settings.SHARED_DATASET and scheduler_lock.held
+    
+    def attach_shared_data(self, generation: float) -> Optional[ColumnarTable]:
+        """
+        挂载主进程发布的共享数据
+        
+        响应的ETag取自工作簿版本，因此不能继续使用旧版本数据，而是等待主进程发布新版本
+        （阻塞，在线程池中调用）
+        
+        Args:
+            generation: 数据版本
+            
+        Returns:
+            列式数据表（内存映射），等待超时返回None
+        """
+        from ..config import settings
+        from ..data.shared_dataset import shared_dataset
+        return shared_dataset.wait_for(self.module_id, generation, settings.SHARED_DATASET_WAIT)
+    
+    def publish_shared_data(self, generation: float, table: ColumnarTable) -> ColumnarTable:
+        """
+        发布共享数据（主进程调用）
+        
+        Returns:
+            发布后的内存映射数据表，本进程也改用它，与其他worker共享同一份页缓存
+        """
+        from ..data.shared_dataset import shared_dataset
+        shared_dataset.publish(self.module_id, generation, table)
+        return shared_dataset.attach(self.module_id, generation) or table
+    
+    def record_reload(self, source: str, seconds: float, generation: float) -> None:
+        """
+        记录一次数据重新加载（/metrics 中的加载次数、耗时和数据版本）
+        
+        Args:
+            source: excel（解析工作簿）或 shared（挂载共享数据）
+            seconds: 耗时（秒）
+            generation: 加载的数据版本
+        """
+        WORKBOOK_RELOADS.inc(module=self.module_id, source=source)
+        WORKBOOK_RELOAD_SECONDS.observe(seconds, module=self.module_id, source=source)
+        DATA_GENERATION.set(generation, module=self.module_id)
+    
     def register_indicator(
         self,
         indicator_id: str,
@@ -1,17 +1,53 @@
 """
 BOCIASI A股情绪指标模块服务
 """
-from typing import List
-from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Tuple
+from datetime import datetime
 import numpy as np
 from .base_module import BaseDataModule
-from ..models.indicators import IndicatorData, IndicatorMetrics, DataPoint
+from .metrics_engine import MetricsEngine, MetricSeries
+from .columnar import ColumnarTable
+from .executor import blocking_executor
+from ..models.indicators import IndicatorMetrics, PercentileHistory
+from .rows import DataRow, rows_from_table, iter_rows_from_table
 from ..data.wind_client import wind_client
 from ..data.cache import cache
+from ..data.workbook import load_sheet_columns
 import logging
+import time
+import threading
 
 logger = logging.getLogger(__name__)
 
+# 子指标ID -> 作为 value 的数据列
+VALUE_COLUMNS = {
+    "overview": "slow_line",
+    "equity_premium": "equity_premium",
+    "eb_position_gap": "eb_position_gap",
+    "eb_yield_gap": "eb_yield_gap",
+    "margin_balance": "margin_balance",
+    "slow_line": "slow_line",
+    "ma20": "ma20",
+    "turnover": "turnover",
+    "up_down_ratio": "up_down_ratio",
+    "rsi": "rsi",
+    "fast_line": "fast_line",
+}
+
+# 所有子指标共享的底表列（Excel中读取的BOCIASI字段，不含 value 和 ERP 专用字段）
+TABLE_COLUMNS = [
+    "close", "equity_premium", "eb_position_gap", "eb_yield_gap", "margin_balance",
+    "turnover", "up_down_ratio", "ma20", "rsi", "fast_line", "slow_line", "di_signal",
+    "line_green", "line_black", "line_yellow",
+    "slow_threshold_1", "slow_threshold_0", "slow_threshold_neg1",
+    "marker_red", "marker_green",
+    "fast_threshold_1", "fast_threshold_0", "fast_threshold_neg1",
+    "marker_fast_buy", "marker_fast_sell",
+]
+
+# 没有数据（Excel不存在或读取失败）时使用的空表
+_EMPTY_TABLE = ColumnarTable.empty(TABLE_COLUMNS)
+
 
 class BOCIASIService(BaseDataModule):
     """BOCIASI A股情绪指标服务"""
@@ -23,15 +59,20 @@ class BOCIASIService(BaseDataModule):
             description="中银国际证券A股情绪综合指标体系"
         )
         self.initialize()
-        self._cache = {} # indicator_id -> List[DataPoint]
+        self._cache = {} # 'table' -> 全量数据的列式表
         self._last_file_mtime = 0
         self._last_fetch_time = None
+        self._reload_lock = threading.Lock()
+        # 情绪低位为机会，高位需谨慎
+        self._metrics_engine = MetricsEngine(low_status="Attractive", high_status="Caution")
     
     async def warm_cache(self) -> None:
         """启动预热缓存"""
         logger.info("正在执行 BOCIASI 数据预热...")
+        start = time.perf_counter()
         await self._get_buffered_data()
-        logger.info("BOCIASI 数据预热完成")
+        self.warmup_seconds = time.perf_counter() - start
+        logger.info(f"BOCIASI 数据预热完成，耗时 {self.warmup_seconds:.2f} 秒")
 
     def initialize(self) -> None:
         """注册所有子指标"""
@@ -54,7 +95,7 @@ class BOCIASIService(BaseDataModule):
         start_date: str = None,
         end_date: str = None,
         **kwargs
-    ) -> IndicatorData:
+    ) -> dict:
         """
         获取指标数据
         
@@ -64,14 +105,14 @@ class BOCIASIService(BaseDataModule):
             end_date: 结束日期
             
         Returns:
-            IndicatorData: 指标数据
+            与 IndicatorData 结构相同的字典（由接口的 response_model 校验和序列化）
         """
-        # 检查缓存
-        cache_key = f"bociasi_{indicator_id}_{start_date}_{end_date}"
+        # 检查缓存（键包含数据版本：工作簿更新后不再返回旧版本的响应，ETag与内容保持一致）
+        cache_key = f"bociasi_{indicator_id}_{start_date}_{end_date}_{self.get_generation()}"
         cached_data = cache.get(cache_key)
         if cached_data:
             logger.info(f"从缓存获取数据: {cache_key}")
-            return IndicatorData(**cached_data)
+            return cached_data
         
         # 获取指标信息
         indicator_info = self.get_indicator(indicator_id)
@@ -88,23 +129,96 @@ class BOCIASIService(BaseDataModule):
         # 从Wind获取数据
         data_points = await self._fetch_from_wind(indicator_id, start_date, end_date)
         
-        # 计算统计指标
-        metrics = await self._calculate_metrics(indicator_id, data_points)
+        # 计算统计指标（在请求的日期范围内）
+        series = await self._get_metric_series(indicator_id)
+        metrics = self._format_metrics(series.range_stats(start_date, end_date))
         
         # 构建响应
-        result = IndicatorData(
-            indicator_id=indicator_id,
-            indicator_name=indicator_info.name,
-            data_points=data_points,
-            metrics=metrics,
-            last_update=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        )
+        result = {
+            "indicator_id": indicator_id,
+            "indicator_name": indicator_info.name,
+            "data_points": data_points,
+            "metrics": metrics.model_dump(),
+            "last_update": self.get_last_update(),
+        }
         
         # 缓存数据
-        cache.set(cache_key, result.dict())
+        cache.set(cache_key, result)
         
         return result
     
+    async def fetch_indicator_stream(
+        self,
+        indicator_id: str,
+        start_date: str = None,
+        end_date: str = None
+    ) -> Tuple[Dict, Iterator[Dict]]:
+        """
+        流式导出指标数据：返回头信息和惰性的数据行迭代器，不构建完整的 IndicatorData
+        
+        Args:
+            indicator_id: 指标ID
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Returns:
+            (头信息, 数据行迭代器)，数据行省略空值字段
+        """
+        header, start_date, end_date = await self._export_header(indicator_id, start_date, end_date)
+        table = (await self._get_buffered_data()).slice(start_date, end_date)
+        value_column = VALUE_COLUMNS[indicator_id]
+        
+        def rows():
+            # 数据行按块构建，不为整个区间创建对象
+            for dp in iter_rows_from_table(table):
+                row = dp.to_dict(exclude_none=True)
+                value = getattr(dp, value_column)
+                row['value'] = value if value is not None else 0
+                yield row
+        
+        return header, rows()
+    
+    async def fetch_indicator_columns(
+        self,
+        indicator_id: str,
+        start_date: str = None,
+        end_date: str = None
+    ) -> Tuple[Dict, ColumnarTable]:
+        """
+        列式导出指标数据（用于二进制/Arrow响应）
+        
+        Args:
+            indicator_id: 指标ID
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Returns:
+            (头信息, 列式数据表)，value 列与子指标对应的列共享同一数组，空值为 NaN
+        """
+        header, start_date, end_date = await self._export_header(indicator_id, start_date, end_date)
+        table = (await self._get_buffered_data()).slice(start_date, end_date)
+        return header, table.with_column("value", VALUE_COLUMNS[indicator_id])
+    
+    async def _export_header(self, indicator_id: str, start_date: str, end_date: str) -> Tuple[Dict, str, str]:
+        """导出接口的头信息（指标名称、统计指标、更新时间），同时补全默认日期范围"""
+        indicator_info = self.get_indicator(indicator_id)
+        if not indicator_info:
+            raise ValueError(f"指标不存在: {indicator_id}")
+        
+        if not end_date:
+            end_date = datetime.now().strftime('%Y-%m-%d')
+        if not start_date:
+            start_date = "2016-01-01"
+        
+        series = await self._get_metric_series(indicator_id)
+        header = {
+            "indicator_id": indicator_id,
+            "indicator_name": indicator_info.name,
+            "metrics": self._format_metrics(series.range_stats(start_date, end_date)).model_dump(),
+            "last_update": self.get_last_update(),
+        }
+        return header, start_date, end_date
+    
     async def fetch_indicator_metrics(
         self,
         indicator_id: str
@@ -118,21 +232,62 @@ class BOCIASIService(BaseDataModule):
         Returns:
             IndicatorMetrics: 统计指标
         """
-        # 获取最近5年数据
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        start_date = (datetime.now() - timedelta(days=5*365)).strftime('%Y-%m-%d')
+        if not self.get_indicator(indicator_id):
+            raise ValueError(f"指标不存在: {indicator_id}")
         
-        data = await self.fetch_indicator_data(indicator_id, start_date, end_date)
-        return data.metrics
+        # 最新一天的滚动5年统计，直接查表
+        series = await self._get_metric_series(indicator_id)
+        return self._format_metrics(series.latest())
+    
+    async def fetch_percentile_history(
+        self,
+        indicator_id: str,
+        start_date: str = None,
+        end_date: str = None
+    ) -> PercentileHistory:
+        """
+        获取指标滚动5年分位数的历史走势
+        
+        Args:
+            indicator_id: 指标ID
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            
+        Returns:
+            PercentileHistory: 分位数历史
+        """
+        if not self.get_indicator(indicator_id):
+            raise ValueError(f"指标不存在: {indicator_id}")
+        
+        series = await self._get_metric_series(indicator_id)
+        return PercentileHistory(indicator_id=indicator_id, **series.history(start_date, end_date))
+    
+    async def _get_metric_series(self, indicator_id: str) -> MetricSeries:
+        """获取指标的全历史统计序列（每个数据版本只计算一次）"""
+        table = await self._get_buffered_data()
+        column = VALUE_COLUMNS[indicator_id]
+        
+        def load():
+            # 直接使用列式表的日期列，空值按0计算
+            values = table.columns[column]
+            return table.dates, np.where(np.isnan(values), 0.0, values)
+        
+        series = self._metrics_engine.peek(indicator_id, self._last_file_mtime)
+        if series is None:
+            # 全历史滚动统计在线程池中计算
+            series = await blocking_executor.run(
+                self._metrics_engine.get, indicator_id, self._last_file_mtime, load
+            )
+        return series
     
     async def _fetch_from_wind(
         self,
         indicator_id: str,
         start_date: str,
         end_date: str
-    ) -> List[DataPoint]:
+    ) -> List[dict]:
         """
-        从Wind/Excel获取数据
+        从Wind/Excel获取数据（数据点字典，字段与 DataPoint 相同）
         """
         # 从Excel读取指示器 (所有BOCIASI子指标)
         return await self._fetch_indicator_from_excel(indicator_id, start_date, end_date)
@@ -159,54 +314,106 @@ class BOCIASIService(BaseDataModule):
             end_date=end_date
         )
         
-        # 转换为DataPoint格式
-        data_points = [DataPoint(**item) for item in raw_data]
+        # 转换为数据点字典
+        data_points = [DataRow(**item).to_dict() for item in raw_data]
         
         return data_points
         
-    async def _fetch_indicator_from_excel(self, indicator_id: str, start_date: str, end_date: str) -> List[DataPoint]:
-        """从Excel读取所有指标数据"""
-        all_data = await self._get_buffered_data()
-        if not all_data: return []
-        
-        filtered = []
-        for dp in all_data:
-            # 数据复制优化：使用 copy 并同时更新 fields
-            update_dict = {}
-            if indicator_id == "slow_line":
-                update_dict['value'] = dp.slow_line if dp.slow_line is not None else 0
-            elif indicator_id == "fast_line":
-                update_dict['value'] = dp.fast_line if dp.fast_line is not None else 0
-            elif indicator_id == "equity_premium":
-                update_dict['value'] = dp.equity_premium if dp.equity_premium is not None else 0
-            elif indicator_id == "eb_position_gap":
-                update_dict['value'] = dp.eb_position_gap if dp.eb_position_gap is not None else 0
-            elif indicator_id == "eb_yield_gap":
-                update_dict['value'] = dp.eb_yield_gap if dp.eb_yield_gap is not None else 0
-            elif indicator_id == "margin_balance":
-                update_dict['value'] = dp.margin_balance if dp.margin_balance is not None else 0
-            elif indicator_id == "ma20":
-                update_dict['value'] = dp.ma20 if dp.ma20 is not None else 0
-            elif indicator_id == "turnover":
-                update_dict['value'] = dp.turnover if dp.turnover is not None else 0
-            elif indicator_id == "up_down_ratio":
-                update_dict['value'] = dp.up_down_ratio if dp.up_down_ratio is not None else 0
-            elif indicator_id == "rsi":
-                update_dict['value'] = dp.rsi if dp.rsi is not None else 0
-            elif indicator_id == "overview":
-                update_dict['value'] = dp.slow_line if dp.slow_line is not None else 0
+    async def _fetch_indicator_from_excel(self, indicator_id: str, start_date: str, end_date: str) -> List[dict]:
+        """从Excel读取所有指标数据（数据点字典，value 取自子指标对应的列）"""
+        table = (await self._get_buffered_data()).slice(start_date, end_date)
+        if not len(table): return []
+        
+        value_column = VALUE_COLUMNS.get(indicator_id)
+        
+        def build():
+            filtered = []
+            for dp in rows_from_table(table):
+                row = dp.to_dict()
+                if value_column:
+                    value = getattr(dp, value_column)
+                    row['value'] = value if value is not None else 0.0
+                filtered.append(row)
+            return filtered
+        
+        # 只为请求的日期范围构建数据行，在线程池中进行
+        return await blocking_executor.run(build)
+
+    async def fetch_table(self, start_date: str, end_date: str) -> ColumnarTable:
+        """
+        获取所有子指标共享的底表（不复制、不填充 value）
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
             
-            # 使用 copy(update=...) 避免先复制再赋值
-            new_dp = dp.copy(update=update_dict)
+        Returns:
+            日期范围内的列式表（视图）
+        """
+        return (await self._get_buffered_data()).slice(start_date, end_date)
+
+    async def fetch_batch(
+        self,
+        indicator_ids: List[str] = None,
+        start_date: str = None,
+        end_date: str = None
+    ) -> dict:
+        """
+        批量获取多个子指标：共享同一张底表和日期轴，每个子指标只返回 value 列名和统计指标
+        
+        Args:
+            indicator_ids: 指标ID列表（为空时返回全部子指标）
+            start_date: 开始日期
+            end_date: 结束日期
             
-            if start_date and new_dp.date < start_date: continue
-            if end_date and new_dp.date > end_date: continue
-            filtered.append(new_dp)
-        return filtered
+        Returns:
+            {"columns", "indicators", "data_points"}，与静态快照的 BOCIASI 分片格式相同
+        """
+        if not indicator_ids:
+            indicator_ids = list(VALUE_COLUMNS)
+        for indicator_id in indicator_ids:
+            if not self.get_indicator(indicator_id):
+                raise ValueError(f"指标不存在: {indicator_id}")
+        
+        # 默认日期范围与 fetch_indicator_data 一致
+        if not end_date:
+            end_date = datetime.now().strftime('%Y-%m-%d')
+        if not start_date:
+            start_date = "2016-01-01"
+        
+        # 键包含数据版本，见 fetch_indicator_data
+        cache_key = f"bociasi_batch_{','.join(indicator_ids)}_{start_date}_{end_date}_{self.get_generation()}"
+        cached_data = cache.get(cache_key)
+        if cached_data:
+            logger.info(f"从缓存获取数据: {cache_key}")
+            return cached_data
+        
+        table = await self.fetch_table(start_date, end_date)
+        last_update = self.get_last_update()
+        
+        indicators = {}
+        for indicator_id in indicator_ids:
+            series = await self._get_metric_series(indicator_id)
+            indicators[indicator_id] = {
+                "indicator_id": indicator_id,
+                "indicator_name": self.get_indicator(indicator_id).name,
+                "value_column": VALUE_COLUMNS[indicator_id],
+                "metrics": self._format_metrics(series.range_stats(start_date, end_date)).model_dump(),
+                "last_update": last_update,
+            }
+        
+        result = {
+            "columns": TABLE_COLUMNS,
+            "indicators": indicators,
+            "data_points": await blocking_executor.run(
+                lambda: [dp.to_dict(include={'date', *TABLE_COLUMNS}, exclude_none=True) for dp in rows_from_table(table)]
+            ),
+        }
+        cache.set(cache_key, result)
+        return result
 
-    async def _get_buffered_data(self) -> List[DataPoint]:
-        """获取带缓存的Excel数据，显著提升加载速度"""
-        import pandas as pd
+    async def _get_buffered_data(self) -> ColumnarTable:
+        """获取带缓存的Excel数据（列式表，共享数据模式下为各进程共享的内存映射），显著提升加载速度"""
         from pathlib import Path
         import os
         from config import EXCEL_PATH
@@ -214,104 +421,100 @@ class BOCIASIService(BaseDataModule):
         try:
             excel_path = Path(EXCEL_PATH)
             if not excel_path.exists():
-                return []
+                return _EMPTY_TABLE
             
             mtime = os.path.getmtime(excel_path)
-            if mtime == self._last_file_mtime and self._cache.get('all_points'):
+            if mtime == self._last_file_mtime and 'table' in self._cache:
                 # 只要文件没变，就一直使用内存缓存，不需要每5分钟重读
-                return self._cache['all_points']
+                return self._cache['table']
+        except OSError as e:
+            logger.error(f"Buffered Excel read error: {str(e)}")
+            return self._cache.get('table', _EMPTY_TABLE)
+        
+        # 解析在线程池中进行，不阻塞事件循环
+        return await blocking_executor.run(self._reload, excel_path, mtime)
 
-            logger.info(f"正在全量调取Excel数据: {excel_path}")
-            # A=0, C=2
-            # AF=31, AL=37, BA=52, BN=65, CP=93, CB=79, CM=90, CS=96
-            # DC=106, DD=107, DJ=113, DK=114, DL=115, EN=143, EO=144, EV=151, EW=152
-            cols_to_read = [
-                0, 2, 31, 37, 52, 65, 79, 90, 93, 96, 
-                106, 107, 112, 113, 114, 115, 137, 138, 139, 143, 144, 145, 146, 147, 151, 152
-            ]
-            
-            from config import EXCEL_PATH, SHEET_NAME
-            
-            df = pd.read_excel(excel_path, sheet_name=SHEET_NAME, header=None, usecols=cols_to_read)
-            START_ROW_INDEX = 2193
-            if len(df) <= START_ROW_INDEX: return []
-            
-            all_points = []
-            data_subset = df.iloc[START_ROW_INDEX:].values
-            
-            # 由于列是按升序读取的，我们需要精确映射 numpy row 索引
-            # 0:date(A), 1:close(C), 2:equity(AF), 3:pos(AL), 4:yield(BA), 5:margin(BN), 6:turnover(CB)
-            # 7:updown(CM), 8:ma20(CP), 9:rsi(CS), 10:fast(DC), 11:slow(DD), 12:di(DI)
-            # 13:green(DJ), 14:black(DK), 15:yellow(DL), 16:eh, 17:ei, 18:ej, 19:en, 20:eo, 21:ep, 22:eq, 23:er, 24:ev, 25:ew
+    def _reload(self, excel_path, mtime: float) -> ColumnarTable:
+        """重新加载数据（同一时间只加载一次，并发的调用等待并复用这次加载的结果）"""
+        with self._reload_lock:
+            if mtime == self._last_file_mtime and 'table' in self._cache:
+                return self._cache['table']
             
-            for row in data_subset:
-                date_val = row[0]
-                if pd.isna(date_val): continue
+            try:
+                start = time.perf_counter()
+                table = None
+                if self.uses_shared_data():
+                    table = self.attach_shared_data(mtime)
+                    if table is None:
+                        logger.warning("等待共享数据超时，本进程自行解析Excel")
                 
-                try: 
-                    if isinstance(date_val, datetime): d_str = date_val.strftime('%Y-%m-%d')
-                    else: d_str = pd.to_datetime(date_val).strftime('%Y-%m-%d')
-                except: continue
+                source = "shared" if table is not None else "excel"
+                if table is None:
+                    table = self._parse_excel(excel_path)
+                    if not len(table):
+                        return table
+                    if self.is_shared_publisher():
+                        # 发布后改用共享的内存映射，与其他进程共用同一份数据
+                        table = self.publish_shared_data(mtime, table)
                 
-                def f(idx):
-                    if idx >= len(row): return None
-                    v = row[idx]
-                    if v == "#N/A" or pd.isna(v): return None
-                    try: return float(v)
-                    except: return None
- 
-                dp = DataPoint(
-                    date=d_str,
-                    value=0,
-                    close=f(1),            # C
-                    equity_premium=f(2),   # AF
-                    eb_position_gap=f(3),  # AL
-                    eb_yield_gap=f(4),     # BA
-                    margin_balance=f(5),   # BN
-                    turnover=f(6),         # CB
-                    up_down_ratio=f(7),    # CM
-                    ma20=f(8),             # CP
-                    rsi=f(9),              # CS
-                    fast_line=f(10),       # DC
-                    slow_line=f(11),       # DD
-                    di_signal=f(12),       # DI
-                    line_green=f(13),      # DJ
-                    line_black=f(14),      # DK
-                    line_yellow=f(15),     # DL
-                    slow_threshold_1=f(16),    # EH
-                    slow_threshold_0=f(17),    # EI
-                    slow_threshold_neg1=f(18), # EJ
-                    marker_red=f(19),      # EN
-                    marker_green=f(20),    # EO
-                    fast_threshold_1=f(21),    # EP
-                    fast_threshold_0=f(22),    # EQ
-                    fast_threshold_neg1=f(23), # ER
-                    marker_fast_buy=f(24), # EV
-                    marker_fast_sell=f(25) # EW
-                )
-                all_points.append(dp)
-            
-            all_points.sort(key=lambda x: x.date)
-            self._cache['all_points'] = all_points
-            self._last_file_mtime = mtime
-            self._last_fetch_time = datetime.now()
-            return all_points
-            
-        except Exception as e:
-            logger.error(f"Buffered Excel read error: {str(e)}")
-            return self._cache.get('all_points', [])
+                self._cache['table'] = table
+                self._last_file_mtime = mtime
+                # 响应缓存的键包含数据版本，旧版本的条目不会再被读取，在这里删除
+                cache.delete_prefix("bociasi_")
+                self.record_reload(source, time.perf_counter() - start, mtime)
+                self._last_fetch_time = datetime.now()
+                return table
+                
+            except Exception as e:
+                logger.error(f"Buffered Excel read error: {str(e)}")
+                return self._cache.get('table', _EMPTY_TABLE)
+
+    def _parse_excel(self, excel_path) -> ColumnarTable:
+        """解析Excel中的BOCIASI数据为列式表（阻塞）"""
+        from config import SHEET_NAME
+        
+        logger.info(f"正在全量调取Excel数据: {excel_path}")
+        START_ROW_INDEX = 2193
+        # 字段 -> 工作表列序号（A=0），第0列为日期
+        dates, columns = load_sheet_columns(excel_path, SHEET_NAME, START_ROW_INDEX, {
+            "close": 2,                  # C
+            "equity_premium": 31,        # AF
+            "eb_position_gap": 37,       # AL
+            "eb_yield_gap": 52,          # BA
+            "margin_balance": 65,        # BN
+            "turnover": 79,              # CB
+            "up_down_ratio": 90,         # CM
+            "ma20": 93,                  # CP
+            "rsi": 96,                   # CS
+            "fast_line": 106,            # DC
+            "slow_line": 107,            # DD
+            "di_signal": 112,            # DI
+            "line_green": 113,           # DJ
+            "line_black": 114,           # DK
+            "line_yellow": 115,          # DL
+            "slow_threshold_1": 137,     # EH
+            "slow_threshold_0": 138,     # EI
+            "slow_threshold_neg1": 139,  # EJ
+            "marker_red": 143,           # EN
+            "marker_green": 144,         # EO
+            "fast_threshold_1": 145,     # EP
+            "fast_threshold_0": 146,     # EQ
+            "fast_threshold_neg1": 147,  # ER
+            "marker_fast_buy": 151,      # EV
+            "marker_fast_sell": 152,     # EW
+        })
+        return ColumnarTable(
+            np.array(dates, dtype='datetime64[D]'),
+            {name: columns[name] for name in TABLE_COLUMNS}
+        )
 
-    async def _fetch_overview_from_excel(self, start_date: str, end_date: str) -> List[DataPoint]:
+    async def _fetch_overview_from_excel(self, start_date: str, end_date: str) -> List[dict]:
         """由于逻辑统一，该方法可重定向"""
         return await self._fetch_indicator_from_excel("overview", start_date, end_date)
     
-    async def _calculate_metrics(
-        self,
-        indicator_id: str,
-        data_points: List[DataPoint]
-    ) -> IndicatorMetrics:
-        """计算统计指标"""
-        if not data_points:
+    def _format_metrics(self, stats: dict) -> IndicatorMetrics:
+        """把统计引擎的结果格式化为响应模型"""
+        if not stats:
             return IndicatorMetrics(
                 current_value="N/A",
                 percentile_5y="N/A",
@@ -320,31 +523,11 @@ class BOCIASIService(BaseDataModule):
                 description="暂无数据"
             )
         
-        # 提取数值
-        values = [dp.value for dp in data_points]
-        current_value = values[-1]
-        
-        # 计算5年分位数
-        percentile = (np.sum(np.array(values) <= current_value) / len(values)) * 100
-        
-        # 计算周变化
-        if len(values) >= 5 and values[-5] != 0 and values[-5] is not None:
-            weekly_change = ((current_value - values[-5]) / values[-5]) * 100
-        else:
-            weekly_change = 0
-        
-        # 判断状态
-        if percentile < 30:
-            status = "Attractive"
-        elif percentile > 70:
-            status = "Caution"
-        else:
-            status = "Neutral"
-        
+        status = stats["status"]
         return IndicatorMetrics(
-            current_value=f"{current_value:.2f}",
-            percentile_5y=f"{percentile:.1f}%",
-            change_weekly=f"{weekly_change:+.2f}%",
+            current_value=f"{stats['current']:.2f}",
+            percentile_5y=f"{stats['percentile']:.1f}%",
+            change_weekly=f"{stats['weekly_change']:+.2f}%",
             status=status,
             description=self._get_status_description(status)
         )
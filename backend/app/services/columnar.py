@@ -0,0 +1,73 @@
+"""
+列式数据表
+每个数据版本把数据点转换一次为 numpy 列（日期为 datetime64[D]，数值为 float64，空值为 NaN），
+按日期范围切片只是视图，二进制/Arrow 响应直接使用这些数组，无需逐行编码
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+
+class ColumnarTable:
+    """日期索引的列式数据表"""
+
+    def __init__(self, dates: np.ndarray, columns: Dict[str, np.ndarray]):
+        """
+        Args:
+            dates: 升序日期数组（datetime64[D]）
+            columns: 列名 -> 与日期等长的 float64 数组
+        """
+        self.dates = dates
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @classmethod
+    def empty(cls, fields: Iterable[str]) -> "ColumnarTable":
+        """没有数据行的表"""
+        return cls(np.array([], dtype='datetime64[D]'), {name: np.array([], dtype=float) for name in fields})
+
+    @classmethod
+    def from_points(cls, points: List, fields: Iterable[str]) -> "ColumnarTable":
+        """
+        从数据点列表构建
+
+        Args:
+            points: 按日期升序的数据点（具有 date 和 fields 属性）
+            fields: 需要的数值字段
+
+        Returns:
+            ColumnarTable
+        """
+        n = len(points)
+        dates = np.array([p.date for p in points], dtype='datetime64[D]')
+        columns = {}
+        for field in fields:
+            columns[field] = np.fromiter(
+                (np.nan if v is None else v for v in (getattr(p, field) for p in points)),
+                dtype=float, count=n
+            )
+        return cls(dates, columns)
+
+    def _bounds(self, start_date: Optional[str], end_date: Optional[str]) -> Tuple[int, int]:
+        """日期范围对应的下标区间 [lo, hi)"""
+        lo = np.searchsorted(self.dates, np.datetime64(start_date, 'D'), side='left') if start_date else 0
+        hi = np.searchsorted(self.dates, np.datetime64(end_date, 'D'), side='right') if end_date else len(self)
+        return int(lo), int(hi)
+
+    def slice(self, start_date: Optional[str], end_date: Optional[str]) -> "ColumnarTable":
+        """按日期范围切片（不复制数据）"""
+        return self.take(*self._bounds(start_date, end_date))
+
+    def take(self, lo: int, hi: int) -> "ColumnarTable":
+        """按下标区间 [lo, hi) 切片（不复制数据）"""
+        return ColumnarTable(
+            self.dates[lo:hi],
+            {name: values[lo:hi] for name, values in self.columns.items()}
+        )
+
+    def with_column(self, name: str, source: str) -> "ColumnarTable":
+        """增加一个与已有列共享数组的别名列（如 value 指向子指标对应的列）"""
+        columns = {name: self.columns[source]}
+        columns.update((k, v) for k, v in self.columns.items() if k != name)
+        return ColumnarTable(self.dates, columns)
@@ -0,0 +1,93 @@
+"""
+阻塞任务执行器
+Excel解析、逐行转换、统计计算等阻塞工作放到独立线程池中执行，事件循环始终可以响应其他请求
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+import asyncio
+import threading
+import time
+
+from ..config import settings
+
+
+class BlockingExecutor:
+    """带排队统计的线程池"""
+
+    def __init__(self, max_workers: int):
+        """
+        Args:
+            max_workers: 线程数
+        """
+        self.max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._max_queued = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="blocking")
+            return self._pool
+
+    async def run(self, func: Callable, *args):
+        """
+        在线程池中执行阻塞函数并等待结果
+
+        Args:
+            func: 阻塞函数
+            *args: 参数
+
+        Returns:
+            函数返回值
+        """
+        submitted = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_total += started - submitted
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._run_total += time.perf_counter() - started
+
+        return await asyncio.get_running_loop().run_in_executor(self._get_pool(), task)
+
+    def stats(self) -> Dict:
+        """当前队列深度和累计耗时"""
+        with self._lock:
+            completed = self._completed or 1
+            return {
+                "max_workers": self.max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "max_queued": self._max_queued,
+                "completed": self._completed,
+                "avg_wait_ms": round(self._wait_total / completed * 1000, 2),
+                "avg_run_ms": round(self._run_total / completed * 1000, 2),
+            }
+
+    def shutdown(self) -> None:
+        """关闭线程池"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+
+# 全局执行器实例
+blocking_executor = BlockingExecutor(settings.EXECUTOR_WORKERS)
@@ -0,0 +1,184 @@
+"""
+指标统计引擎
+每个数据版本（工作簿generation）只计算一次，一次性得到整段历史上每一天的
+滚动5年分位数、周变化和状态，统计请求只是数组查表
+"""
+from typing import Callable, Dict, Optional, Tuple
+import numpy as np
+from .rolling_rank import rolling_percentile
+
+# 5年滚动窗口（与原先 now - 5*365 天的口径一致）
+FIVE_YEARS_DAYS = 5 * 365
+# 周变化：与5个交易日前（含当日共5个点）比较
+WEEKLY_LAG = 4
+
+
+class MetricSeries:
+    """单个指标的全历史统计序列"""
+
+    def __init__(
+        self,
+        dates: np.ndarray,
+        values: np.ndarray,
+        window_days: int,
+        low_status: str,
+        high_status: str
+    ):
+        """
+        Args:
+            dates: 升序日期数组（datetime64[D]）
+            values: 与日期对应的数值数组
+            window_days: 分位数滚动窗口（自然日）
+            low_status: 分位数 < 30 时的状态
+            high_status: 分位数 > 70 时的状态
+        """
+        self.dates = dates
+        self.values = values
+        self.low_status = low_status
+        self.high_status = high_status
+
+        n = len(values)
+        # 每一天滚动窗口的起点（窗口为 [date - window_days, date]）
+        self.window_start = np.searchsorted(dates, dates - np.timedelta64(window_days, 'D'), side='left')
+        self.percentile = rolling_percentile(values, self.window_start)
+
+        # 周变化：窗口内至少5个点且5个点前的值非0
+        self.weekly_change = np.zeros(n)
+        if n > WEEKLY_LAG:
+            prev = np.empty(n)
+            prev[:WEEKLY_LAG] = np.nan
+            prev[WEEKLY_LAG:] = values[:-WEEKLY_LAG]
+            idx = np.arange(n)
+            valid = (idx - self.window_start >= WEEKLY_LAG) & (prev != 0) & ~np.isnan(prev)
+            self.weekly_change[valid] = (values[valid] - prev[valid]) / prev[valid] * 100
+
+        self.status = np.where(
+            self.percentile < 30, low_status,
+            np.where(self.percentile > 70, high_status, "Neutral")
+        )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _bounds(self, start_date: Optional[str], end_date: Optional[str]) -> Tuple[int, int]:
+        """日期范围对应的下标区间 [lo, hi)"""
+        lo = np.searchsorted(self.dates, np.datetime64(start_date, 'D'), side='left') if start_date else 0
+        hi = np.searchsorted(self.dates, np.datetime64(end_date, 'D'), side='right') if end_date else len(self)
+        return int(lo), int(hi)
+
+    def latest(self) -> Optional[Dict]:
+        """最新一天的统计（O(1)查表）"""
+        if not len(self):
+            return None
+        return self.at(len(self) - 1)
+
+    def at(self, i: int) -> Dict:
+        """第 i 天的滚动5年统计"""
+        return {
+            "current": float(self.values[i]),
+            "percentile": float(self.percentile[i]),
+            "weekly_change": float(self.weekly_change[i]),
+            "status": str(self.status[i]),
+        }
+
+    def range_stats(self, start_date: Optional[str], end_date: Optional[str]) -> Optional[Dict]:
+        """
+        以指定日期范围为样本的统计（数据接口沿用的口径：分位数在请求的区间内计算）
+
+        Returns:
+            统计字典，区间内无数据时返回None
+        """
+        lo, hi = self._bounds(start_date, end_date)
+        if hi <= lo:
+            return None
+        window = self.values[lo:hi]
+        current = window[-1]
+        percentile = np.count_nonzero(window <= current) / len(window) * 100
+
+        weekly_change = 0.0
+        if len(window) >= WEEKLY_LAG + 1 and window[-WEEKLY_LAG - 1] != 0:
+            prev = window[-WEEKLY_LAG - 1]
+            weekly_change = (current - prev) / prev * 100
+
+        if percentile < 30:
+            status = self.low_status
+        elif percentile > 70:
+            status = self.high_status
+        else:
+            status = "Neutral"
+
+        return {
+            "current": float(current),
+            "percentile": float(percentile),
+            "weekly_change": float(weekly_change),
+            "status": status,
+        }
+
+    def history(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict:
+        """
+        滚动5年分位数的历史序列（用于"分位数走势"图）
+
+        Returns:
+            dates / values / percentile_5y 三个等长列表
+        """
+        lo, hi = self._bounds(start_date, end_date)
+        return {
+            "dates": np.datetime_as_string(self.dates[lo:hi], unit='D').tolist(),
+            "values": self.values[lo:hi].tolist(),
+            "percentile_5y": np.round(self.percentile[lo:hi], 2).tolist(),
+        }
+
+
+class MetricsEngine:
+    """
+    统计引擎：按指标缓存 MetricSeries，数据版本变化时重新计算
+    """
+
+    def __init__(self, low_status: str, high_status: str, window_days: int = FIVE_YEARS_DAYS):
+        """
+        Args:
+            low_status: 分位数 < 30 时的状态
+            high_status: 分位数 > 70 时的状态
+            window_days: 分位数滚动窗口（自然日）
+        """
+        self.low_status = low_status
+        self.high_status = high_status
+        self.window_days = window_days
+        self._series: Dict[str, Tuple[object, MetricSeries]] = {}
+
+    def peek(self, key: str, generation: object) -> Optional[MetricSeries]:
+        """已计算好的统计序列，版本不一致或未计算时返回None"""
+        cached = self._series.get(key)
+        if cached and cached[0] == generation:
+            return cached[1]
+        return None
+
+    def get(
+        self,
+        key: str,
+        generation: object,
+        loader: Callable[[], Tuple[np.ndarray, np.ndarray]]
+    ) -> MetricSeries:
+        """
+        获取指标的统计序列
+
+        Args:
+            key: 指标ID
+            generation: 数据版本，变化时重新计算
+            loader: 返回 (dates, values) 的函数，仅在需要重新计算时调用
+
+        Returns:
+            MetricSeries
+        """
+        cached = self._series.get(key)
+        if cached and cached[0] == generation:
+            return cached[1]
+
+        dates, values = loader()
+        series = MetricSeries(dates, values, self.window_days, self.low_status, self.high_status)
+        self._series[key] = (generation, series)
+        return series
+
+    def clear(self) -> None:
+        """清空所有统计序列"""
+        self._series.clear()
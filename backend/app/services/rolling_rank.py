@@ -0,0 +1,135 @@
+"""
+滑动窗口秩统计组件
+树状数组（Fenwick树）+ 坐标压缩：窗口滑动时增删数值、查询"<= x 的个数"都是 O(log n)，
+计算整段历史每一天的滚动分位数为 O(n log n)，而不是逐日重算的 O(n²)
+"""
+from typing import Iterable, List
+import numpy as np
+
+
+class RollingRank:
+    """
+    支持增删的有序多重集合，回答秩查询
+
+    所有可能出现的数值需要预先给出（universe），内部按排序后的下标存储；
+    查询值可以是任意数值。
+    """
+
+    def __init__(self, universe: Iterable[float]):
+        """
+        Args:
+            universe: 窗口中可能出现的全部数值（可重复、无需排序）
+        """
+        self._keys = np.unique(np.asarray(universe, dtype=float))
+        self._size = len(self._keys)
+        self._tree = [0] * (self._size + 1)
+        self._count = 0
+
+    def __len__(self) -> int:
+        """窗口内数值个数"""
+        return self._count
+
+    def _index(self, value: float) -> int:
+        """数值在 universe 中的位置（从1开始）"""
+        i = int(np.searchsorted(self._keys, value, side='left'))
+        if i >= self._size or self._keys[i] != value:
+            raise KeyError(f"数值不在预设范围内: {value}")
+        return i + 1
+
+    def ranks(self, values: Iterable[float]) -> List[int]:
+        """
+        批量把数值映射为位置（从1开始），配合 add_rank/remove_rank/count_le_rank 在循环中只做整数运算
+
+        Args:
+            values: universe 中的数值
+
+        Returns:
+            位置列表
+        """
+        values = np.asarray(values, dtype=float)
+        positions = np.searchsorted(self._keys, values, side='left')
+        if len(values) and (positions.max() >= self._size or np.any(self._keys[positions] != values)):
+            raise KeyError("数值不在预设范围内")
+        return (positions + 1).tolist()
+
+    def add_rank(self, rank: int) -> None:
+        """按位置加入一个数值"""
+        tree = self._tree
+        size = self._size
+        while rank <= size:
+            tree[rank] += 1
+            rank += rank & -rank
+        self._count += 1
+
+    def remove_rank(self, rank: int) -> None:
+        """按位置移除一个数值（必须已在窗口中）"""
+        tree = self._tree
+        size = self._size
+        while rank <= size:
+            tree[rank] -= 1
+            rank += rank & -rank
+        self._count -= 1
+
+    def count_le_rank(self, rank: int) -> int:
+        """窗口中位置 <= rank 的数值个数（前缀和）"""
+        tree = self._tree
+        total = 0
+        while rank > 0:
+            total += tree[rank]
+            rank -= rank & -rank
+        return total
+
+    def add(self, value: float) -> None:
+        """加入一个数值"""
+        self.add_rank(self._index(value))
+
+    def remove(self, value: float) -> None:
+        """移除一个数值（必须已在窗口中）"""
+        self.remove_rank(self._index(value))
+
+    def count_le(self, value: float) -> int:
+        """窗口中 <= value 的数值个数"""
+        return self.count_le_rank(int(np.searchsorted(self._keys, value, side='right')))
+
+    def count_lt(self, value: float) -> int:
+        """窗口中 < value 的数值个数"""
+        return self.count_le_rank(int(np.searchsorted(self._keys, value, side='left')))
+
+    def percentile(self, value: float) -> float:
+        """value 在窗口中的百分位（<= value 的占比，%）"""
+        if not self._count:
+            return float('nan')
+        return self.count_le(value) / self._count * 100
+
+
+def rolling_percentile(values: np.ndarray, window_start: np.ndarray) -> np.ndarray:
+    """
+    每一天当前值在其滚动窗口 [window_start[i], i] 内的百分位
+
+    Args:
+        values: 数值序列（不含NaN）
+        window_start: 每一天窗口起点下标（单调不减）
+
+    Returns:
+        百分位序列（%）
+    """
+    n = len(values)
+    result = np.zeros(n)
+    if not n:
+        return result
+
+    # 预先把数值映射为位置，循环内只做整数运算
+    window = RollingRank(values)
+    ranks = window.ranks(values)
+    starts = np.asarray(window_start).tolist()
+    add, remove, count_le = window.add_rank, window.remove_rank, window.count_le_rank
+
+    lo = 0
+    for i in range(n):
+        add(ranks[i])
+        while lo < starts[i]:
+            remove(ranks[lo])
+            lo += 1
+        # 值相同的数值位置相同，前缀和即 <= 当前值的个数
+        result[i] = count_le(ranks[i]) / len(window) * 100
+    return result
@@ -0,0 +1,153 @@
+"""
+内部数据行
+服务内部的全量数据保存为列式表（ColumnarTable），只为请求返回的日期范围构建 DataRow（__slots__，不做校验），
+在接口边界按 DataPoint 的字段输出为字典，由 FastAPI 的 response_model 完成校验和序列化
+"""
+from typing import Dict, Iterable, Iterator, List, Optional
+import numpy as np
+from ..models.indicators import DataPoint
+from .columnar import ColumnarTable
+
+# 与 DataPoint 字段顺序一致（输出字典的键顺序与 model_dump 相同），DataPoint 增删字段时 DataRow.__init__ 需同步
+ROW_FIELDS = tuple(DataPoint.model_fields)
+
+
+class DataRow:
+    """一个交易日的数据行（字段与 DataPoint 相同，未设置的字段为None）"""
+
+    __slots__ = ROW_FIELDS
+
+    def __init__(
+        self,
+        date: str,
+        value: float = 0.0,
+        close: Optional[float] = None,
+        erp: Optional[float] = None,
+        avg: Optional[float] = None,
+        sd1_up: Optional[float] = None,
+        sd1_low: Optional[float] = None,
+        sd2_up: Optional[float] = None,
+        sd2_low: Optional[float] = None,
+        line_green: Optional[float] = None,
+        line_black: Optional[float] = None,
+        line_yellow: Optional[float] = None,
+        slow_line: Optional[float] = None,
+        fast_line: Optional[float] = None,
+        equity_premium: Optional[float] = None,
+        eb_position_gap: Optional[float] = None,
+        eb_yield_gap: Optional[float] = None,
+        margin_balance: Optional[float] = None,
+        ma20: Optional[float] = None,
+        turnover: Optional[float] = None,
+        up_down_ratio: Optional[float] = None,
+        rsi: Optional[float] = None,
+        marker_red: Optional[float] = None,
+        marker_green: Optional[float] = None,
+        marker_fast_buy: Optional[float] = None,
+        marker_fast_sell: Optional[float] = None,
+        di_signal: Optional[float] = None,
+        slow_threshold_1: Optional[float] = None,
+        slow_threshold_0: Optional[float] = None,
+        slow_threshold_neg1: Optional[float] = None,
+        fast_threshold_1: Optional[float] = None,
+        fast_threshold_0: Optional[float] = None,
+        fast_threshold_neg1: Optional[float] = None,
+    ):
+        self.date = date
+        self.value = value
+        self.close = close
+        self.erp = erp
+        self.avg = avg
+        self.sd1_up = sd1_up
+        self.sd1_low = sd1_low
+        self.sd2_up = sd2_up
+        self.sd2_low = sd2_low
+        self.line_green = line_green
+        self.line_black = line_black
+        self.line_yellow = line_yellow
+        self.slow_line = slow_line
+        self.fast_line = fast_line
+        self.equity_premium = equity_premium
+        self.eb_position_gap = eb_position_gap
+        self.eb_yield_gap = eb_yield_gap
+        self.margin_balance = margin_balance
+        self.ma20 = ma20
+        self.turnover = turnover
+        self.up_down_ratio = up_down_ratio
+        self.rsi = rsi
+        self.marker_red = marker_red
+        self.marker_green = marker_green
+        self.marker_fast_buy = marker_fast_buy
+        self.marker_fast_sell = marker_fast_sell
+        self.di_signal = di_signal
+        self.slow_threshold_1 = slow_threshold_1
+        self.slow_threshold_0 = slow_threshold_0
+        self.slow_threshold_neg1 = slow_threshold_neg1
+        self.fast_threshold_1 = fast_threshold_1
+        self.fast_threshold_0 = fast_threshold_0
+        self.fast_threshold_neg1 = fast_threshold_neg1
+
+    def to_dict(self, include: Iterable[str] = None, exclude_none: bool = False) -> Dict:
+        """
+        转为字典（等价于对应 DataPoint 的 model_dump）
+
+        Args:
+            include: 只输出这些字段（为空时输出全部）
+            exclude_none: 省略值为None的字段
+        """
+        names = ROW_FIELDS if include is None else [name for name in ROW_FIELDS if name in include]
+        if exclude_none:
+            result = {}
+            for name in names:
+                v = getattr(self, name)
+                if v is not None:
+                    result[name] = v
+            return result
+        return {name: getattr(self, name) for name in names}
+
+    def __repr__(self) -> str:
+        return f"DataRow({self.to_dict(exclude_none=True)})"
+
+
+def _nullable(values: np.ndarray) -> list:
+    """float数组转为列表，NaN 为None"""
+    result = values.astype(object)
+    result[np.isnan(values)] = None
+    return result.tolist()
+
+
+def rows_from_columns(dates: List[str], columns: Dict[str, np.ndarray]) -> List[DataRow]:
+    """
+    由列数据构建数据行
+
+    Args:
+        dates: 日期字符串列表
+        columns: 字段名 -> 与日期等长的 float64 数组（NaN 为空值），没有 value 列时 value 为 0
+
+    Returns:
+        数据行列表
+    """
+    n = len(dates)
+    missing = [None] * n
+    args = [_nullable(columns[name]) if name in columns else missing for name in ROW_FIELDS[2:]]
+    value = columns["value"].tolist() if "value" in columns else [0.0] * n
+    return [DataRow(*row) for row in zip(dates, value, *args)]
+
+
+def rows_from_table(table: ColumnarTable) -> List[DataRow]:
+    """
+    由列式数据表（通常是按日期范围切出的视图）构建数据行
+
+    Args:
+        table: 列式数据表，列名为 DataRow 字段，NaN 为空值
+
+    Returns:
+        数据行列表
+    """
+    return rows_from_columns(np.datetime_as_string(table.dates, unit='D').tolist(), table.columns)
+
+
+def iter_rows_from_table(table: ColumnarTable, chunk_size: int = 500) -> Iterator[DataRow]:
+    """逐块构建数据行（流式导出用，同一时间只有一块数据行在内存中）"""
+    for lo in range(0, len(table), chunk_size):
+        yield from rows_from_table(table.take(lo, lo + chunk_size))
@@ -1,18 +1,30 @@
 """
 万得全A "2X" ERP模块服务
 """
-from typing import List
-from datetime import datetime, timedelta
+from typing import Dict, Iterator, Tuple
+from datetime import datetime
 import numpy as np
 from .base_module import BaseDataModule
-from ..models.indicators import IndicatorData, IndicatorMetrics, DataPoint
-from ..data.wind_client import wind_client
+from .metrics_engine import MetricsEngine, MetricSeries
+from .columnar import ColumnarTable
+from .executor import blocking_executor
+from ..models.indicators import IndicatorMetrics, PercentileHistory
+from .rows import rows_from_table, iter_rows_from_table
 from ..data.cache import cache
+from ..data.workbook import load_sheet_columns
 import logging
+import time
+import threading
 import os
 
 logger = logging.getLogger(__name__)
 
+# ERP数据点的数值列
+DATA_COLUMNS = ["value", "close", "erp", "avg", "sd1_up", "sd1_low", "sd2_up", "sd2_low"]
+
+# 没有数据（Excel不存在或读取失败）时使用的空表
+_EMPTY_TABLE = ColumnarTable.empty(DATA_COLUMNS)
+
 
 class Wind2XService(BaseDataModule):
     """万得全A "2X" ERP服务"""
@@ -27,12 +39,17 @@ class Wind2XService(BaseDataModule):
         self._cache = {}
         self._last_file_mtime = 0
         self._last_fetch_time = None
+        self._reload_lock = threading.Lock()
+        # ERP高位代表股票相对债券有吸引力
+        self._metrics_engine = MetricsEngine(low_status="Caution", high_status="Attractive")
     
     async def warm_cache(self) -> None:
         """启动预热缓存"""
         logger.info("正在执行 Wind 2X ERP 数据预热...")
-        await self._fetch_from_wind("2005-01-01", datetime.now().strftime('%Y-%m-%d'))
-        logger.info("Wind 2X ERP 数据预热完成")
+        start = time.perf_counter()
+        await self._get_buffered_data()
+        self.warmup_seconds = time.perf_counter() - start
+        logger.info(f"Wind 2X ERP 数据预热完成，耗时 {self.warmup_seconds:.2f} 秒")
 
     def initialize(self) -> None:
         """注册指标"""
@@ -50,18 +67,21 @@ class Wind2XService(BaseDataModule):
         start_date: str = None,
         end_date: str = None,
         **kwargs
-    ) -> IndicatorData:
+    ) -> dict:
         """
         获取指标数据
+        
+        Returns:
+            与 IndicatorData 结构相同的字典（由接口的 response_model 校验和序列化）
         """
         if indicator_id not in ["erp_2x", "default"]:
             indicator_id = "erp_2x"
         
-        # 检查缓存 (Redis/File cache)
-        cache_key = f"wind2x_{indicator_id}_{start_date}_{end_date}"
+        # 检查缓存（键包含数据版本：工作簿更新后不再返回旧版本的响应，ETag与内容保持一致）
+        cache_key = f"wind2x_{indicator_id}_{start_date}_{end_date}_{self.get_generation()}"
         cached_data = cache.get(cache_key)
         if cached_data:
-            return IndicatorData(**cached_data)
+            return cached_data
         
         # 获取指标信息
         indicator_info = self.get_indicator(indicator_id)
@@ -74,132 +94,201 @@ class Wind2XService(BaseDataModule):
         if not start_date:
             start_date = "2005-01-01"
         
-        data_points = await self._fetch_from_wind(start_date, end_date)
-        metrics = await self._calculate_metrics(data_points)
+        table = await self._fetch_from_wind(start_date, end_date)
+        series = await self._get_metric_series()
+        metrics = self._format_metrics(series.range_stats(start_date, end_date))
         
-        result = IndicatorData(
-            indicator_id=indicator_id,
-            indicator_name=indicator_info.name,
-            data_points=data_points,
-            metrics=metrics,
-            last_update=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        )
+        result = {
+            "indicator_id": indicator_id,
+            "indicator_name": indicator_info.name,
+            "data_points": await blocking_executor.run(lambda: [dp.to_dict() for dp in rows_from_table(table)]),
+            "metrics": metrics.model_dump(),
+            "last_update": self.get_last_update(),
+        }
         
-        cache.set(cache_key, result.dict())
+        cache.set(cache_key, result)
         return result
     
+    async def fetch_indicator_stream(
+        self,
+        indicator_id: str = "erp_2x",
+        start_date: str = None,
+        end_date: str = None
+    ) -> Tuple[Dict, Iterator[Dict]]:
+        """
+        流式导出ERP数据：返回头信息和惰性的数据行迭代器，不构建完整的 IndicatorData
+        
+        Returns:
+            (头信息, 数据行迭代器)，数据行省略空值字段
+        """
+        header, start_date, end_date = await self._export_header(start_date, end_date)
+        table = await self._fetch_from_wind(start_date, end_date)
+        
+        def rows():
+            # 数据行按块构建，不为整个区间创建对象
+            for dp in iter_rows_from_table(table):
+                yield dp.to_dict(exclude_none=True)
+        
+        return header, rows()
+    
+    async def fetch_indicator_columns(
+        self,
+        indicator_id: str = "erp_2x",
+        start_date: str = None,
+        end_date: str = None
+    ) -> Tuple[Dict, ColumnarTable]:
+        """
+        列式导出ERP数据（用于二进制/Arrow响应）
+        
+        Returns:
+            (头信息, 列式数据表)，空值为 NaN
+        """
+        header, start_date, end_date = await self._export_header(start_date, end_date)
+        return header, await self._fetch_from_wind(start_date, end_date)
+    
+    async def _export_header(self, start_date: str, end_date: str) -> Tuple[Dict, str, str]:
+        """导出接口的头信息（指标名称、统计指标、更新时间），同时补全默认日期范围"""
+        if not end_date:
+            end_date = datetime.now().strftime('%Y-%m-%d')
+        if not start_date:
+            start_date = "2005-01-01"
+        
+        series = await self._get_metric_series()
+        header = {
+            "indicator_id": "erp_2x",
+            "indicator_name": self.get_indicator("erp_2x").name,
+            "metrics": self._format_metrics(series.range_stats(start_date, end_date)).model_dump(),
+            "last_update": self.get_last_update(),
+        }
+        return header, start_date, end_date
+    
     async def fetch_indicator_metrics(
         self,
         indicator_id: str
     ) -> IndicatorMetrics:
-        """获取统计指标"""
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        start_date = (datetime.now() - timedelta(days=5*365)).strftime('%Y-%m-%d')
-        data = await self.fetch_indicator_data(indicator_id, start_date, end_date)
-        return data.metrics
+        """获取统计指标（最新一天的滚动5年统计，直接查表）"""
+        series = await self._get_metric_series()
+        return self._format_metrics(series.latest())
+    
+    async def fetch_percentile_history(
+        self,
+        indicator_id: str = "erp_2x",
+        start_date: str = None,
+        end_date: str = None
+    ) -> PercentileHistory:
+        """获取ERP滚动5年分位数的历史走势"""
+        series = await self._get_metric_series()
+        return PercentileHistory(indicator_id="erp_2x", **series.history(start_date, end_date))
+    
+    async def _get_metric_series(self) -> MetricSeries:
+        """获取ERP的全历史统计序列（每个数据版本只计算一次）"""
+        table = await self._get_buffered_data()
+        
+        def load():
+            # 直接使用列式表的列（value 列已把空值填为0）
+            return table.dates, table.columns["value"]
+        
+        series = self._metrics_engine.peek("erp_2x", self._last_file_mtime)
+        if series is None:
+            # 全历史滚动统计在线程池中计算
+            series = await blocking_executor.run(
+                self._metrics_engine.get, "erp_2x", self._last_file_mtime, load
+            )
+        return series
     
-    async def _fetch_from_wind(self, start_date: str, end_date: str) -> List[DataPoint]:
-        """从Excel获取ERP 2X数据 (使用内存缓存优化)"""
-        import pandas as pd
+    async def _fetch_from_wind(self, start_date: str, end_date: str) -> ColumnarTable:
+        """从Excel获取ERP 2X数据（日期范围内的列式表视图）"""
+        return (await self._get_buffered_data()).slice(start_date, end_date)
+    
+    async def _get_buffered_data(self) -> ColumnarTable:
+        """获取带缓存的ERP 2X全部数据 (列式表，共享数据模式下为各进程共享的内存映射)"""
         from pathlib import Path
-        from config import EXCEL_PATH, COLUMN_MAPPING
+        from config import EXCEL_PATH
         
         try:
             excel_path = Path(EXCEL_PATH)
             if not excel_path.exists():
-                return []
+                return _EMPTY_TABLE
 
             mtime = os.path.getmtime(excel_path)
-            # 5分钟内且文件未修改，使用内存缓存
-            if mtime == self._last_file_mtime and self._cache.get('all_points'):
+            if mtime == self._last_file_mtime and 'table' in self._cache:
                 # 只要文件没变，就一直使用内存缓存
-                return self._filter_data(self._cache['all_points'], start_date, end_date)
-
-            logger.info(f"正在优化读取 ERP 2X 数据: {excel_path}")
-            # 优化: 只读需要的列
-            cols = [
-                COLUMN_MAPPING['date'], COLUMN_MAPPING['close'], COLUMN_MAPPING['erp'],
-                COLUMN_MAPPING['band_s'], COLUMN_MAPPING['band_u'], COLUMN_MAPPING['band_v'],
-                COLUMN_MAPPING['band_w'], COLUMN_MAPPING['band_x']
-            ]
-            
-            # 使用 pd.read_excel 配合 usecols
-            df = pd.read_excel(excel_path, header=None, usecols=cols)
-            START_ROW_INDEX = 728 
-            if len(df) <= START_ROW_INDEX: return []
+                return self._cache['table']
+        except OSError as e:
+            logger.error(f"Wind2X Excel read error: {str(e)}")
+            return self._cache.get('table', _EMPTY_TABLE)
+        
+        # 解析在线程池中进行，不阻塞事件循环
+        return await blocking_executor.run(self._reload, excel_path, mtime)
 
-            all_points = []
-            data_subset = df.iloc[START_ROW_INDEX:].values
+    def _reload(self, excel_path, mtime: float) -> ColumnarTable:
+        """重新加载数据（同一时间只加载一次，并发的调用等待并复用这次加载的结果）"""
+        with self._reload_lock:
+            if mtime == self._last_file_mtime and 'table' in self._cache:
+                return self._cache['table']
             
-            for row in data_subset:
-                date_val = row[0]
-                if pd.isna(date_val): continue
+            try:
+                start = time.perf_counter()
+                table = None
+                if self.uses_shared_data():
+                    table = self.attach_shared_data(mtime)
+                    if table is None:
+                        logger.warning("等待共享数据超时，本进程自行解析Excel")
                 
-                try: 
-                    if isinstance(date_val, datetime): d_str = date_val.strftime('%Y-%m-%d')
-                    else: d_str = pd.to_datetime(date_val).strftime('%Y-%m-%d')
-                except: continue
-
-                def f(v):
-                    try:
-                        val = float(v)
-                        return val if v != "#N/A" and not pd.isna(val) else None
-                    except: return None
-
-                dp = DataPoint(
-                    date=d_str,
-                    value=f(row[2]) or 0,
-                    close=f(row[1]),
-                    erp=f(row[2]),
-                    avg=f(row[3]),
-                    sd1_up=f(row[4]),
-                    sd1_low=f(row[5]),
-                    sd2_up=f(row[6]),
-                    sd2_low=f(row[7])
-                )
-                all_points.append(dp)
-            
-            all_points.sort(key=lambda x: x.date)
-            self._cache['all_points'] = all_points
-            self._last_file_mtime = mtime
-            self._last_fetch_time = datetime.now()
-            
-            return self._filter_data(all_points, start_date, end_date)
-
-        except Exception as e:
-            logger.error(f"Wind2X Excel read error: {str(e)}")
-            return self._filter_data(self._cache.get('all_points', []), start_date, end_date)
+                source = "shared" if table is not None else "excel"
+                if table is None:
+                    table = self._parse_excel(excel_path)
+                    if not len(table):
+                        return table
+                    if self.is_shared_publisher():
+                        # 发布后改用共享的内存映射，与其他进程共用同一份数据
+                        table = self.publish_shared_data(mtime, table)
+                
+                self._cache['table'] = table
+                self._last_file_mtime = mtime
+                # 响应缓存的键包含数据版本，旧版本的条目不会再被读取，在这里删除
+                cache.delete_prefix("wind2x_")
+                self.record_reload(source, time.perf_counter() - start, mtime)
+                self._last_fetch_time = datetime.now()
+                return table
+                
+            except Exception as e:
+                logger.error(f"Wind2X Excel read error: {str(e)}")
+                return self._cache.get('table', _EMPTY_TABLE)
 
-    def _filter_data(self, data: List[DataPoint], start_date: str, end_date: str) -> List[DataPoint]:
-        filtered = []
-        for dp in data:
-            if start_date and dp.date < start_date: continue
-            if end_date and dp.date > end_date: continue
-            filtered.append(dp)
-        return filtered
+    def _parse_excel(self, excel_path) -> ColumnarTable:
+        """解析Excel中的ERP 2X数据为列式表（阻塞）"""
+        from config import COLUMN_MAPPING
+        
+        logger.info(f"正在优化读取 ERP 2X 数据: {excel_path}")
+        START_ROW_INDEX = 728 
+        # 第一个工作表，只读需要的列
+        dates, columns = load_sheet_columns(excel_path, 0, START_ROW_INDEX, {
+            "close": COLUMN_MAPPING['close'],
+            "erp": COLUMN_MAPPING['erp'],
+            "avg": COLUMN_MAPPING['band_s'],
+            "sd1_up": COLUMN_MAPPING['band_u'],
+            "sd1_low": COLUMN_MAPPING['band_v'],
+            "sd2_up": COLUMN_MAPPING['band_w'],
+            "sd2_low": COLUMN_MAPPING['band_x'],
+        }, date_column=COLUMN_MAPPING['date'])
+        # ERP为空时 value 取0
+        columns["value"] = np.nan_to_num(columns["erp"], nan=0.0)
+        return ColumnarTable(
+            np.array(dates, dtype='datetime64[D]'),
+            {name: columns[name] for name in DATA_COLUMNS}
+        )
 
-    async def _calculate_metrics(self, data_points: List[DataPoint]) -> IndicatorMetrics:
-        """计算统计指标"""
-        if not data_points:
+    def _format_metrics(self, stats: dict) -> IndicatorMetrics:
+        """把统计引擎的结果格式化为响应模型"""
+        if not stats:
             return IndicatorMetrics(current_value="N/A", percentile_5y="N/A", change_weekly="N/A", status="Neutral", description="暂无数据")
         
-        values = [dp.value for dp in data_points]
-        current_value = values[-1]
-        percentile = (np.sum(np.array(values) <= current_value) / len(values)) * 100
-        
-        if len(values) >= 5:
-            weekly_change = ((current_value - values[-5]) / values[-5]) * 100 if values[-5] != 0 else 0
-        else:
-            weekly_change = 0
-        
-        if percentile > 70: status = "Attractive"
-        elif percentile < 30: status = "Caution"
-        else: status = "Neutral"
-        
+        status = stats["status"]
         return IndicatorMetrics(
-            current_value=f"{current_value:.2f}%",
-            percentile_5y=f"{percentile:.1f}%",
-            change_weekly=f"{weekly_change:+.2f}%",
+            current_value=f"{stats['current']:.2f}%",
+            percentile_5y=f"{stats['percentile']:.1f}%",
+            change_weekly=f"{stats['weekly_change']:+.2f}%",
             status=status,
             description=self._get_status_description(status)
         )
@@ -12,19 +12,33 @@ parent_dir = os.path.dirname(current_dir)
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
-# Import the actual logic
-try:
-    from update_excel_daily import run_daily_update
-except ImportError:
-    # Fallback if running from a different context
-    import sys
-    sys.path.append(os.path.join(os.getcwd(), 'backend'))
-    from update_excel_daily import run_daily_update
+
+def _load_daily_update():
+    """
+    Import the updater lazily: update_excel_daily pulls in data_fetcher (WindPy),
+    excel_handler (pandas/openpyxl/win32com), which the API process only needs
+    when an update actually runs.
+    """
+    try:
+        from update_excel_daily import run_daily_update
+    except ImportError:
+        # Fallback if running from a different context
+        sys.path.append(os.path.join(os.getcwd(), 'backend'))
+        from update_excel_daily import run_daily_update
+    return run_daily_update
 
 def run_update():
     """Run the daily update process"""
+    from .data.process_lock import update_lock
+    # Only one update at a time across all worker processes
+    if not update_lock.acquire():
+        logging.warning("Another update is already running, skipping")
+        return
     logging.info("Triggering run_daily_update from wrapper...")
     try:
+        run_daily_update = _load_daily_update()
         run_daily_update(test_mode=False)
     except Exception as e:
         logging.error(f"Error in wrapper run_update: {e}", exc_info=True)
+    finally:
+        update_lock.release()
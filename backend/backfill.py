@@ -0,0 +1,178 @@
+"""
+历史回补 - 按日期区间批量获取数据，一次写入Excel
+    python update_excel_daily.py backfill --start 2026-02-12 [--end 2026-03-31] [--replace] [--restart] [--test]
+
+日序列指标按区间批量获取（每批 config.BACKFILL_CHUNK_DAYS 个交易日）；MA20宽度也按区间计算：
+每批股票用 wsd 取整个区间的收盘价和MA20，在本地逐日统计（见 WindDataFetcher.calculate_ma20_breadth_range），
+批量接口失败时退回逐日获取；
+每获取一批就写入检查点（config.BACKFILL_DIR），中断后用相同的开始日期重新运行会从断点继续（最多重新获取一批）。
+全部获取完成后一次追加到Excel并保存、重算公式，成功后删除检查点。
+--test 只获取数据、不写入Excel，检查点保留：确认数据后去掉 --test 重新运行，直接从检查点写入。
+--replace 先删除Excel中开始日期（含）及之后的行（ExcelHandler.truncate_from）再写入，用于重建错误数据。
+"""
+import json
+import logging
+import os
+import time
+
+import config
+from data_fetcher import WindDataFetcher
+from excel_handler import ExcelHandler
+
+
+class BackfillCheckpoint:
+    """回补进度（JSON文件，以开始日期命名）"""
+
+    def __init__(self, start, directory=None):
+        self.path = os.path.join(directory or config.BACKFILL_DIR, f'backfill_{start}.json')
+        self.start = start
+        self.end = None
+        self.replace = False
+        self.dates = []   # 区间内的交易日
+        self.rows = {}    # 已获取的日期 -> 数据字典
+
+    def load(self):
+        """读取检查点，返回是否存在"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return False
+        self.end = state['end']
+        self.replace = state.get('replace', False)
+        self.dates = state['dates']
+        self.rows = state['rows']
+        return True
+
+    def save(self):
+        """写入检查点（先写临时文件再替换，中断时不会留下不完整的文件）"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"start": self.start, "end": self.end, "replace": self.replace, "dates": self.dates, "rows": self.rows},
+                      f, ensure_ascii=False, default=_json_default)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def pending(self):
+        """尚未获取的交易日"""
+        return [date for date in self.dates if date not in self.rows]
+
+
+def _json_default(value):
+    """Wind 返回的 numpy 数值、日期等"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def run_backfill(start, end=None, restart=False, replace=False, test_mode=False):
+    """
+    回补 [start, end] 区间的数据
+
+    参数:
+        start: 开始日期 "YYYY-MM-DD"（不使用 replace 时须晚于Excel中的最后日期）
+        end: 结束日期，为空时到今天（从检查点继续时沿用检查点中的结束日期）
+        restart: 丢弃已有的检查点，重新获取
+        replace: 写入前删除Excel中 start（含）及之后的行
+        test_mode: 只获取数据，不写入Excel（保留检查点）
+
+    返回:
+        int: 写入Excel的行数
+    """
+    handler = ExcelHandler()
+    handler.read_excel()
+    last_date = handler.get_last_date()
+
+    checkpoint = BackfillCheckpoint(start)
+    if restart:
+        checkpoint.remove()
+    if checkpoint.load() and (end is None or end == checkpoint.end):
+        print(f"📂 从检查点继续: {checkpoint.path}（已获取 {len(checkpoint.rows)}/{len(checkpoint.dates)} 个交易日）")
+        replace = replace or checkpoint.replace
+    else:
+        if replace:
+            # 删除的是 start 之后的全部行，结束日期之后的数据也要重新获取
+            if end and last_date and end < last_date:
+                raise ValueError(f"--replace 会删除 {start} 之后的全部数据，结束日期须不早于Excel最后日期 {last_date}")
+        elif last_date and start <= last_date:
+            # 区间不能与Excel中已有的数据重叠（检查点存在时，已写入Excel的日期在写入时跳过）
+            raise ValueError(f"Excel中已有 {start} 及之后的数据（最后日期 {last_date}），请使用 --replace 重建")
+        checkpoint = BackfillCheckpoint(start)
+        checkpoint.end = end
+        checkpoint.replace = replace
+
+    fetcher = WindDataFetcher()
+    try:
+        fetcher.connect()
+        if not checkpoint.dates:
+            checkpoint.dates = fetcher.get_trade_dates_between(start, end)
+            checkpoint.end = checkpoint.end or (checkpoint.dates[-1] if checkpoint.dates else start)
+            checkpoint.save()
+
+        pending = checkpoint.pending()
+        total = len(checkpoint.dates)
+        print(f"回补区间 {start} ~ {checkpoint.end}: 共 {total} 个交易日，待获取 {len(pending)} 个")
+
+        began = time.perf_counter()
+        for i in range(0, len(pending), config.BACKFILL_CHUNK_DAYS):
+            chunk = pending[i:i + config.BACKFILL_CHUNK_DAYS]
+            rows = fetcher.fetch_market_data_range(chunk)
+            ma20_by_date = fetcher.calculate_ma20_breadth_range(chunk) if rows is not None else None
+            for date in chunk:
+                if rows is None:
+                    # 批量接口失败：逐日获取
+                    data = fetcher.fetch_market_data(date)
+                else:
+                    data = rows[date]
+                    # MA20宽度批量计算失败时由 complete_derived 逐日计算
+                    fetcher.complete_derived(data, ma20_by_date)
+                checkpoint.rows[date] = data
+                print(f"✅ {date} 数据已获取 ({len(checkpoint.rows)}/{total})")
+            # 每批写一次（检查点包含已获取的全部行，逐日写入是 O(n²)）
+            checkpoint.save()
+        if pending:
+            logging.info(f"回补数据获取耗时 {time.perf_counter() - began:.1f}s（{len(pending)} 个交易日）")
+    finally:
+        fetcher.disconnect()
+
+    if test_mode:
+        print(f"测试模式：不写入Excel，检查点保留在 {checkpoint.path}（去掉 --test 重新运行即写入）")
+        return 0
+
+    if replace:
+        # 删除旧数据（只有一次 delete_rows 和一次保存）
+        handler.backup_excel()
+        handler.truncate_from(start)
+        last_date = handler.get_last_date()
+
+    # 一次追加全部行
+    written = 0
+    for date in checkpoint.dates:
+        data = checkpoint.rows[date]
+        if last_date and date <= last_date:
+            continue  # 上次运行已写入
+        is_valid, _, msg = handler.validate_data(data)
+        if is_valid:
+            handler.append_data(data)
+            written += 1
+        else:
+            logging.warning(f"{date} 数据无效: {msg}")
+
+    if written:
+        if not replace:
+            handler.backup_excel()
+        began = time.perf_counter()
+        handler.save_excel()
+        logging.info(f"回补写入 {written} 行，保存耗时 {time.perf_counter() - began:.1f}s")
+        handler.recalculate_formulas()
+    else:
+        print("没有需要写入的数据")
+
+    checkpoint.remove()
+    return written
@@ -0,0 +1,278 @@
+"""
+读取到响应全链路基准测试
+在合成工作簿（见 synthetic_workbook.py）上测量：
+    - 冷解析：新服务实例从Excel加载全部数据
+    - 各接口：首次请求（数据已加载、响应缓存未命中）和热请求延迟（p50/p95）、响应字节数
+      覆盖11个BOCIASI指标和2X ERP的数据、统计指标、全历史区间和批量接口
+    - 静态快照生成耗时和各分片大小
+    - ExcelHandler.append_data / save_excel 追加一行的耗时
+结果写入JSON，可用 --compare 对比两次（不同提交）的结果
+
+运行（在 backend 目录下）:
+    python benchmarks/bench_hot_path.py [--rows 1000 5000 20000] [--repeat 20] [--out results.json]
+    python benchmarks/bench_hot_path.py --compare before.json after.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_cold_parse(repeat):
+    """新服务实例从Excel全量加载（含逐行转换）的耗时"""
+    from app.services.bociasi_service import BOCIASIService
+    from app.services.wind2x_service import Wind2XService
+
+    results = {}
+    for name, cls in (("bociasi", BOCIASIService), ("wind_2x_erp", Wind2XService)):
+        timings, rows = [], 0
+        for _ in range(repeat):
+            service = cls()
+            start = time.perf_counter()
+            rows = len(asyncio.run(service._get_buffered_data()))
+            timings.append(time.perf_counter() - start)
+        results[name] = {"median_s": statistics.median(timings), "min_s": min(timings), "rows": rows}
+    return results
+
+
+def request_plan(first_date):
+    """要测量的请求：每个BOCIASI指标的数据和统计指标、2X ERP、全历史区间、批量接口"""
+    from app.services.bociasi_service import VALUE_COLUMNS
+
+    plan = ["/api/modules"]
+    for indicator_id in VALUE_COLUMNS:
+        plan.append(f"/api/bociasi/{indicator_id}/data")
+        plan.append(f"/api/bociasi/{indicator_id}/metrics")
+    plan += [
+        f"/api/bociasi/overview/data?start_date={first_date}",
+        "/api/bociasi/data",
+        "/api/wind_2x_erp/data",
+        "/api/wind_2x_erp/metrics",
+        f"/api/wind_2x_erp/data?start_date={first_date}",
+    ]
+    return plan
+
+
+def bench_requests(repeat, first_date):
+    """
+    各接口延迟
+
+    Returns:
+        {路径: {"first_ms", "p50_ms", "p95_ms", "bytes"}}，以及首个请求（含冷解析）的耗时
+    """
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.data.cache import cache
+
+    # 响应缓存的键不含数据版本，测量多个规模时先清空
+    cache.clear()
+    # 不进入 with（不触发启动事件），避免启动调度器和后台预热干扰计时
+    client = TestClient(app)
+    start = time.perf_counter()
+    client.get("/api/bociasi/overview/data").raise_for_status()
+    client.get("/api/wind_2x_erp/data").raise_for_status()
+    first_load_ms = (time.perf_counter() - start) * 1000
+
+    results = {}
+    for path in request_plan(first_date):
+        start = time.perf_counter()
+        response = client.get(path)
+        first_ms = (time.perf_counter() - start) * 1000
+        response.raise_for_status()
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            client.get(path)
+            timings.append((time.perf_counter() - start) * 1000)
+        results[path] = {
+            "first_ms": first_ms,
+            "p50_ms": _percentile(timings, 50),
+            "p95_ms": _percentile(timings, 95),
+            "bytes": len(response.content),
+        }
+    return first_load_ms, results
+
+
+def bench_snapshot(output_dir):
+    """生成静态快照（服务数据已加载）"""
+    import static_snapshot
+
+    start = time.perf_counter()
+    manifest = asyncio.run(static_snapshot.generate_snapshot(output_dir=output_dir))
+    seconds = time.perf_counter() - start
+    shard_bytes = {key: entry.get("bytes") for key, entry in manifest["shards"].items()}
+    return {"seconds": seconds, "bytes": shard_bytes}
+
+
+def bench_append(workbook):
+    """在工作簿副本上追加一行并保存"""
+    from excel_handler import ExcelHandler
+
+    import pandas as pd
+
+    handler = ExcelHandler(excel_path=workbook)
+    start = time.perf_counter()
+    handler.read_excel()
+    read_s = time.perf_counter() - start
+
+    next_date = (pd.Timestamp(handler.get_last_date()) + pd.offsets.BDay()).strftime('%Y-%m-%d')
+    row = {key: 1.0 for key in ("turnover", "close", "equity_fund", "bond_fund", "dividend", "margin",
+                                "rise", "flat", "fall", "limit_up", "limit_down", "rsi", "ma20",
+                                "treasury", "pe_ttm", "pe_inverse")}
+    row["date"] = next_date
+
+    start = time.perf_counter()
+    handler.append_data(row)
+    append_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    handler.save_excel()
+    save_s = time.perf_counter() - start
+    return {"read_excel_s": read_s, "append_data_s": append_s, "save_excel_s": save_s}
+
+
+def run_size(rows, repeat, cold_repeat, workdir, workbook=None):
+    """对一个规模的工作簿运行全部测量"""
+    import config
+    from synthetic_workbook import build_workbook, BOCIASI_START_ROW_INDEX
+
+    if workbook is None:
+        workbook = os.path.join(workdir, f"BOCIASIV2_{rows}.xlsx")
+        print(f"生成 {rows} 行合成工作簿...", flush=True)
+        build_workbook(workbook, rows)
+
+    # 服务和 ExcelHandler 在调用时读取 config.EXCEL_PATH
+    config.EXCEL_PATH = workbook
+
+    import pandas as pd
+    first_date = pd.read_excel(
+        workbook, sheet_name=config.SHEET_NAME, header=None, usecols=[0],
+        skiprows=BOCIASI_START_ROW_INDEX, nrows=1
+    ).iloc[0, 0]
+    first_date = pd.to_datetime(first_date).strftime('%Y-%m-%d')
+
+    result = {"workbook_bytes": os.path.getsize(workbook)}
+    print("冷解析...", flush=True)
+    result["cold_parse"] = bench_cold_parse(cold_repeat)
+    print("接口延迟...", flush=True)
+    result["first_load_ms"], result["requests"] = bench_requests(repeat, first_date)
+    print("静态快照...", flush=True)
+    result["snapshot"] = bench_snapshot(os.path.join(workdir, f"snapshot_{rows}"))
+    print("追加保存...", flush=True)
+    copy = os.path.join(workdir, f"append_{rows}.xlsx")
+    shutil.copyfile(workbook, copy)
+    result["append"] = bench_append(copy)
+    return result
+
+
+def _flatten(data, prefix=""):
+    items = {}
+    for key, value in data.items():
+        name = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            items.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            items[name] = value
+    return items
+
+
+def compare(before_path, after_path):
+    """对比两次结果中的所有数值项"""
+    with open(before_path, encoding='utf-8') as f:
+        before = json.load(f)
+    with open(after_path, encoding='utf-8') as f:
+        after = json.load(f)
+    print(f"before: {before['meta'].get('commit')}  after: {after['meta'].get('commit')}")
+    a, b = _flatten(before["sizes"]), _flatten(after["sizes"])
+    print(f"{'项目':<70}{'before':>12}{'after':>12}{'变化':>9}")
+    for key in sorted(set(a) & set(b)):
+        change = f"{(b[key] - a[key]) / a[key] * 100:+.1f}%" if a[key] else ""
+        print(f"{key:<70}{a[key]:>12.3f}{b[key]:>12.3f}{change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='读取到响应全链路基准测试')
+    parser.add_argument('--rows', type=int, nargs='+', default=[5000], help='合成工作簿规模（BOCIASI数据行数，1k-50k）')
+    parser.add_argument('--workbook', help='使用已有工作簿（忽略 --rows）')
+    parser.add_argument('--repeat', type=int, default=20, help='每个接口的热请求次数')
+    parser.add_argument('--cold-repeat', type=int, default=3, help='冷解析次数')
+    parser.add_argument('--out', help='结果JSON路径（默认 benchmarks/results/hot_path_<提交>_<时间>.json）')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='对比两次结果')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    logging.disable(logging.WARNING)
+    commit = _git_commit()
+    results = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "sizes": {},
+    }
+
+    workdir = tempfile.mkdtemp(prefix="bench_hot_path_")
+    try:
+        sizes = ["custom"] if args.workbook else args.rows
+        for rows in sizes:
+            results["sizes"][str(rows)] = run_size(rows, args.repeat, args.cold_repeat, workdir, args.workbook)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    out = args.out or os.path.join(
+        BACKEND_DIR, "benchmarks", "results",
+        f"hot_path_{commit or 'unknown'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    for size, result in results["sizes"].items():
+        print(f"\n== {size} ==")
+        for name, parse in result["cold_parse"].items():
+            print(f"冷解析 {name:<14} {parse['median_s']:.2f}s（{parse['rows']} 行）")
+        print(f"{'接口':<60}{'首次(ms)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'字节':>12}")
+        for path, r in result["requests"].items():
+            print(f"{path:<60}{r['first_ms']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['bytes']:>12}")
+        print(f"静态快照 {result['snapshot']['seconds']:.2f}s，分片 {result['snapshot']['bytes']}")
+        print("追加保存 " + ", ".join(f"{k}={v:.3f}" for k, v in result["append"].items()))
+    print(f"\n结果已保存: {out}")
+
+
+if __name__ == '__main__':
+    main()
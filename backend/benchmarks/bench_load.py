@@ -0,0 +1,315 @@
+"""
+API压测 - 模拟多个仪表盘用户并发访问，测量单实例的吞吐量和延迟
+每个虚拟用户循环执行"会话"：打开模块列表 → 加载BOCIASI批量数据 → 查看几个子指标的数据和统计指标
+（11个BOCIASI指标中随机选取）→ 查看2X ERP，每次会话随机选择一个日期范围（近1年/3年/5年/全部）。
+
+分两个阶段测量：
+    - cold：清空响应缓存后（数据已加载），每个用户各执行若干次会话
+    - warm：缓存已填充，持续运行 --duration 秒
+每个阶段报告吞吐量（请求/秒、会话/秒）和各接口的 p50/p95/p99 延迟、错误数，结果写入JSON
+
+运行（在 backend 目录下）:
+    python benchmarks/bench_load.py [--users 20] [--duration 30]            # 进程内（ASGI），使用 config.EXCEL_PATH
+    python benchmarks/bench_load.py --rows 5000                              # 进程内，使用合成工作簿
+    python benchmarks/bench_load.py --url http://127.0.0.1:8000              # 压测已启动的服务
+    python benchmarks/bench_load.py --compare before.json after.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_hot_path import BACKEND_DIR, _flatten, _git_commit, _percentile  # noqa: E402
+
+# 会话的日期范围（年数，None 表示全部历史）及被选中的权重
+DATE_RANGES = [(1, 0.4), (3, 0.3), (5, 0.2), (None, 0.1)]
+
+# 每次会话查看的子指标数量
+INDICATORS_PER_SESSION = (1, 3)
+
+
+def _start_date(years):
+    if years is None:
+        return None
+    return (date.today() - timedelta(days=365 * years)).strftime('%Y-%m-%d')
+
+
+def _with_range(path, start_date):
+    return f"{path}?start_date={start_date}" if start_date else path
+
+
+def build_session(rng, indicator_ids):
+    """
+    生成一次会话的请求序列
+
+    Returns:
+        [(接口名, 路径)]，接口名用于分组统计
+    """
+    years = rng.choices([r for r, _ in DATE_RANGES], weights=[w for _, w in DATE_RANGES])[0]
+    start_date = _start_date(years)
+    steps = [
+        ("/api/modules", "/api/modules"),
+        ("/api/bociasi/data", _with_range("/api/bociasi/data", start_date)),
+    ]
+    for indicator_id in rng.sample(indicator_ids, rng.randint(*INDICATORS_PER_SESSION)):
+        steps.append(("/api/bociasi/{id}/data", _with_range(f"/api/bociasi/{indicator_id}/data", start_date)))
+        steps.append(("/api/bociasi/{id}/metrics", f"/api/bociasi/{indicator_id}/metrics"))
+    steps.append(("/api/wind_2x_erp/data", _with_range("/api/wind_2x_erp/data", start_date)))
+    steps.append(("/api/wind_2x_erp/metrics", "/api/wind_2x_erp/metrics"))
+    return steps
+
+
+class PhaseStats:
+    """一个阶段的请求记录"""
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = {}
+        self.errors = {}
+        self.bytes = {}
+        self.sessions = 0
+        self.started = None
+        self.elapsed = None
+
+    def record(self, endpoint, seconds, status, size):
+        self.latencies.setdefault(endpoint, []).append(seconds * 1000)
+        self.bytes[endpoint] = self.bytes.get(endpoint, 0) + size
+        if status >= 400 or status == 0:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self):
+        all_latencies = [v for values in self.latencies.values() for v in values]
+        total = len(all_latencies)
+
+        def describe(values):
+            return {
+                "p50_ms": _percentile(values, 50),
+                "p95_ms": _percentile(values, 95),
+                "p99_ms": _percentile(values, 99),
+                "max_ms": max(values),
+            }
+
+        return {
+            "seconds": self.elapsed,
+            "requests": total,
+            "sessions": self.sessions,
+            "errors": sum(self.errors.values()),
+            "requests_per_s": total / self.elapsed if self.elapsed else None,
+            "sessions_per_s": self.sessions / self.elapsed if self.elapsed else None,
+            "latency": describe(all_latencies) if all_latencies else {},
+            "endpoints": {
+                endpoint: {
+                    "requests": len(values),
+                    "errors": self.errors.get(endpoint, 0),
+                    "avg_bytes": self.bytes[endpoint] / len(values),
+                    **describe(values),
+                }
+                for endpoint, values in sorted(self.latencies.items())
+            },
+        }
+
+
+async def _virtual_user(client, stats, rng, indicator_ids, sessions, deadline, think, revalidate):
+    """执行会话，直到完成 sessions 次或到达 deadline"""
+    etags = {}
+    done = 0
+    while (sessions is None or done < sessions) and (deadline is None or time.perf_counter() < deadline):
+        for endpoint, path in build_session(rng, indicator_ids):
+            headers = {"If-None-Match": etags[path]} if revalidate and path in etags else {}
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, headers=headers)
+                status, size = response.status_code, len(response.content)
+                if "etag" in response.headers:
+                    etags[path] = response.headers["etag"]
+            except Exception:
+                status, size = 0, 0
+            stats.record(endpoint, time.perf_counter() - start, status, size)
+            if think:
+                await asyncio.sleep(rng.expovariate(1 / think))
+        done += 1
+        stats.sessions += 1
+
+
+async def run_phase(client, name, users, indicator_ids, seed, sessions=None, duration=None, think=0.0,
+                    revalidate=False):
+    """
+    运行一个阶段
+
+    Args:
+        client: httpx.AsyncClient
+        name: 阶段名
+        users: 并发用户数
+        indicator_ids: BOCIASI指标ID列表
+        seed: 随机种子（每个用户的会话序列固定）
+        sessions: 每个用户的会话数（与 duration 二选一）
+        duration: 持续秒数
+        think: 两次请求之间的平均思考时间（秒），0 表示连续发请求
+        revalidate: 重复请求时带上 If-None-Match（模拟浏览器缓存）
+    """
+    stats = PhaseStats(name)
+    stats.started = time.perf_counter()
+    deadline = stats.started + duration if duration else None
+    await asyncio.gather(*(
+        _virtual_user(client, stats, random.Random(seed * 1000 + i), indicator_ids, sessions, deadline,
+                      think, revalidate)
+        for i in range(users)
+    ))
+    stats.elapsed = time.perf_counter() - stats.started
+    return stats.summary()
+
+
+def _in_process_client():
+    """进程内 ASGI 客户端（不触发启动事件，不启动调度器和后台预热）"""
+    import httpx
+    from app.main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+
+async def _prepare_in_process():
+    """加载数据（不计入压测）并清空响应缓存"""
+    from app.data.cache import cache
+    from app.services.bociasi_service import bociasi_service
+    from app.services.wind2x_service import wind2x_service
+
+    start = time.perf_counter()
+    await bociasi_service._get_buffered_data()
+    await wind2x_service._get_buffered_data()
+    load_s = time.perf_counter() - start
+    cache.clear()
+    return load_s
+
+
+async def run(args):
+    """按参数运行冷、热两个阶段"""
+    import httpx
+
+    if args.url:
+        # 无法清空远程服务的缓存，cold 阶段需在服务刚启动时运行才有意义
+        print("压测远程服务：cold 阶段的结果取决于服务当前的缓存状态（建议重启服务后运行）", flush=True)
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+        load_s = None
+    else:
+        client = _in_process_client()
+        load_s = await _prepare_in_process()
+
+    async with client:
+        response = await client.get("/api/bociasi/indicators")
+        response.raise_for_status()
+        indicator_ids = [item["id"] for item in response.json()]
+
+        if not args.url:
+            # 上面的指标列表请求也会写入缓存，冷阶段前再清空一次
+            from app.data.cache import cache
+            cache.clear()
+
+        phases = {}
+        print(f"cold: {args.users} 个用户各 {args.cold_sessions} 次会话...", flush=True)
+        phases["cold"] = await run_phase(client, "cold", args.users, indicator_ids, args.seed,
+                                         sessions=args.cold_sessions, think=args.think,
+                                         revalidate=args.revalidate)
+        print(f"warm: {args.users} 个用户持续 {args.duration}s...", flush=True)
+        phases["warm"] = await run_phase(client, "warm", args.users, indicator_ids, args.seed + 1,
+                                         duration=args.duration, think=args.think,
+                                         revalidate=args.revalidate)
+    return {"data_load_s": load_s, "indicators": len(indicator_ids), "phases": phases}
+
+
+def print_report(results):
+    for name, phase in results["phases"].items():
+        latency = phase["latency"]
+        print(f"\n== {name} ==  {phase['requests']} 个请求 / {phase['seconds']:.1f}s，"
+              f"{phase['requests_per_s']:.1f} 请求/s，{phase['sessions_per_s']:.2f} 会话/s，错误 {phase['errors']}")
+        if latency:
+            print(f"总体 p50 {latency['p50_ms']:.1f}ms  p95 {latency['p95_ms']:.1f}ms  p99 {latency['p99_ms']:.1f}ms")
+        print(f"{'接口':<30}{'请求数':>8}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'平均字节':>12}{'错误':>6}")
+        for endpoint, r in phase["endpoints"].items():
+            print(f"{endpoint:<30}{r['requests']:>8}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}"
+                  f"{r['avg_bytes']:>12.0f}{r['errors']:>6}")
+
+
+def compare(before_path, after_path):
+    """对比两次压测结果中的吞吐量和延迟"""
+    with open(before_path, encoding='utf-8') as f:
+        before = json.load(f)
+    with open(after_path, encoding='utf-8') as f:
+        after = json.load(f)
+    print(f"before: {before['meta'].get('commit')}  after: {after['meta'].get('commit')}")
+    a, b = _flatten(before["phases"]), _flatten(after["phases"])
+    print(f"{'项目':<60}{'before':>12}{'after':>12}{'变化':>9}")
+    for key in sorted(k for k in set(a) & set(b) if k.endswith(("_ms", "_per_s"))):
+        change = f"{(b[key] - a[key]) / a[key] * 100:+.1f}%" if a[key] else ""
+        print(f"{key:<60}{a[key]:>12.2f}{b[key]:>12.2f}{change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API压测（模拟仪表盘会话）')
+    parser.add_argument('--url', help='压测已启动的服务（如 http://127.0.0.1:8000），默认进程内运行')
+    parser.add_argument('--rows', type=int, help='进程内运行时使用该规模的合成工作簿（默认 config.EXCEL_PATH）')
+    parser.add_argument('--users', type=int, default=20, help='并发用户数')
+    parser.add_argument('--duration', type=float, default=30, help='warm 阶段持续秒数')
+    parser.add_argument('--cold-sessions', type=int, default=1, help='cold 阶段每个用户的会话数')
+    parser.add_argument('--think', type=float, default=0.0, help='两次请求之间的平均思考时间（秒）')
+    parser.add_argument('--revalidate', action='store_true', help='重复请求时带 If-None-Match（模拟浏览器缓存）')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='结果JSON路径（默认 benchmarks/results/load_<提交>_<时间>.json）')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='对比两次结果')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    logging.disable(logging.WARNING)
+    workdir = None
+    if args.rows and not args.url:
+        import config
+        from synthetic_workbook import build_workbook
+
+        workdir = tempfile.mkdtemp(prefix="bench_load_")
+        config.EXCEL_PATH = os.path.join(workdir, f"BOCIASIV2_{args.rows}.xlsx")
+        print(f"生成 {args.rows} 行合成工作簿...", flush=True)
+        build_workbook(config.EXCEL_PATH, args.rows)
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    commit = _git_commit()
+    results["meta"] = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "target": args.url or "in-process",
+        "rows": args.rows,
+        "users": args.users,
+        "duration": args.duration,
+        "cold_sessions": args.cold_sessions,
+        "think": args.think,
+        "revalidate": args.revalidate,
+    }
+    out = args.out or os.path.join(
+        BACKEND_DIR, "benchmarks", "results",
+        f"load_{commit or 'unknown'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    print_report(results)
+    print(f"\n结果已保存: {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+API冷启动报告
+每轮在全新的子进程中测量：
+    - 导入 app.main、执行启动事件、首个 /health 响应的耗时
+    - 首个成功的 /api/bociasi/overview/data 响应耗时（从进程开始计时）
+    - 各模块数据预热耗时
+另用 python -X importtime 统计各顶层包的导入耗时，并检查是否导入了仅更新任务需要的模块
+
+运行（在 backend 目录下）:
+    python benchmarks/bench_startup.py [--runs 5] [--top 15] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 仅数据更新任务需要、API进程不应在启动时导入的模块
+UPDATER_ONLY_MODULES = ["WindPy", "apscheduler", "openpyxl", "win32com", "update_excel_daily", "update_trace", "data_fetcher", "excel_handler"]
+
+# 在子进程中执行的测量脚本
+PROBE = r"""
+import json, sys, time, logging
+logging.disable(logging.CRITICAL)
+t0 = time.perf_counter()
+from app.main import app
+t_import = time.perf_counter()
+updater_modules = [m for m in UPDATER_ONLY_MODULES if m in sys.modules]
+from fastapi.testclient import TestClient
+from app.api.modules import MODULE_REGISTRY
+with TestClient(app) as client:
+    t_startup = time.perf_counter()
+    client.get("/health")
+    t_health = time.perf_counter()
+    while client.get("/api/bociasi/overview/data").status_code != 200:
+        time.sleep(0.05)
+    t_overview = time.perf_counter()
+    # 等待启动时发起的预热任务全部完成
+    deadline = time.perf_counter() + 300
+    while any(m.warmup_seconds is None for m in MODULE_REGISTRY.values()) and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    print(json.dumps({
+        "import_s": t_import - t0,
+        "startup_s": t_startup - t_import,
+        "first_health_s": t_health - t0,
+        "first_overview_data_s": t_overview - t0,
+        "warmup_s": {key: m.warmup_seconds for key, m in MODULE_REGISTRY.items()},
+        "updater_modules_at_import": updater_modules,
+    }))
+"""
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [BACKEND_DIR, env.get("PYTHONPATH")]))
+    return env
+
+
+def probe() -> dict:
+    """在新进程中测量一次"""
+    code = f"UPDATER_ONLY_MODULES = {UPDATER_ONLY_MODULES!r}\n" + PROBE
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=_env(),
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def import_times() -> dict:
+    """
+    python -X importtime 统计导入 app.main 时各顶层包的自身耗时合计
+
+    Returns:
+        {包名: 毫秒}
+    """
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], cwd=BACKEND_DIR, env=_env(),
+        capture_output=True, text=True, check=True
+    ).stderr
+    totals = defaultdict(float)
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us) / 1000
+    return dict(sorted(totals.items(), key=lambda kv: kv[1], reverse=True))
+
+
+def _median(values):
+    return statistics.median(values) if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API冷启动报告')
+    parser.add_argument('--runs', type=int, default=5, help='测量次数（取中位数）')
+    parser.add_argument('--top', type=int, default=15, help='列出导入耗时最多的前N个包')
+    parser.add_argument('--json', help='同时把结果写入JSON文件')
+    args = parser.parse_args()
+
+    results = [probe() for _ in range(args.runs)]
+    imports = import_times()
+
+    print("== 启动阶段（中位数）==")
+    for key in ("import_s", "startup_s", "first_health_s", "first_overview_data_s"):
+        values = [r[key] for r in results]
+        print(f"{key:<24} {_median(values) * 1000:9.1f} ms   (最小 {min(values) * 1000:.1f} / 最大 {max(values) * 1000:.1f})")
+
+    print("\n== 数据预热（中位数）==")
+    for module in results[0]["warmup_s"]:
+        values = [r["warmup_s"][module] for r in results if r["warmup_s"][module] is not None]
+        print(f"{module:<24} {_median(values) * 1000:9.1f} ms")
+
+    print(f"\n== 导入耗时前{args.top}的包（自身耗时合计）==")
+    for name, ms in list(imports.items())[:args.top]:
+        print(f"{name:<24} {ms:9.1f} ms")
+
+    updater = sorted({m for r in results for m in r["updater_modules_at_import"]})
+    print(f"\n启动时导入的更新任务模块: {', '.join(updater) if updater else '无'}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"runs": results, "import_ms": imports}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
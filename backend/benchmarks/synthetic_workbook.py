@@ -0,0 +1,201 @@
+"""
+合成 BOCIASIV2.xlsx
+按工作表 A 的布局生成157列（A-FA）的测试工作簿，供基准测试使用，不依赖真实数据：
+    - A-Q 列为Wind原始数据（日期、收盘价、换手率、涨跌家数、RSI、国债收益率、市盈率等）
+    - R-X 列为ERP及标准差带
+    - 服务读取的BOCIASI各列（AF、AL、BA、…、EW）为对应量级的序列，阈值列为常数，信号列稀疏
+    - 其余列为随机数，少量 #N/A
+最后一行的公式列（R-EW）写入公式，使 ExcelHandler.save_excel 追加时按真实流程复制公式
+
+运行（在 backend 目录下）:
+    python benchmarks/synthetic_workbook.py out.xlsx [--rows 5000]
+"""
+import argparse
+import os
+import sys
+from datetime import date, datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+TOTAL_COLUMNS = 157
+
+# BOCIASI 服务开始读取数据的行（与 bociasi_service 中的 START_ROW_INDEX 一致，含标题行）
+BOCIASI_START_ROW_INDEX = 2193
+
+# BOCIASI 服务读取的列
+BOCIASI_COLUMNS = {
+    "equity_premium": 31, "eb_position_gap": 37, "eb_yield_gap": 52, "margin_balance": 65,
+    "turnover": 79, "up_down_ratio": 90, "ma20": 93, "rsi": 96,
+    "fast_line": 106, "slow_line": 107, "di_signal": 112,
+    "line_green": 113, "line_black": 114, "line_yellow": 115,
+    "slow_threshold_1": 137, "slow_threshold_0": 138, "slow_threshold_neg1": 139,
+    "marker_red": 143, "marker_green": 144,
+    "fast_threshold_1": 145, "fast_threshold_0": 146, "fast_threshold_neg1": 147,
+    "marker_fast_buy": 151, "marker_fast_sell": 152,
+}
+
+# Excel 不支持1900年以前的日期，这些行的日期写成文本（服务按 pd.to_datetime 解析）
+EXCEL_MIN_DATE = datetime(1900, 3, 1)
+
+
+def _walk(rng, n, start, scale, low=None, high=None):
+    """随机游走（可限制范围）"""
+    values = start + np.cumsum(rng.normal(0, scale, n))
+    if low is not None or high is not None:
+        values = np.clip(values, low, high)
+    return values
+
+
+def _oscillator(rng, n, low, high):
+    """在 [low, high] 之间摆动的序列（平滑后的均值回复过程）"""
+    x = np.zeros(n)
+    for i in range(1, n):
+        x[i] = 0.97 * x[i - 1] + rng.normal(0, 0.25)
+    x = (x - x.min()) / (np.ptp(x) or 1)
+    return low + x * (high - low)
+
+
+def _sparse(rng, n, values, probability):
+    """大部分为空、偶尔出现信号的列"""
+    column = np.full(n, np.nan)
+    mask = rng.random(n) < probability
+    column[mask] = values[mask]
+    return column
+
+
+def generate_columns(n, seed=0):
+    """
+    生成各列数据
+
+    Args:
+        n: 数据行数
+        seed: 随机种子
+
+    Returns:
+        (n, 157) 的float数组，第0列（日期）留空
+    """
+    rng = np.random.default_rng(seed)
+    m = config.COLUMN_MAPPING
+    data = rng.normal(0, 1, (n, TOTAL_COLUMNS)).cumsum(axis=0) * 0.1 + 50
+
+    close = np.exp(_walk(rng, n, np.log(4000), 0.012))
+    pe = np.clip(_walk(rng, n, 16, 0.08), 8, 40)
+    treasury = np.clip(_walk(rng, n, 3.0, 0.01), 1.5, 4.5)
+    data[:, m['turnover']] = np.abs(_walk(rng, n, 1.5, 0.05)) + 0.3
+    data[:, m['close']] = close
+    data[:, m['equity_fund']] = np.exp(_walk(rng, n, np.log(8000), 0.01))
+    data[:, m['bond_fund']] = np.exp(_walk(rng, n, np.log(3000), 0.002))
+    data[:, m['dividend']] = np.clip(_walk(rng, n, 2.0, 0.02), 0.8, 4)
+    data[:, m['margin']] = np.clip(_walk(rng, n, 15000, 50), 3000, 25000)
+    rise = rng.integers(300, 4500, n)
+    fall = rng.integers(300, 4500, n)
+    data[:, m['rise']] = rise
+    data[:, m['flat']] = rng.integers(50, 400, n)
+    data[:, m['fall']] = fall
+    data[:, m['limit_up']] = rng.integers(0, 150, n)
+    data[:, m['limit_down']] = rng.integers(0, 80, n)
+    data[:, m['rsi']] = _oscillator(rng, n, 15, 85)
+    data[:, m['ma20']] = _oscillator(rng, n, 5, 95)
+    data[:, m['treasury']] = treasury
+    data[:, m['pe_ttm']] = pe
+    data[:, m['pe_inverse']] = 1 / pe
+
+    erp = 100 / pe - treasury
+    mean = np.convolve(erp, np.ones(750) / 750, mode='same')
+    sd = max(float(np.std(erp)), 0.1)
+    data[:, m['erp']] = erp
+    data[:, m['band_s']] = mean
+    data[:, m['band_t']] = sd
+    data[:, m['band_u']] = mean - sd
+    data[:, m['band_v']] = mean + sd
+    data[:, m['band_w']] = mean - 2 * sd
+    data[:, m['band_x']] = mean + 2 * sd
+
+    b = BOCIASI_COLUMNS
+    data[:, b['equity_premium']] = _walk(rng, n, 5, 0.05)
+    data[:, b['eb_position_gap']] = _walk(rng, n, 0, 0.02)
+    data[:, b['eb_yield_gap']] = _walk(rng, n, 0, 0.02)
+    data[:, b['margin_balance']] = data[:, m['margin']] / 100
+    data[:, b['turnover']] = data[:, m['turnover']]
+    data[:, b['up_down_ratio']] = rise / np.maximum(fall, 1)
+    data[:, b['ma20']] = data[:, m['ma20']]
+    data[:, b['rsi']] = data[:, m['rsi']]
+    fast = _oscillator(rng, n, -1.5, 1.5)
+    slow = np.convolve(fast, np.ones(20) / 20, mode='same')
+    data[:, b['fast_line']] = fast
+    data[:, b['slow_line']] = slow
+    data[:, b['di_signal']] = np.sign(np.round(slow, 1))
+    data[:, b['line_green']] = -1
+    data[:, b['line_black']] = 0
+    data[:, b['line_yellow']] = 1
+    for key, level in (("slow_threshold_1", 1), ("slow_threshold_0", 0), ("slow_threshold_neg1", -1),
+                       ("fast_threshold_1", 1), ("fast_threshold_0", 0), ("fast_threshold_neg1", -1)):
+        data[:, b[key]] = level
+    data[:, b['marker_red']] = _sparse(rng, n, slow, 0.02)
+    data[:, b['marker_green']] = _sparse(rng, n, slow, 0.02)
+    data[:, b['marker_fast_buy']] = _sparse(rng, n, fast, 0.03)
+    data[:, b['marker_fast_sell']] = _sparse(rng, n, fast, 0.03)
+    return data
+
+
+def build_workbook(path, rows=5000, seed=0):
+    """
+    生成合成工作簿
+
+    Args:
+        path: 输出路径
+        rows: BOCIASI读取的数据行数（工作表另含其前的历史行，与真实工作簿一致）
+        seed: 随机种子
+
+    Returns:
+        工作表数据行总数
+    """
+    import pandas as pd
+    from openpyxl import Workbook
+
+    n = BOCIASI_START_ROW_INDEX - 1 + rows
+    dates = pd.bdate_range(end=date.today(), periods=n).to_pydatetime()
+    data = generate_columns(n, seed)
+    formula_columns = range(17, 153)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(config.SHEET_NAME)
+    names = {idx: key for key, idx in config.COLUMN_MAPPING.items()}
+    names.update({idx: key for key, idx in BOCIASI_COLUMNS.items()})
+    ws.append([names.get(i, f"col{i}") for i in range(TOTAL_COLUMNS)])
+
+    for i in range(n):
+        row = [None if np.isnan(v) else round(float(v), 6) for v in data[i]]
+        row[0] = dates[i] if dates[i] >= EXCEL_MIN_DATE else dates[i].strftime('%Y-%m-%d')
+        if i and i % 97 == 0:
+            # 少量 #N/A（真实工作簿中取不到值时的样子）
+            row[5] = '#N/A'
+        if i == n - 1:
+            # 最后一行写公式：save_excel 追加新行时从上一行复制并调整行号
+            excel_row = i + 2
+            for col in formula_columns:
+                if col not in names:
+                    row[col] = f"=C{excel_row}*0+{row[col] if row[col] is not None else 0}"
+        ws.append(row)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    wb.save(path)
+    return n
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成合成 BOCIASIV2.xlsx')
+    parser.add_argument('path', help='输出路径')
+    parser.add_argument('--rows', type=int, default=5000, help='BOCIASI数据行数（1k-50k）')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    n = build_workbook(args.path, args.rows, args.seed)
+    print(f"已生成 {args.path}: {n} 行 x {TOTAL_COLUMNS} 列（{os.path.getsize(args.path) / 1e6:.1f} MB）")
+
+
+if __name__ == '__main__':
+    main()
@@ -42,6 +42,16 @@ WIND_SECTOR_ID = "a001010100000000"  # 万得全A成分股板块ID
 # 国债收益率代码
 TREASURY_YIELD_CODE = "M1004271"  # 10年期国债收益率
 
+# Wind接口来源：windpy（Wind终端）或 simulator（本地模拟器，见 wind_simulator.py，用于压测和无终端环境）
+WIND_BACKEND = os.environ.get('WIND_BACKEND', 'windpy').lower()
+
+# 模拟器参数
+WIND_SIM_LATENCY = float(os.environ.get('WIND_SIM_LATENCY', '0.05'))  # 每次调用的基础耗时（秒）
+WIND_SIM_LATENCY_PER_CODE = float(os.environ.get('WIND_SIM_LATENCY_PER_CODE', '0.0002'))  # 每个代码增加的耗时（秒）
+WIND_SIM_ERROR_RATE = float(os.environ.get('WIND_SIM_ERROR_RATE', '0'))  # 返回错误码的概率（0-1）
+WIND_SIM_UNIVERSE = int(os.environ.get('WIND_SIM_UNIVERSE', '5300'))  # A股股票数量
+WIND_SIM_SEED = int(os.environ.get('WIND_SIM_SEED', '0'))  # 延迟抖动和错误注入的随机种子
+
 # ========== 数据字段配置 ==========
 COLUMN_MAPPING = {
     'date': 0,          # A: 日期
@@ -83,6 +93,14 @@ BACKUP_RETENTION_DAYS = 7
 LOG_LEVEL = 'INFO'
 LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
 
+# 更新任务trace（每次运行一个JSON Lines文件，见 update_trace.py）
+TRACE_DIR = os.path.join(LOG_DIR, 'traces')
+TRACE_RETENTION_DAYS = 60
+
+# 历史回补（python update_excel_daily.py backfill），进度检查点保存在这里，中断后重新运行同一区间会从断点继续
+BACKFILL_DIR = os.path.join(LOG_DIR, 'backfill')
+BACKFILL_CHUNK_DAYS = 20  # 每次批量获取的交易日数
+
 def get_backup_filename():
     """生成带时间戳的备份文件名"""
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
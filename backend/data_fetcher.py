@@ -1,10 +1,30 @@
 """
 数据获取模块 - 整合Wind API数据获取和MA20计算
 """
-from WindPy import w
 from datetime import datetime
 import numpy as np
 import config
+from update_trace import TracedWind
+from wind_simulator import load_wind_api
+
+# fetch_market_data 返回的字段（pe_inverse 只在 PE_TTM 有效时才有）
+MARKET_DATA_KEYS = [
+    'date', 'turnover', 'close', 'equity_fund', 'bond_fund', 'dividend', 'margin', 'rise', 'flat', 'fall',
+    'limit_up', 'limit_down', 'rsi', 'ma20', 'treasury', 'pe_ttm',
+]
+
+
+class WindRangeError(Exception):
+    """批量（区间）接口返回错误"""
+
+
+def _date_str(day):
+    """Wind 返回的日期（datetime/date/字符串）-> YYYY-MM-DD 字符串"""
+    return day.strftime('%Y-%m-%d') if hasattr(day, 'strftime') else str(day)[:10]
+
+
+# WindPy 或本地模拟器（config.WIND_BACKEND），每次调用都记录到当前更新任务的trace中
+w = TracedWind(load_wind_api())
 
 class WindDataFetcher:
     """Wind 数据获取类"""
@@ -57,6 +77,16 @@ class WindDataFetcher:
         
         return []
     
+    def get_trade_dates_between(self, start_date, end_date=None):
+        """获取区间内的所有交易日（包括两端），end_date 为空时到今天"""
+        end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+        trade_days = w.tdays(start_date, end_date, "")
+        
+        if trade_days.ErrorCode == 0 and trade_days.Data:
+            return [d for d in (_date_str(date) for date in trade_days.Data[0]) if start_date <= d <= end_date]
+        
+        return []
+    
     def get_margin_balance(self, date):
         """单独获取融资余额"""
         try:
@@ -185,21 +215,181 @@ class WindDataFetcher:
                 treasury_data = result_treasury.Data[0] if isinstance(result_treasury.Data, list) else result_treasury.Data
                 data['treasury'] = treasury_data[0] if isinstance(treasury_data, list) else treasury_data
             
-            # 7. 计算MA20宽度
-            data['ma20'] = self.calculate_ma20_breadth(date)
-            
-            # 8. 计算倒数市盈率 (PE Inverse)
-            if data['pe_ttm'] is not None and data['pe_ttm'] != 0:
-                 try:
-                    data['pe_inverse'] = 1 / data['pe_ttm']
-                 except:
-                    data['pe_inverse'] = None
+            # 7-8. MA20宽度、倒数市盈率
+            self.complete_derived(data)
             
         except Exception as e:
             print(f"⚠️ 获取 {date} 数据时出错: {str(e)}")
         
         return data
     
+    def complete_derived(self, data, ma20_by_date=None):
+        """
+        计算数据字典中的衍生字段：MA20宽度、倒数市盈率 (PE Inverse)
+        
+        参数:
+            data: fetch_market_data / fetch_market_data_range 的数据字典（原地修改）
+            ma20_by_date: calculate_ma20_breadth_range 的结果；为空时单独计算当天的MA20宽度
+        """
+        # 计算MA20宽度
+        if ma20_by_date is not None:
+            data['ma20'] = ma20_by_date.get(data['date'])
+        else:
+            data['ma20'] = self.calculate_ma20_breadth(data['date'])
+        
+        # 计算倒数市盈率 (PE Inverse)
+        if data['pe_ttm'] is not None and data['pe_ttm'] != 0:
+             try:
+                data['pe_inverse'] = 1 / data['pe_ttm']
+             except:
+                data['pe_inverse'] = None
+    
+    def fetch_market_data_range(self, dates):
+        """
+        批量获取一段交易日的市场数据（MA20宽度和倒数市盈率除外，需另行调用 complete_derived，
+        MA20宽度可先用 calculate_ma20_breadth_range 按区间计算）
+        
+        日序列指标（收盘价、换手率、基金指数、RSI、国债收益率等）按整个区间一次取回，
+        而不是每天各调用一次
+        
+        参数:
+            dates: 升序的交易日字符串列表，格式 "YYYY-MM-DD"
+        
+        返回:
+            dict: 日期 -> 数据字典（与 fetch_market_data 的键相同）；任一批量接口失败时返回None，由调用方逐日获取
+        """
+        begin, end = dates[0], dates[-1]
+        rows = {date: {key: None for key in MARKET_DATA_KEYS} for date in dates}
+        for date, data in rows.items():
+            data['date'] = date
+        
+        def fill(result, keys):
+            """按 Times 对齐日序列结果（wsd/edb：Data[字段][日期]）"""
+            if result.ErrorCode != 0:
+                raise WindRangeError(f"{keys} ErrorCode={result.ErrorCode}")
+            for t, day in enumerate(result.Times):
+                data = rows.get(_date_str(day))
+                if data is None:
+                    continue
+                for i, key in enumerate(keys):
+                    if i < len(result.Data) and t < len(result.Data[i]):
+                        data[key] = result.Data[i][t]
+        
+        try:
+            # 1. 万得全A：收盘价、换手率、股息率、PE_TTM
+            fill(w.wsd(config.WIND_INDEX_CODE, "close,free_turn_n,val_dividendyield3,pe_ttm", begin, end, "PriceAdj=F"),
+                 ['close', 'turnover', 'dividend', 'pe_ttm'])
+            # 2. 基金数据（偏股、偏债分别获取）
+            fill(w.wsd(config.WIND_EQUITY_FUND_CODE, "close", begin, end, "PriceAdj=F"), ['equity_fund'])
+            fill(w.wsd(config.WIND_BOND_FUND_CODE, "close", begin, end, "PriceAdj=F"), ['bond_fund'])
+            # 5. RSI
+            fill(w.wsd(config.WIND_INDEX_CODE, "RSI", begin, end, "RSI_N=20;PriceAdj=F"), ['rsi'])
+            # 6. 国债收益率（区间内缺失的日期沿用前值，与逐日获取时的 Fill=Previous 一致）
+            fill(w.edb(config.TREASURY_YIELD_CODE, begin, end, "Fill=Previous"), ['treasury'])
+            previous = None
+            for data in rows.values():
+                if data['treasury'] is None:
+                    data['treasury'] = previous
+                previous = data['treasury']
+            
+            # 4. 涨跌家数（reportdate 列为日期）
+            result_change = w.wset(
+                "numberofchangeindomestic",
+                f"startdate={begin};enddate={end};frequency=day;"
+                "field=reportdate,risenumberofshandsz,noriseorfallnumberofshandsz,"
+                "fallnumberofshandsz,limitupnumofshandsz,limitdownnumofshandsz"
+            )
+            if result_change.ErrorCode != 0:
+                raise WindRangeError(f"numberofchangeindomestic ErrorCode={result_change.ErrorCode}")
+            if result_change.Data and len(result_change.Data) > 5:
+                for t, day in enumerate(result_change.Data[0]):
+                    data = rows.get(_date_str(day))
+                    if data is not None:
+                        for i, key in enumerate(['rise', 'flat', 'fall', 'limit_up', 'limit_down'], start=1):
+                            data[key] = result_change.Data[i][t]
+            
+            # 3. 融资余额（sort=asc，每个交易日一行；行数对不上时逐日获取）
+            result_margin = w.wset(
+                "markettradingstatistics(value)",
+                f"exchange=all;startdate={begin};enddate={end};frequency=day;sort=asc;field=margin_balance"
+            )
+            balances = result_margin.Data[-1] if result_margin.ErrorCode == 0 and result_margin.Data else []
+            if len(balances) == len(dates):
+                for date, margin_balance in zip(dates, balances):
+                    rows[date]['margin'] = margin_balance / 100000000 if margin_balance and margin_balance > 1000000 else margin_balance
+            else:
+                for date in dates:
+                    rows[date]['margin'] = self.get_margin_balance(date)
+        except WindRangeError as e:
+            print(f"⚠️ 批量获取 {begin} ~ {end} 数据失败: {e}")
+            return None
+        
+        return rows
+    
+    def calculate_ma20_breadth_range(self, dates):
+        """
+        计算一段交易日的MA20宽度指标（历史回补用）
+        
+        成分股取区间首尾两日成分股的并集：万得全A即全部上市A股，区间内新上市的股票在上市前、
+        退市的股票在退市后都没有行情，逐日跳过空值后与逐日获取当天成分股的统计范围相同。
+        每批股票用 wsd 各取一次整个区间的收盘价和MA20（wsd 多代码时只支持单个指标），在本地逐日统计，
+        而不是每天对全部股票调用一次 wss。
+        
+        参数:
+            dates: 升序的交易日字符串列表，格式 "YYYY-MM-DD"
+        
+        返回:
+            dict: 日期 -> MA20宽度百分比（当天没有有效数据时为None）；任一接口失败时返回None，由调用方逐日计算
+        """
+        begin, end = dates[0], dates[-1]
+        try:
+            # 1. 获取成分股
+            codes = []
+            for date in dict.fromkeys([begin, end]):
+                sector_data = w.wset("sectorconstituent", f"date={date};sectorid={config.WIND_SECTOR_ID}")
+                if sector_data.ErrorCode != 0:
+                    raise WindRangeError(f"sectorconstituent ErrorCode={sector_data.ErrorCode}")
+                codes.extend(sector_data.Data[1])
+            codes = list(dict.fromkeys(codes))
+            if not codes:
+                raise WindRangeError("成分股数量为0")
+            
+            # 2. 分批获取区间内的收盘价和均线，按日期累计有效股票数和站上MA20的股票数
+            positions = {date: t for t, date in enumerate(dates)}
+            valid_stocks = np.zeros(len(dates), dtype=int)
+            above_ma20_count = np.zeros(len(dates), dtype=int)
+            
+            def matrix(result, count):
+                """wsd 多代码结果（Data[代码][日期]）-> 代码 × 区间交易日 的数组，缺失为NaN"""
+                if result.ErrorCode != 0:
+                    raise WindRangeError(f"wsd ErrorCode={result.ErrorCode}")
+                values = np.full((count, len(dates)), np.nan)
+                for t, day in enumerate(result.Times):
+                    column = positions.get(_date_str(day))
+                    if column is not None:
+                        values[:, column] = [np.nan if row[t] is None else row[t] for row in result.Data[:count]]
+                return values
+            
+            for i in range(0, len(codes), config.MA20_BATCH_SIZE):
+                batch_codes = codes[i:i+config.MA20_BATCH_SIZE]
+                batch_codes_str = ",".join(batch_codes)
+                closes = matrix(w.wsd(batch_codes_str, "close", begin, end, "priceAdj=F"), len(batch_codes))
+                mas = matrix(w.wsd(batch_codes_str, "MA", begin, end, "MA_N=20;priceAdj=F"), len(batch_codes))
+                
+                valid = ~np.isnan(closes) & ~np.isnan(mas)
+                valid_stocks += valid.sum(axis=0)
+                above_ma20_count += (valid & (closes > mas)).sum(axis=0)
+            
+            # 3. 计算比例（与 calculate_ma20_breadth 的取整相同）
+            return {
+                date: round((int(above_ma20_count[t]) / int(valid_stocks[t])) * 100, 2) if valid_stocks[t] else None
+                for date, t in positions.items()
+            }
+        
+        except Exception as e:
+            print(f"  ⚠️ 批量计算 {begin} ~ {end} MA20宽度失败: {e}")
+            return None
+    
     def calculate_ma20_breadth(self, date):
         """
         计算指定日期的MA20宽度指标
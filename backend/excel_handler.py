@@ -1,12 +1,48 @@
 """
 Excel操作模块 - 读写Excel文件，追加数据，备份
 """
+import numpy as np
 import pandas as pd
 import shutil
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import os
 import config
 
+# 数据列数（A-Q列）
+DATA_COLUMNS = 17
+# 待追加行缓冲区的初始容量
+PENDING_CAPACITY = 32
+
+
+def _cell_date(value, epoch=None):
+    """
+    A列单元格的值 -> date，按日期比较（而不是按文本比较）
+
+    参数:
+        value: datetime/date、Excel 日期序列号（数字，未设置日期格式的单元格）或日期文本（如 "2026-02-12"、"2026/2/12"）
+        epoch: 工作簿的日期起点（openpyxl 的 wb.epoch，1904 日期系统的工作簿与默认不同）
+
+    返回:
+        date；空单元格返回 date.max（排在最后）
+    """
+    if value is None:
+        return date.max
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        from openpyxl.utils.datetime import from_excel, WINDOWS_EPOCH
+        return from_excel(value, epoch or WINDOWS_EPOCH).date()
+    try:
+        parsed = pd.Timestamp(str(value).strip())
+    except ValueError:
+        parsed = pd.NaT
+    if pd.isna(parsed):
+        raise ValueError(f"无法识别的日期: {value!r}")
+    return parsed.date()
+
+
 class ExcelHandler:
     """Excel文件处理类"""
     
@@ -20,7 +56,35 @@ class ExcelHandler:
         """
         self.excel_path = excel_path or config.EXCEL_PATH
         self.sheet_name = sheet_name or config.SHEET_NAME
-        self.df = None
+        self._df = None
+        # 待追加的行（append_data 写入，访问 df 时一次性合并）
+        self._pending = None
+        self._pending_count = 0
+
+    @property
+    def df(self):
+        """A-Q列数据（包含尚未合并的追加行）"""
+        if self._pending_count:
+            self._flush_pending()
+        return self._df
+
+    @df.setter
+    def df(self, value):
+        self._df = value
+        self._pending = None
+        self._pending_count = 0
+
+    def _flush_pending(self):
+        """把缓冲区中的追加行一次性合并到 DataFrame（只复制一次）"""
+        pending = self._pending[:self._pending_count]
+        # 与逐行 concat 的结果一致：含空值（None）的列保持object类型，写入Excel时仍为空单元格而不是NaN
+        new_df = pd.DataFrame({
+            name: pd.Series(list(pending[:, i]), dtype=object if any(v is None for v in pending[:, i]) else None)
+            for i, name in enumerate(self._df.columns)
+        })
+        self._df = pd.concat([self._df, new_df], ignore_index=True)
+        self._pending = None
+        self._pending_count = 0
     
     def read_excel(self):
         """读取Excel文件（只读取A-Q列的数据列）"""
@@ -76,27 +140,33 @@ class ExcelHandler:
     
     def append_data(self, data_dict):
         """
-        追加一行数据到DataFrame
+        追加一行数据（先写入预分配的缓冲区，访问 df 或保存时一次性合并到DataFrame）
         
         参数:
             data_dict: 数据字典，keys应与config.COLUMN_MAPPING的keys匹配
         """
-        if self.df is None:
+        if self._df is None:
             self.read_excel()
         
         # 构建新行数据（按照Excel列顺序）
-        # self.df 是读取的前17列（A-Q），所以这里必须初始化为17个元素的列表
-        new_row = [None] * 17
+        # self.df 是读取的前17列（A-Q），所以这里必须是17个元素
+        if self._pending is None:
+            self._pending = np.full((PENDING_CAPACITY, DATA_COLUMNS), None, dtype=object)
+        elif self._pending_count == len(self._pending):
+            # 缓冲区已满：容量翻倍
+            grown = np.full((len(self._pending) * 2, DATA_COLUMNS), None, dtype=object)
+            grown[:self._pending_count] = self._pending[:self._pending_count]
+            self._pending = grown
         
+        new_row = self._pending[self._pending_count]
         for key, col_idx in config.COLUMN_MAPPING.items():
             if key in data_dict:
                 # 确保索引在范围内
-                if col_idx < 17:
+                if col_idx < DATA_COLUMNS:
                     new_row[col_idx] = data_dict[key]
         
-        # 转换为DataFrame并追加
-        new_df = pd.DataFrame([new_row], columns=self.df.columns)
-        self.df = pd.concat([self.df, new_df], ignore_index=True)
+        # 不在这里 concat（每次都会复制整个DataFrame），保存或读取 df 时再合并
+        self._pending_count += 1
     
     def save_excel(self):
         """保存Excel文件，使用openpyxl直接追加数据行并复制公式"""
@@ -288,6 +358,58 @@ class ExcelHandler:
             print(f"   ❌ 更新融资余额失败: {str(e)}")
             return False
     
+    def truncate_from(self, date_str):
+        """
+        删除指定日期（含）及之后的所有行（回滚）
+
+        A列日期升序，二分查找第一行 >= date_str，再用一次 delete_rows 删除尾部所有行；
+        截断位置以上的数据、公式和格式不变。单元格可以是日期、Excel 序列号或日期文本，统一转换为日期后比较
+
+        参数:
+            date_str: 日期字符串，格式 "YYYY-MM-DD"
+
+        返回:
+            int: 删除的行数
+        """
+        try:
+            from openpyxl import load_workbook
+            wb = load_workbook(self.excel_path)
+            ws = wb[self.sheet_name]
+
+            # 末尾可能有只带格式的空行，从最后一个有日期的行开始
+            last_row = ws.max_row
+            while last_row > 1 and ws.cell(row=last_row, column=1).value is None:
+                last_row -= 1
+
+            # 二分查找第一行日期 >= date_str（第1行是标题）
+            target = _cell_date(date_str)
+            low, high = 2, last_row + 1
+            while low < high:
+                mid = (low + high) // 2
+                if _cell_date(ws.cell(row=mid, column=1).value, wb.epoch) < target:
+                    low = mid + 1
+                else:
+                    high = mid
+            cut_row = low
+
+            deleted = ws.max_row - cut_row + 1
+            if cut_row > last_row or deleted <= 0:
+                print(f"   没有 {date_str} 及之后的数据")
+                wb.close()
+                return 0
+
+            print(f"   删除第{cut_row}行（{_cell_date(ws.cell(row=cut_row, column=1).value, wb.epoch)}）及之后共 {deleted} 行")
+            ws.delete_rows(cut_row, deleted)
+            wb.save(self.excel_path)
+            wb.close()
+
+            # 已读取的数据失效，下次访问时重新读取
+            self.df = None
+            print(f"   ✅ 已删除 {date_str} 及之后的数据，最后一行: 第{cut_row - 1}行")
+            return deleted
+        except Exception as e:
+            raise Exception(f"删除数据失败: {str(e)}")
+
     def backup_excel(self):
         """
         备份Excel文件
@@ -329,8 +451,13 @@ class ExcelHandler:
         """
         调用Excel程序打开文件并强制计算公式
         """
-        import win32com.client
-        import pythoncom
+        try:
+            import win32com.client
+            import pythoncom
+        except ImportError:
+            # 非Windows环境（如使用Wind模拟器压测时）没有Excel，跳过重算
+            print("   ⚠️ 未安装pywin32（非Windows环境），跳过Excel公式重算")
+            return False
         import os
         
         print("📊 正在启动Excel重新计算公式...")
@@ -0,0 +1,385 @@
+"""
+静态数据快照模块 - 生成前端离线使用的静态数据
+
+快照由一个很小的清单文件 public/snapshot/manifest.json 和若干分片组成，
+文件名中带内容哈希（如 bociasi.3f9a0c1d2e4b.json）：
+- bociasi: 11个子指标共享的一张底表，外加每个子指标的 value 列和统计指标
+- wind_2x_erp: ERP 2X 数据
+内容不变的分片跨天保持同一文件名，可以被nginx/浏览器长期缓存（immutable），
+前端只下载当前视图需要的分片。
+
+每日更新通常只新增一两行（外加修正上一日的融资余额），因此分片分为两部分：
+基础文件（base）尽量保持不变，当天相对基础文件新增/变化的行写入一个很小的
+增量文件（delta）。老访客浏览器里已缓存基础文件，每天只需下载增量；
+增量行数超过 DELTA_MAX_ROWS 或出现删除行（回滚）时才重新生成基础文件。
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+# 快照输出目录（相对于仓库根目录）
+SNAPSHOT_DIR = os.path.join('public', 'snapshot')
+MANIFEST_NAME = 'manifest.json'
+
+# BOCIASI 全部子指标
+BOCIASI_INDICATORS = [
+    'overview', 'equity_premium', 'eb_position_gap', 'eb_yield_gap',
+    'margin_balance', 'slow_line', 'ma20', 'turnover',
+    'up_down_ratio', 'rsi', 'fast_line'
+]
+BOCIASI_START_DATE = "2016-01-01"  # 匹配 BOCIASI 默认
+WIND2X_START_DATE = "2005-01-01"
+BOCIASI_SHARD = "bociasi"
+WIND2X_SHARD = "wind_2x_erp"
+
+# 分片文件名中保留的哈希长度
+HASH_LENGTH = 12
+
+# 流式写盘时每次写入的字符数
+WRITE_CHUNK_SIZE = 1 << 16
+
+# 增量文件累积超过该行数时重新生成基础文件（约一个月的交易日）
+DELTA_MAX_ROWS = 20
+
+
+def get_repo_dir():
+    """仓库根目录"""
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_snapshot_dir(repo_dir=None):
+    """快照输出目录"""
+    return os.path.join(repo_dir or get_repo_dir(), SNAPSHOT_DIR)
+
+
+async def collect_snapshot_payloads(end_date=None):
+    """
+    从服务层获取所有指标数据
+
+    参数:
+        end_date: 结束日期，默认今天
+
+    返回:
+        dict: 分片键 -> 可JSON序列化的数据
+    """
+    from app.services.bociasi_service import bociasi_service
+    from app.services.wind2x_service import wind2x_service
+
+    end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+
+    async def build_wind2x_payload():
+        return await wind2x_service.fetch_indicator_data("erp_2x", WIND2X_START_DATE, end_date)
+
+    # BOCIASI（共享底表 + 每个子指标的 value 列和统计指标）与 Wind 2X ERP 同时构建
+    bociasi_payload, wind2x_payload = await asyncio.gather(
+        build_bociasi_payload(bociasi_service, end_date),
+        build_wind2x_payload(),
+    )
+    return {BOCIASI_SHARD: bociasi_payload, WIND2X_SHARD: wind2x_payload}
+
+
+async def build_bociasi_payload(service, end_date):
+    """
+    构建规范化的 BOCIASI 分片
+
+    各子指标的数据行只有 value 不同，因此底表只写一次（省略空值），
+    每个子指标只记录 value 取自哪一列以及统计指标。格式与批量接口 /bociasi/data 相同。
+    """
+    return await service.fetch_batch(BOCIASI_INDICATORS, BOCIASI_START_DATE, end_date)
+
+
+def expand_bociasi_indicator(shard, indicator_id):
+    """
+    从 BOCIASI 分片还原单个子指标的数据（与前端逻辑一致，与 /bociasi/{id}/data 响应结构相同）
+
+    返回:
+        dict，子指标不存在时返回None
+    """
+    info = (shard or {}).get('indicators', {}).get(indicator_id)
+    if not info:
+        return None
+
+    columns = shard['columns']
+    value_column = info['value_column']
+    data_points = []
+    for row in shard['data_points']:
+        point = {c: row.get(c) for c in columns}
+        point['date'] = row['date']
+        value = row.get(value_column)
+        point['value'] = value if value is not None else 0
+        data_points.append(point)
+
+    result = {k: v for k, v in info.items() if k != 'value_column'}
+    result['data_points'] = data_points
+    return result
+
+
+def _stream_json(output_dir, key, payload):
+    """
+    把数据流式编码写入磁盘，同时计算内容哈希，最后以哈希命名
+
+    编码结果与 json.dumps(..., separators=(',', ':')) 完全一致，不在内存中拼出整份JSON。
+
+    返回:
+        (文件名, 字节数, 是否新写入)
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    digest = hashlib.sha256()
+    size = 0
+    tmp_path = os.path.join(output_dir, f".{key}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        buffer = []
+        buffered = 0
+        for chunk in encoder.iterencode(payload):
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= WRITE_CHUNK_SIZE:
+                data = ''.join(buffer).encode('utf-8')
+                digest.update(data)
+                f.write(data)
+                size += len(data)
+                buffer, buffered = [], 0
+        data = ''.join(buffer).encode('utf-8')
+        digest.update(data)
+        f.write(data)
+        size += len(data)
+
+    filename = f"{key}.{digest.hexdigest()[:HASH_LENGTH]}.json"
+    path = os.path.join(output_dir, filename)
+    if os.path.exists(path):
+        os.remove(tmp_path)
+        return filename, size, False
+    os.replace(tmp_path, path)
+    return filename, size, True
+
+
+def load_manifest(output_dir=None):
+    """读取快照清单，不存在时返回None"""
+    path = os.path.join(output_dir or get_snapshot_dir(), MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_shard(key, manifest=None, output_dir=None):
+    """
+    读取一个分片的数据
+
+    参数:
+        key: 分片键，如 "bociasi.overview"、"wind_2x_erp"
+        manifest: 已读取的清单（可选）
+        output_dir: 快照目录（可选）
+
+    返回:
+        分片数据，不存在时返回None
+    """
+    output_dir = output_dir or get_snapshot_dir()
+    manifest = manifest or load_manifest(output_dir)
+    if not manifest or key not in manifest.get('shards', {}):
+        return None
+    entry = manifest['shards'][key]
+    payload = _read_json(os.path.join(output_dir, entry['file']))
+    if entry.get('delta'):
+        payload = apply_delta(payload, _read_json(os.path.join(output_dir, entry['delta']['file'])))
+    return payload
+
+
+def _read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compute_delta(base, payload):
+    """
+    计算 payload 相对 base 的增量
+
+    行以日期为键；增量包含新增和内容变化的行，以及除 data_points 外的全部字段
+    （统计指标、更新时间等）。
+
+    返回:
+        dict 增量；base 中有行被删除（如回滚）时返回None，需要重新生成基础文件
+    """
+    base_rows = {row['date']: row for row in base.get('data_points', [])}
+    new_dates = {row['date'] for row in payload.get('data_points', [])}
+    if not new_dates.issuperset(base_rows):
+        return None
+
+    rows = [row for row in payload.get('data_points', []) if base_rows.get(row['date']) != row]
+    fields = {k: v for k, v in payload.items() if k != 'data_points'}
+    return {"rows": rows, "fields": fields}
+
+
+def apply_delta(base, delta):
+    """把增量应用到基础数据上（与前端 applyDelta 逻辑一致）"""
+    merged = {row['date']: row for row in base.get('data_points', [])}
+    for row in delta.get('rows', []):
+        merged[row['date']] = row
+    result = dict(base)
+    result.update(delta.get('fields', {}))
+    result['data_points'] = [merged[d] for d in sorted(merged)]
+    return result
+
+
+def write_snapshot(payloads, output_dir=None, generated_at=None):
+    """
+    写入分片和清单
+
+    上一版分片的基础文件仍可用时只写增量文件，否则重新生成基础文件。
+    分片在当前进程内逐个流式编码写盘（只有两个分片，交给进程池反而要先把整份数据
+    pickle 到子进程，比直接编码还慢）。
+    所有文件按内容哈希命名，已存在则不重写；清单最后写入，保证前端看到的清单
+    引用的文件都已存在。上一版清单引用的文件保留一代，供正在加载的客户端使用。
+
+    参数:
+        payloads: 分片键 -> 数据
+        output_dir: 输出目录
+        generated_at: 生成时间字符串
+
+    返回:
+        dict: 新的清单
+    """
+    output_dir = output_dir or get_snapshot_dir()
+    os.makedirs(output_dir, exist_ok=True)
+    previous = load_manifest(output_dir) or {}
+    generation = previous.get('generation', 0) + 1
+
+    results = [
+        _prepare_shard(key, payload, previous.get('shards', {}).get(key), output_dir, generation)
+        for key, payload in payloads.items()
+    ]
+
+    shards = {key: entry for key, entry, _ in results}
+    written = sum(count for _, _, count in results)
+
+    manifest = {
+        "generated_at": generated_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "generation": generation,
+        "shards": shards,
+    }
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, manifest_path)
+
+    _cleanup_stale_shards(output_dir, manifest, previous)
+    logging.info(f"快照分片: 共 {len(shards)} 个，新写入 {written} 个文件 (generation {generation})")
+    return manifest
+
+
+def _prepare_shard(key, payload, previous_entry, output_dir, generation):
+    """
+    生成单个分片的文件和清单条目
+
+    返回:
+        (分片键, 清单条目, 新写入文件数)
+    """
+    rows = len(payload.get('data_points', []))
+    entry = _build_delta_entry(key, payload, previous_entry, output_dir)
+    written = False
+    if entry is None:
+        # 重新生成基础文件
+        filename, size, written = _stream_json(output_dir, key, payload)
+        entry = {"file": filename, "bytes": size, "base_generation": generation, "delta": None}
+    elif entry['delta']:
+        filename, size, written = _stream_json(output_dir, f"{key}.delta", entry.pop('delta_payload'))
+        entry['delta'].update({"file": filename, "bytes": size})
+    entry['rows'] = rows
+    return key, entry, int(written)
+
+
+def _build_delta_entry(key, payload, previous_entry, output_dir):
+    """
+    尝试基于上一版分片的基础文件生成增量
+
+    返回:
+        清单条目（含待写入的 delta_payload）；需要重新生成基础文件时返回None
+    """
+    if not previous_entry:
+        return None
+    base_path = os.path.join(output_dir, previous_entry['file'])
+    if not os.path.exists(base_path):
+        return None
+
+    try:
+        base = _read_json(base_path)
+    except (OSError, ValueError):
+        return None
+
+    delta = compute_delta(base, payload)
+    if delta is None or len(delta['rows']) > DELTA_MAX_ROWS:
+        return None
+
+    entry = {
+        "file": previous_entry['file'],
+        "bytes": previous_entry['bytes'],
+        "base_generation": previous_entry.get('base_generation', 0),
+        "delta": None,
+    }
+    base_fields = {k: v for k, v in base.items() if k != 'data_points'}
+    if delta['rows'] or delta['fields'] != base_fields:
+        entry['delta'] = {"rows": len(delta['rows'])}
+        entry['delta_payload'] = delta
+    return entry
+
+
+def _cleanup_stale_shards(output_dir, manifest, previous):
+    """删除当前清单和上一版清单都不再引用的分片文件，以及中断的写入留下的临时文件"""
+    keep = {MANIFEST_NAME}
+    for m in (manifest, previous):
+        for entry in m.get('shards', {}).values():
+            keep.add(entry['file'])
+            if entry.get('delta'):
+                keep.add(entry['delta']['file'])
+
+    for filename in os.listdir(output_dir):
+        stale = filename.endswith('.json') and filename not in keep
+        if stale or filename.endswith('.tmp'):
+            try:
+                os.remove(os.path.join(output_dir, filename))
+            except OSError as e:
+                logging.warning(f"清理旧分片失败 {filename}: {e}")
+
+
+async def generate_snapshot(output_dir=None):
+    """
+    刷新服务缓存并生成完整快照，记录各阶段耗时
+
+    参数:
+        output_dir: 输出目录
+
+    返回:
+        dict: 新的清单
+    """
+    from app.services.bociasi_service import bociasi_service
+    from app.services.wind2x_service import wind2x_service
+
+    timings = {}
+    started = time.perf_counter()
+
+    # 1. 刷新缓存（确保读取最新的Excel），所有指标共用这一份数据
+    stage = time.perf_counter()
+    await bociasi_service.warm_cache()
+    timings['load_bociasi'] = time.perf_counter() - stage
+    stage = time.perf_counter()
+    await wind2x_service.warm_cache()
+    timings['load_wind2x'] = time.perf_counter() - stage
+
+    # 2. 构建各分片数据
+    stage = time.perf_counter()
+    payloads = await collect_snapshot_payloads()
+    timings['build'] = time.perf_counter() - stage
+
+    # 3. 编码、写盘
+    stage = time.perf_counter()
+    manifest = write_snapshot(payloads, output_dir)
+    timings['write'] = time.perf_counter() - stage
+
+    timings['total'] = time.perf_counter() - started
+    logging.info("快照生成耗时: " + ", ".join(f"{k}={v:.2f}s" for k, v in timings.items()))
+    return manifest
@@ -0,0 +1,32 @@
+"""
+测试公共夹具：合成工作簿（benchmarks/synthetic_workbook.py），服务读取的 config.EXCEL_PATH 指向它
+"""
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'benchmarks'))
+
+import config  # noqa: E402
+
+# 合成工作簿中 BOCIASI 读取的数据行数（工作表另含其前的历史行）
+WORKBOOK_ROWS = 300
+
+
+@pytest.fixture(scope="session")
+def synthetic_workbook(tmp_path_factory):
+    """生成一次合成工作簿，返回路径"""
+    from synthetic_workbook import build_workbook
+    path = str(tmp_path_factory.mktemp("workbook") / "BOCIASIV2.xlsx")
+    build_workbook(path, rows=WORKBOOK_ROWS)
+    return path
+
+
+@pytest.fixture
+def workbook(synthetic_workbook, monkeypatch):
+    """服务使用合成工作簿"""
+    monkeypatch.setattr(config, "EXCEL_PATH", synthetic_workbook)
+    return synthetic_workbook
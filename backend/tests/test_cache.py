@@ -0,0 +1,52 @@
+"""
+响应缓存测试：条目数有上限，数据重新加载后不保留旧版本的响应
+"""
+import asyncio
+import os
+import time
+
+from app.data.cache import DataCache, cache
+from app.services.bociasi_service import BOCIASIService
+from app.services.wind2x_service import Wind2XService
+
+
+def test_set_sweeps_expired_and_bounds_size():
+    c = DataCache(max_entries=4)
+    c.set("expired", 1, ttl=1)
+    c._expiry["expired"] = time.time() - 1
+    for i in range(3):
+        c.set(f"k{i}", i)
+    # 达到上限：先清理过期条目
+    c.set("k3", 3)
+    assert "expired" not in c._cache and c.stats()["entries"] == 4
+    # 仍然达到上限：淘汰最早写入的条目
+    c.set("k4", 4)
+    assert c.get("k0") is None and c.get("k4") == 4
+    assert c.stats()["entries"] == 4
+
+
+def test_delete_prefix():
+    c = DataCache()
+    c.set("bociasi_rsi_1", 1)
+    c.set("bociasi_batch_1", 2)
+    c.set("wind2x_erp_1", 3)
+    assert c.delete_prefix("bociasi_") == 2
+    assert c.stats()["entries"] == 1
+
+
+def test_reload_does_not_grow_cache(workbook):
+    bociasi, wind2x = BOCIASIService(), Wind2XService()
+    cache.clear()
+    base = os.path.getmtime(workbook)
+    sizes = []
+    for generation in range(3):
+        # 工作簿更新（修改时间变化）后再请求同一组范围
+        os.utime(workbook, (base, base + 10 * (generation + 1)))
+        for start, end in [(None, None), ("2020-01-01", "2023-01-01")]:
+            for indicator_id in ("rsi", "ma20"):
+                asyncio.run(bociasi.fetch_indicator_data(indicator_id, start, end))
+            asyncio.run(bociasi.fetch_batch(["rsi", "ma20"], start, end))
+            asyncio.run(wind2x.fetch_indicator_data("erp_2x", start, end))
+        sizes.append(cache.stats()["entries"])
+    assert sizes[0] > 0
+    assert sizes == [sizes[0]] * 3
@@ -0,0 +1,70 @@
+"""
+并发限制测试：流式响应在响应体发送完毕之前一直占用名额
+"""
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from app.api.concurrency import ConcurrencyLimiter
+
+STREAM_SECONDS = 0.5
+
+
+def _app(limiter):
+    app = FastAPI()
+    app.middleware("http")(limiter)
+    in_flight = []
+
+    @app.get("/api/stream")
+    async def stream():
+        async def body():
+            for i in range(5):
+                await asyncio.sleep(STREAM_SECONDS / 5)
+                in_flight.append(limiter.stats()["in_flight"])
+                yield f"{i}\n"
+        return StreamingResponse(body(), media_type="text/plain")
+
+    @app.get("/api/fast")
+    async def fast():
+        return {"ok": True}
+
+    return app, in_flight
+
+
+async def _requests(app):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async def later(path):
+            await asyncio.sleep(STREAM_SECONDS / 5)
+            return await client.get(path)
+
+        slow, queued = await asyncio.gather(client.get("/api/stream"), later("/api/fast"))
+        after = await client.get("/api/fast")
+    return slow, queued, after
+
+
+def test_streaming_body_holds_slot():
+    limiter = ConcurrencyLimiter(limit=1, queue_timeout=0.1, prefix="/api")
+    app, in_flight = _app(limiter)
+
+    slow, queued, after = asyncio.run(_requests(app))
+
+    assert slow.status_code == 200 and slow.text == "0\n1\n2\n3\n4\n"
+    # 响应体生成期间名额仍被占用，排队的请求超时
+    assert in_flight == [1] * 5
+    assert queued.status_code == 503
+    # 发送完毕后释放
+    assert after.status_code == 200
+    assert limiter.stats() == {"limit": 1, "in_flight": 0, "waiting": 0, "rejected": 1}
+
+
+def test_queued_request_runs_after_stream():
+    limiter = ConcurrencyLimiter(limit=1, queue_timeout=STREAM_SECONDS * 4, prefix="/api")
+    app, _ = _app(limiter)
+
+    slow, queued, _ = asyncio.run(_requests(app))
+
+    assert slow.status_code == 200 and queued.status_code == 200
+    assert limiter.stats()["in_flight"] == 0
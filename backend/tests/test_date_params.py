@@ -0,0 +1,42 @@
+"""
+日期参数校验测试：格式无效的日期返回422，不进入服务层
+"""
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+ENDPOINTS = [
+    "/api/bociasi/data",
+    "/api/bociasi/rsi/data",
+    "/api/bociasi/rsi/percentile_history",
+    "/api/wind_2x_erp/data",
+    "/api/wind_2x_erp/percentile_history",
+]
+
+
+@pytest.mark.parametrize("path", ENDPOINTS)
+@pytest.mark.parametrize("query", [
+    "start_date=2024-13-01",
+    "end_date=not-a-date",
+    "start_date=20240101",
+    "start_date=2024-01-01&end_date=2024-02-30",
+])
+def test_invalid_date_is_rejected(path, query):
+    response = client.get(f"{path}?{query}")
+    assert response.status_code == 422
+    assert "YYYY-MM-DD" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("path", ["/api/bociasi/rsi/data", "/api/wind_2x_erp/data"])
+def test_valid_date_range(workbook, path):
+    # 合成工作簿的数据截止到今天
+    start, end = (date.today() - timedelta(days=days) for days in (120, 30))
+    response = client.get(f"{path}?start_date={start}&end_date={end}")
+    assert response.status_code == 200
+    dates = [point["date"] for point in response.json()["data_points"]]
+    assert dates and str(start) <= dates[0] and dates[-1] <= str(end)
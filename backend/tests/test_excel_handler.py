@@ -0,0 +1,98 @@
+"""
+ExcelHandler.truncate_from 测试：A列混合日期单元格（datetime、Excel 序列号、日期文本）
+
+运行（在 backend 目录下）:
+    python -m pytest tests
+"""
+import os
+import sys
+from datetime import date, datetime
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, to_excel
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_handler import ExcelHandler, _cell_date  # noqa: E402
+
+SHEET = "A"
+
+# 升序的交易日，A列依次用不同类型写入；按文本比较时顺序是错的
+# （"2026/2/9" > "2026-02-10"，序列号 "46069" > "2026-..."）
+ROWS = [
+    (date(2026, 2, 2), datetime(2026, 2, 2)),
+    (date(2026, 2, 3), datetime(2026, 2, 3, 15, 0)),   # 带时间
+    (date(2026, 2, 4), "2026-02-04"),
+    (date(2026, 2, 5), 46058),                          # 序列号（整数）
+    (date(2026, 2, 6), 46059.0),                        # 序列号（浮点）
+    (date(2026, 2, 9), "2026/2/9"),
+    (date(2026, 2, 10), "2026-02-10 00:00:00"),
+    (date(2026, 2, 11), 46064),
+    (date(2026, 2, 12), datetime(2026, 2, 12)),
+    (date(2026, 2, 13), "2026/02/13"),
+]
+
+
+def _make_workbook(path, epoch=None):
+    """写入标题行、ROWS 和两行只带格式的空行"""
+    wb = Workbook()
+    if epoch is not None:
+        wb.epoch = epoch
+    ws = wb.active
+    ws.title = SHEET
+    ws.append(["日期", "收盘价"])
+    for i, (day, cell) in enumerate(ROWS):
+        if epoch is not None and isinstance(cell, (int, float)):
+            # 1904 日期系统的序列号
+            cell = to_excel(datetime(day.year, day.month, day.day), epoch)
+        ws.append([cell, 100 + i])
+    for row in (len(ROWS) + 2, len(ROWS) + 3):
+        ws.cell(row=row, column=1).number_format = "yyyy-mm-dd"
+    wb.save(path)
+
+
+def _remaining_days(path):
+    wb = load_workbook(path)
+    ws = wb[SHEET]
+    values = [ws.cell(row=r, column=2).value for r in range(2, ws.max_row + 1)]
+    wb.close()
+    return [ROWS[v - 100][0] for v in values if v is not None]
+
+
+@pytest.mark.parametrize("cut, kept", [
+    ("2026-02-09", 5),   # 截断日期是文本单元格
+    ("2026-02-05", 3),   # 截断日期是序列号单元格
+    ("2026-02-07", 5),   # 周末：从之后的第一个交易日开始删除
+    ("2026-02-02", 0),
+])
+def test_truncate_from_mixed_cells(tmp_path, cut, kept):
+    path = str(tmp_path / "mixed.xlsx")
+    _make_workbook(path)
+
+    deleted = ExcelHandler(path, SHEET).truncate_from(cut)
+
+    assert _remaining_days(path) == [day for day, _ in ROWS[:kept]]
+    assert deleted == len(ROWS) - kept + 2  # 尾部的空格式行一并删除
+
+
+def test_truncate_from_after_last_date(tmp_path):
+    path = str(tmp_path / "mixed.xlsx")
+    _make_workbook(path)
+
+    assert ExcelHandler(path, SHEET).truncate_from("2026-02-14") == 0
+    assert _remaining_days(path) == [day for day, _ in ROWS]
+
+
+def test_truncate_from_1904_workbook(tmp_path):
+    path = str(tmp_path / "mac.xlsx")
+    _make_workbook(path, epoch=CALENDAR_MAC_1904)
+
+    ExcelHandler(path, SHEET).truncate_from("2026-02-11")
+
+    assert _remaining_days(path) == [day for day, _ in ROWS[:7]]
+
+
+def test_cell_date_rejects_unknown_text():
+    with pytest.raises(ValueError):
+        _cell_date("无效日期")
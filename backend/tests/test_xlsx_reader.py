@@ -0,0 +1,148 @@
+"""
+xlsx_reader 流式读取测试：结果与 pd.read_excel(header=None) 逐格一致
+
+运行（在 backend 目录下）:
+    python -m pytest tests
+"""
+import re
+import zipfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+import config
+from app.data.workbook import decode_sheet, load_sheet_columns
+from app.data.xlsx_reader import excel_serial_to_datetime64, read_columns
+from synthetic_workbook import BOCIASI_COLUMNS, BOCIASI_START_ROW_INDEX
+
+# 合成工作簿中 #N/A 所在的列
+NA_COLUMN = 5
+
+
+def _read_excel_columns(path, sheet, start_row, columns, date_column=0):
+    """pd.read_excel 读出的 (日期 Series, 字段名 -> float64 数组)，行与 read_columns 对齐"""
+    df = pd.read_excel(path, sheet_name=sheet, header=None)
+    frame = df.iloc[start_row:]
+    dates = pd.to_datetime(frame.iloc[:, date_column], errors='coerce', format='mixed')
+    values = {
+        name: pd.to_numeric(frame.iloc[:, col], errors='coerce').to_numpy(dtype=float)
+        for name, col in columns.items()
+    }
+    return df, dates.reset_index(drop=True), values
+
+
+def _streamed_dates(serials, texts, date1904):
+    dates = pd.Series(excel_serial_to_datetime64(serials, date1904)).astype('datetime64[ns]')
+    for i, text in texts.items():
+        dates.iloc[i] = pd.to_datetime(text, errors='coerce', format='mixed')
+    return dates
+
+
+def _assert_equivalent(path, sheet, start_row, columns):
+    df, expected_dates, expected = _read_excel_columns(path, sheet, start_row, columns)
+    serials, texts, values, date1904 = read_columns(path, sheet, start_row, columns)
+
+    dates = _streamed_dates(serials, texts, date1904)
+    assert len(dates) == len(expected_dates)
+    pd.testing.assert_series_equal(dates, expected_dates.astype('datetime64[ns]'), check_names=False)
+    for name in columns:
+        np.testing.assert_array_equal(values[name], expected[name], err_msg=name)
+
+    # 解码后的结果（服务实际使用）与 read_excel + decode_sheet 相同
+    positions = {name: df.columns.get_loc(col) for name, col in columns.items()}
+    expected_rows = decode_sheet(df, start_row, positions)
+    actual_rows = load_sheet_columns(path, sheet, start_row, columns)
+    assert actual_rows[0] == expected_rows[0]
+    for name in columns:
+        np.testing.assert_array_equal(actual_rows[1][name], expected_rows[1][name], err_msg=name)
+    return df
+
+
+def test_synthetic_workbook_matches_read_excel(synthetic_workbook):
+    columns = {"na_column": NA_COLUMN, **BOCIASI_COLUMNS}
+    df = _assert_equivalent(synthetic_workbook, config.SHEET_NAME, BOCIASI_START_ROW_INDEX, columns)
+
+    # 工作簿确实包含 #N/A（错误值单元格）、内联字符串、公式和空单元格（稀疏的信号列）
+    with zipfile.ZipFile(synthetic_workbook) as package:
+        xml = package.read("xl/worksheets/sheet1.xml")
+    assert b't="e"' in xml and b't="inlineStr"' in xml and b"<f>" in xml
+    assert df.iloc[BOCIASI_START_ROW_INDEX:, BOCIASI_COLUMNS["marker_red"]].isna().any()
+
+
+def test_whole_sheet_from_first_row(synthetic_workbook):
+    """从第0行（标题行）开始读取"""
+    _assert_equivalent(synthetic_workbook, 0, 0, {"close": config.COLUMN_MAPPING['close'], "na_column": NA_COLUMN})
+
+
+def _use_shared_strings(path):
+    """
+    把工作表中的内联字符串改写为共享字符串表（Excel 保存的格式；openpyxl 只写内联字符串）
+    """
+    with zipfile.ZipFile(path) as package:
+        parts = {name: package.read(name) for name in package.namelist()}
+
+    strings = []
+
+    def shared(match):
+        strings.append(match.group(2))
+        return b'<c r="%s" t="s"><v>%d</v></c>' % (match.group(1), len(strings) - 1)
+
+    sheet = "xl/worksheets/sheet1.xml"
+    parts[sheet] = re.sub(rb'<c r="([A-Z]+\d+)" t="inlineStr"><is><t>(.*?)</t></is></c>', shared, parts[sheet])
+    parts["xl/sharedStrings.xml"] = (
+        b'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" count="%d" uniqueCount="%d">'
+        % (len(strings), len(strings))
+        + b"".join(b"<si><t>%s</t></si>" % text for text in strings) + b"</sst>"
+    )
+    parts["[Content_Types].xml"] = parts["[Content_Types].xml"].replace(b"</Types>", (
+        b'<Override PartName="/xl/sharedStrings.xml" ContentType='
+        b'"application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/></Types>'
+    ))
+    parts["xl/_rels/workbook.xml.rels"] = parts["xl/_rels/workbook.xml.rels"].replace(b"</Relationships>", (
+        b'<Relationship Id="rIdShared" Target="sharedStrings.xml" Type='
+        b'"http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"/></Relationships>'
+    ))
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as package:
+        for name, data in parts.items():
+            package.writestr(name, data)
+    return len(strings)
+
+
+@pytest.fixture
+def mixed_workbook(tmp_path):
+    """
+    日期列混合 datetime / 日期文本 / 空单元格，数值列含 #N/A、文本和空单元格
+
+    文本写入共享字符串表（与 Excel 保存的工作簿相同）
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "A"
+    ws.append(["日期", "收盘价", "信号"])
+    ws.append(["1899-12-29", 1.5, None])                 # 早于Excel日期范围的文本日期
+    ws.append([datetime(2026, 2, 2), "#N/A", 1])         # 错误值
+    ws.append(["2026/2/3", "3.25", None])                # 数值文本（共享字符串）
+    ws.append([datetime(2026, 2, 5), "无数据", -1])      # 非数值文本
+    ws.append([None, 7, 0])                              # 日期为空：丢弃
+    ws.append(["不是日期", 8, 0])                        # 日期文本无法解析：丢弃
+    ws.append(["2026-02-05 00:00:00", None, None])       # 整行数值为空
+    ws.append([datetime(2026, 2, 4), 4.5, 2])            # 乱序：解码后按日期排序
+    ws.cell(row=12, column=2, value=9)                   # 中间有省略的空行
+    ws.cell(row=12, column=1, value=datetime(2026, 2, 9))
+    path = str(tmp_path / "mixed.xlsx")
+    wb.save(path)
+    assert _use_shared_strings(path) > 0
+    return path
+
+
+@pytest.mark.parametrize("start_row", [0, 1, 3, 9])
+def test_mixed_cells_match_read_excel(mixed_workbook, start_row):
+    _assert_equivalent(mixed_workbook, "A", start_row, {"close": 1, "signal": 2})
+
+
+def test_missing_file_is_not_hidden_by_fallback(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_sheet_columns(str(tmp_path / "missing.xlsx"), 0, 0, {"close": 1})
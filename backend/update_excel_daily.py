@@ -1,17 +1,21 @@
 """
 主程序 - Excel数据自动更新
 整合数据获取和Excel操作，实现每日自动更新功能
+
+    python update_excel_daily.py [--test]                        每日更新
+    python update_excel_daily.py backfill --start YYYY-MM-DD     回补历史区间（见 backfill.py）
 """
 import sys
 import logging
 import os
-import json
 import asyncio
 import subprocess
 from datetime import datetime
 from data_fetcher import WindDataFetcher
 from excel_handler import ExcelHandler
 import config
+from app.monitoring import StageTimer, UPDATER_STAGE_SECONDS, UPDATER_RUNS, UPDATER_LAST_RUN
+from update_trace import Tracer, get_trace_filename, cleanup_traces
 
 # 配置日志
 logging.basicConfig(
@@ -86,7 +90,7 @@ def run_git_sync(commit_message, timeout=30, max_retries=2):
     return False
 
 async def generate_static_snapshot():
-    """生成静态数据快照 (复用 generate_static.py 的逻辑)"""
+    """生成静态数据快照（清单 + 按内容哈希命名的分片，见 static_snapshot.py）"""
     try:
         logging.info("开始生成静态数据快照...")
         
@@ -94,45 +98,10 @@ async def generate_static_snapshot():
         # 注意：这里需要确保 sys.path 包含 backend 目录
         sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         
-        from app.services.bociasi_service import bociasi_service
-        from app.services.wind2x_service import wind2x_service
-        
-        # 刷新缓存（确保读取最新的Excel）
-        await bociasi_service.warm_cache()
-        await wind2x_service.warm_cache()
-        
-        static_data = {
-            "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            "bociasi": {},
-            "wind_2x_erp": {}
-        }
-
-        # 1. 获取 BOCIASI 所有指标数据
-        indicators = [
-            'overview', 'equity_premium', 'eb_position_gap', 'eb_yield_gap',
-            'margin_balance', 'slow_line', 'ma20', 'turnover',
-            'up_down_ratio', 'rsi', 'fast_line'
-        ]
-        
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        start_date = "2016-01-01"
-
-        for ind_id in indicators:
-            data = await bociasi_service.fetch_indicator_data(ind_id, start_date, end_date)
-            static_data["bociasi"][ind_id] = data.model_dump()
-
-        # 2. 获取 Wind 2X ERP 数据
-        data = await wind2x_service.fetch_indicator_data("erp_2x", "2005-01-01", end_date)
-        static_data["wind_2x_erp"] = data.model_dump()
-
-        # 3. 写入文件
-        repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        output_path = os.path.join(repo_dir, 'public', 'static_data.json')
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(static_data, f, ensure_ascii=False)
+        import static_snapshot
+        manifest = await static_snapshot.generate_snapshot()
             
-        logging.info(f"静态数据已保存至: {output_path}")
+        logging.info(f"静态数据已保存至: {static_snapshot.get_snapshot_dir()} ({len(manifest['shards'])} 个分片)")
         return True
         
     except Exception as e:
@@ -152,136 +121,207 @@ def run_daily_update(test_mode=False):
     
     updated_count = 0
     fetcher = None
+    status = "success"
+    # 各阶段耗时（/metrics 中的 updater_stage_duration_seconds），
+    # 各阶段和每次Wind调用的明细写入本次运行的trace文件（python update_trace.py 查看汇总）
+    stages = StageTimer(UPDATER_STAGE_SECONDS)
+    tracer = Tracer(get_trace_filename(), timer=stages)
+    cleanup_traces()
     
-    try:
-        # --- 步骤1: 更新Excel ---
-        handler = ExcelHandler()
-        handler.read_excel()
-        last_date = handler.get_last_date()
+    with tracer, tracer.span("run_daily_update", kind="run", test_mode=test_mode) as run_span:
+        try:
+            # --- 步骤1: 更新Excel ---
+            with tracer.stage("read_excel"):
+                handler = ExcelHandler()
+                handler.read_excel()
+                last_date = handler.get_last_date()
         
-        logging.info("连接Wind API...")
-        fetcher = WindDataFetcher()
-        fetcher.connect()
+            logging.info("连接Wind API...")
+            with tracer.stage("wind_fetch"):
+                fetcher = WindDataFetcher()
+                fetcher.connect()
         
-        # 0. 尝试修复上一日的融资余额
-        # 如果上一日的融资余额是临时填充的（因为当时Wind还没更新），那么今天应该能取到真实值了
-        # 需要将其更新到Excel中，以便今日数据缺失时能使用正确的上一日数据
-        if last_date:
-            print(f"正在检查上一交易日 ({last_date}) 的融资余额...")
-            margin_val = fetcher.get_margin_balance(last_date)
+            # 0. 尝试修复上一日的融资余额
+            # 如果上一日的融资余额是临时填充的（因为当时Wind还没更新），那么今天应该能取到真实值了
+            # 需要将其更新到Excel中，以便今日数据缺失时能使用正确的上一日数据
+            if last_date:
+                print(f"正在检查上一交易日 ({last_date}) 的融资余额...")
+                with tracer.stage("wind_fetch"):
+                    margin_val = fetcher.get_margin_balance(last_date)
             
-            # 读取当前Excel中该日期的融资余额进行对比（可选，这里直接更新比较简单）
-            if margin_val:
-                 print(f"获取到 {last_date} 的最新融资余额: {margin_val}")
-                 # 直接更新
-                 if handler.update_margin_for_date(last_date, margin_val):
-                     print(f"✅ 已修正上一日 ({last_date}) 的融资余额")
-                 else:
-                     print(f"⚠️ 修正上一日融资余额失败")
-            else:
-                 print(f"⚠️ 上一日 ({last_date}) 融资余额仍尚未更新 (Wind返回None)")
+                # 读取当前Excel中该日期的融资余额进行对比（可选，这里直接更新比较简单）
+                if margin_val:
+                     print(f"获取到 {last_date} 的最新融资余额: {margin_val}")
+                     # 直接更新
+                     with tracer.stage("append"):
+                         margin_updated = handler.update_margin_for_date(last_date, margin_val)
+                     if margin_updated:
+                         print(f"✅ 已修正上一日 ({last_date}) 的融资余额")
+                     else:
+                         print(f"⚠️ 修正上一日融资余额失败")
+                else:
+                     print(f"⚠️ 上一日 ({last_date}) 融资余额仍尚未更新 (Wind返回None)")
         
-        dates_to_update = fetcher.get_trade_dates_after(last_date)
+            with tracer.stage("wind_fetch") as span:
+                dates_to_update = fetcher.get_trade_dates_after(last_date)
+                span.set(rows=len(dates_to_update))
         
-        if not dates_to_update:
-            logging.info("Excel数据已是最新")
-            print("✅ Excel数据已是最新")
-        else:
-            print(f"发现 {len(dates_to_update)} 个交易日需要更新")
+            if not dates_to_update:
+                logging.info("Excel数据已是最新")
+                print("✅ Excel数据已是最新")
+            else:
+                print(f"发现 {len(dates_to_update)} 个交易日需要更新")
             
-            # 备份
-            if not test_mode:
-                handler.backup_excel()
+                # 备份
+                if not test_mode:
+                    with tracer.stage("backup"):
+                        handler.backup_excel()
             
-            # 逐日更新
-            for date in dates_to_update:
-                logging.info(f"正在获取 {date} 的数据...")
-                try:
-                    data = fetcher.fetch_market_data(date)
-                    is_valid, _, msg = handler.validate_data(data)
+                # 逐日更新
+                for date in dates_to_update:
+                    logging.info(f"正在获取 {date} 的数据...")
+                    try:
+                        with tracer.stage("wind_fetch", date=date):
+                            data = fetcher.fetch_market_data(date)
+                        is_valid, _, msg = handler.validate_data(data)
                     
-                    if is_valid:
-                        handler.append_data(data)
-                        updated_count += 1
-                        print(f"✅ {date} 数据已添加")
-                    else:
-                        logging.warning(f"{date} 数据无效: {msg}")
-                except Exception as e:
-                    logging.error(f"处理 {date} 失败: {e}")
+                        if is_valid:
+                            with tracer.stage("append", date=date, rows=1):
+                                handler.append_data(data)
+                            updated_count += 1
+                            print(f"✅ {date} 数据已添加")
+                        else:
+                            logging.warning(f"{date} 数据无效: {msg}")
+                    except Exception as e:
+                        logging.error(f"处理 {date} 失败: {e}")
             
-            # 保存
-            if updated_count > 0 and not test_mode:
-                handler.save_excel()
-                print(f"✅ 成功更新 {updated_count} 条记录并保存")
+                # 保存
+                if updated_count > 0 and not test_mode:
+                    with tracer.stage("save", rows=updated_count):
+                        handler.save_excel()
+                    print(f"✅ 成功更新 {updated_count} 条记录并保存")
         
-        # 强制重新计算公式（无论是否有新数据，都执行以确保数据完整性）
-        if not test_mode:
-            print("🔄 正在强制重算 Excel 公式...")
-            handler.recalculate_formulas()
+            # 强制重新计算公式（无论是否有新数据，都执行以确保数据完整性）
+            if not test_mode:
+                print("🔄 正在强制重算 Excel 公式...")
+                with tracer.stage("recalc"):
+                    handler.recalculate_formulas()
         
-        # --- 步骤2: 生成静态快照 ---
-        # 即使Excel没有更新，也可以重新生成快照以更新 'generated_at' 时间戳
-        print("📸 正在生成静态数据快照...")
-        # 由于是在同步函数中调用异步代码，需要使用 asyncio.run
-        asyncio.run(generate_static_snapshot())
+            # --- 步骤2: 生成静态快照 ---
+            # 即使Excel没有更新，也可以重新生成快照以更新 'generated_at' 时间戳
+            print("📸 正在生成静态数据快照...")
+            # 由于是在同步函数中调用异步代码，需要使用 asyncio.run
+            with tracer.stage("snapshot"):
+                asyncio.run(generate_static_snapshot())
         
-        # --- 步骤2.5: 数据自检 (防丢包机制) ---
-        print("🔍 正在执行数据完整性自检...")
-        try:
-            repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            json_path = os.path.join(repo_dir, 'public', 'static_data.json')
+            # --- 步骤2.5: 数据自检 (防丢包机制) ---
+            print("🔍 正在执行数据完整性自检...")
+            try:
+                import static_snapshot
+                manifest = static_snapshot.load_manifest()
+                if not manifest:
+                    raise Exception("未找到快照清单")
             
-            with open(json_path, 'r', encoding='utf-8') as f:
-                check_data = json.load(f)
-            
-            # 检查 BOCIASI
-            bociasi_pts = check_data.get('bociasi', {}).get('overview', {}).get('data_points', [])
-            if not bociasi_pts:
-                logging.error("❌ 自检失败: BOCIASI 数据为空！")
-            else:
-                last_pt = bociasi_pts[-1]
-                if last_pt.get('value') is None or last_pt.get('value') == 0:
-                     # 可能是Excel公式没算出来
-                     logging.warning(f"⚠️ 自检警告: BOCIASI 最新一条数据 ({last_pt.get('date')}) 数值为 0 或 None，可能是公式未计算。")
+                # 检查 BOCIASI
+                bociasi_shard = static_snapshot.read_shard(static_snapshot.BOCIASI_SHARD, manifest)
+                overview = static_snapshot.expand_bociasi_indicator(bociasi_shard, 'overview') or {}
+                bociasi_pts = overview.get('data_points', [])
+                if not bociasi_pts:
+                    logging.error("❌ 自检失败: BOCIASI 数据为空！")
                 else:
-                     print(f"   ✅ BOCIASI 数据检查通过 (最新: {last_pt.get('date')}, 值: {last_pt.get('value')})")
+                    last_pt = bociasi_pts[-1]
+                    if last_pt.get('value') is None or last_pt.get('value') == 0:
+                         # 可能是Excel公式没算出来
+                         logging.warning(f"⚠️ 自检警告: BOCIASI 最新一条数据 ({last_pt.get('date')}) 数值为 0 或 None，可能是公式未计算。")
+                    else:
+                         print(f"   ✅ BOCIASI 数据检查通过 (最新: {last_pt.get('date')}, 值: {last_pt.get('value')})")
             
-            # 检查 Wind 2X ERP
-            erp_pts = check_data.get('wind_2x_erp', {}).get('data_points', [])
-            if not erp_pts:
-                logging.error("❌ 自检失败: Wind 2X ERP 数据为空！")
-            else:
-                last_pt = erp_pts[-1]
-                # 2X ERP 也要检查
-                if last_pt.get('value') is None:
-                     logging.warning(f"⚠️ 自检警告: 2X ERP 最新一条数据数值为 None。")
+                # 检查 Wind 2X ERP
+                erp = static_snapshot.read_shard(static_snapshot.WIND2X_SHARD, manifest) or {}
+                erp_pts = erp.get('data_points', [])
+                if not erp_pts:
+                    logging.error("❌ 自检失败: Wind 2X ERP 数据为空！")
                 else:
-                     print(f"   ✅ Wind 2X ERP 数据检查通过 (最新: {last_pt.get('date')}, 数量: {len(erp_pts)})")
+                    last_pt = erp_pts[-1]
+                    # 2X ERP 也要检查
+                    if last_pt.get('value') is None:
+                         logging.warning(f"⚠️ 自检警告: 2X ERP 最新一条数据数值为 None。")
+                    else:
+                         print(f"   ✅ Wind 2X ERP 数据检查通过 (最新: {last_pt.get('date')}, 数量: {len(erp_pts)})")
 
-        except Exception as e:
-            logging.error(f"自检过程出错: {e}")
+            except Exception as e:
+                logging.error(f"自检过程出错: {e}")
 
-        # --- 步骤3: 推送GitHub ---
-        if not test_mode:
-            print("☁️ 正在同步到 GitHub...")
-            msg = f"Auto update: {datetime.now().strftime('%Y-%m-%d')} (Updated {updated_count} records)"
-            if run_git_sync(msg):
-                print("✅ GitHub同步成功")
-            else:
-                print("❌ GitHub同步失败")
+            # --- 步骤3: 推送GitHub ---
+            if not test_mode:
+                print("☁️ 正在同步到 GitHub...")
+                msg = f"Auto update: {datetime.now().strftime('%Y-%m-%d')} (Updated {updated_count} records)"
+                with tracer.stage("git_sync"):
+                    synced = run_git_sync(msg)
+                if synced:
+                    print("✅ GitHub同步成功")
+                else:
+                    print("❌ GitHub同步失败")
                 
+        except Exception as e:
+            status = "error"
+            run_span.fail(e)
+            logging.error(f"更新流程异常: {e}", exc_info=True)
+            print(f"❌ 错误: {e}")
+        finally:
+            if fetcher:
+                fetcher.disconnect()
+            run_span.set(updated_count=updated_count)
+            durations = stages.observe()
+            UPDATER_RUNS.inc(status=status)
+            UPDATER_LAST_RUN.set(datetime.now().timestamp(), status=status)
+            logging.info("各阶段耗时: " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in durations.items()))
+            logging.info(f"本次运行trace: {tracer.path}（python update_trace.py 查看与近30天的对比）")
+            print("=" * 80) 
+
+def run_backfill_command(argv):
+    """
+    backfill 子命令：回补历史区间（见 backfill.py），完成后重新生成静态快照
+    
+    Args:
+        argv: 子命令参数
+    Returns:
+        退出码
+    """
+    import argparse
+    from backfill import run_backfill
+    
+    parser = argparse.ArgumentParser(prog="update_excel_daily.py backfill", description="按日期区间回补Excel数据")
+    parser.add_argument("--start", required=True, help="开始日期 YYYY-MM-DD（含）")
+    parser.add_argument("--end", help="结束日期 YYYY-MM-DD（含），默认到今天")
+    parser.add_argument("--replace", action="store_true", help="先删除Excel中开始日期（含）及之后的行，再写入")
+    parser.add_argument("--restart", action="store_true", help="丢弃检查点，重新获取")
+    parser.add_argument("--test", action="store_true", help="测试模式：只获取数据，不写入Excel（保留检查点）")
+    args = parser.parse_args(argv)
+    
+    print("=" * 80)
+    print(f"🚀 开始回补 {args.start} ~ {args.end or '今天'}: {datetime.now()}")
+    print("=" * 80)
+    try:
+        written = run_backfill(args.start, args.end, restart=args.restart, replace=args.replace, test_mode=args.test)
     except Exception as e:
-        logging.error(f"更新流程异常: {e}", exc_info=True)
-        print(f"❌ 错误: {e}")
-    finally:
-        if fetcher:
-            fetcher.disconnect()
-        print("=" * 80) 
+        logging.error(f"回补失败: {e}", exc_info=True)
+        print(f"❌ 回补失败（已获取的数据保存在检查点中，重新运行同一命令即可继续）: {e}")
+        return 1
+    
+    if written:
+        print(f"✅ 回补完成，写入 {written} 行")
+        print("📸 正在生成静态数据快照...")
+        asyncio.run(generate_static_snapshot())
+        print("下次每日更新时会同步到 GitHub")
+    return 0
 
 def main(test_mode=False):
     """脚本入口点"""
     run_daily_update(test_mode)
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'backfill':
+        sys.exit(run_backfill_command(sys.argv[2:]))
     test_mode = '--test' in sys.argv
     main(test_mode=test_mode)
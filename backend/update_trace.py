@@ -0,0 +1,309 @@
+"""
+更新任务追踪模块 - 记录每日更新各阶段和每次Wind调用的耗时
+每次运行写一个JSON Lines文件（logs/traces/），每行一个span：
+    {"run": 运行ID, "id": 序号, "parent": 父span序号, "name": 名称, "kind": run/stage/wind,
+     "start": 开始时间戳, "duration": 秒, "status": ok/error, "attrs": {...}, "error": 错误信息}
+
+查看最近一次运行与近30天中位数的对比:
+    python update_trace.py [trace文件] [--days 30]
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import config
+
+# 需要追踪的Wind接口（isconnected等本地调用不记录）
+WIND_TRACED_CALLS = {"start", "tdays", "wsd", "wss", "wset", "edb"}
+
+# 参数摘要的最大长度
+ARG_SUMMARY_LENGTH = 60
+
+
+class Span:
+    """一个计时区间，可在运行中补充属性（行数、错误码等）"""
+
+    def __init__(self, span_id, parent, name, kind, attrs):
+        self.id = span_id
+        self.parent = parent
+        self.name = name
+        self.kind = kind
+        self.attrs = dict(attrs)
+        self.status = "ok"
+        self.error = None
+
+    def set(self, **attrs):
+        """补充属性"""
+        self.attrs.update(attrs)
+
+    def fail(self, error):
+        """标记为失败"""
+        self.status = "error"
+        self.error = str(error)
+
+
+class _NullSpan(Span):
+    def __init__(self):
+        super().__init__(None, None, "", "", {})
+
+
+class Tracer:
+    """单次运行的追踪器（更新任务单线程运行，span按调用栈嵌套）"""
+
+    def __init__(self, path, timer=None):
+        """
+        Args:
+            path: trace文件路径
+            timer: 可选的阶段计时器（app.monitoring.StageTimer），stage span 的耗时同时计入其中
+        """
+        self.path = path
+        self.timer = timer
+        self.run_id = os.path.splitext(os.path.basename(path))[0]
+        self._file = None
+        self._stack = []
+        self._next_id = 0
+
+    def __enter__(self):
+        global _current
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        _current = self
+        return self
+
+    def __exit__(self, *exc):
+        global _current
+        _current = None
+        self._file.close()
+        return False
+
+    @contextmanager
+    def span(self, name, kind="span", **attrs):
+        """
+        记录 with 块的耗时，块内抛出的异常记为 error 后继续抛出
+
+        Args:
+            name: 名称
+            kind: 类别（run/stage/wind）
+            **attrs: 属性
+        """
+        self._next_id += 1
+        span = Span(self._next_id, self._stack[-1].id if self._stack else None, name, kind, attrs)
+        self._stack.append(span)
+        start = time.time()
+        began = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.fail(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            self._stack.pop()
+            self._write(span, start, time.perf_counter() - began)
+
+    @contextmanager
+    def stage(self, name, **attrs):
+        """更新流程的一个阶段（同一阶段可多次进入，每次一个span）"""
+        with (self.timer.stage(name) if self.timer else nullcontext()):
+            with self.span(name, kind="stage", **attrs) as span:
+                yield span
+
+    def _write(self, span, start, duration):
+        record = {
+            "run": self.run_id,
+            "id": span.id,
+            "parent": span.parent,
+            "name": span.name,
+            "kind": span.kind,
+            "start": round(start, 3),
+            "duration": round(duration, 6),
+            "status": span.status,
+            "attrs": span.attrs,
+        }
+        if span.error:
+            record["error"] = span.error
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+
+
+# 当前正在运行的追踪器，不在更新任务中时为None
+_current = None
+
+
+@contextmanager
+def current_span(name, kind="span", **attrs):
+    """在当前追踪器中记录span，没有正在运行的追踪器时不记录"""
+    if _current is None:
+        yield _NullSpan()
+    else:
+        with _current.span(name, kind, **attrs) as span:
+            yield span
+
+
+def _summarize(value):
+    """参数摘要：长代码列表只记录数量，长字符串截断"""
+    if isinstance(value, str):
+        items = value.split(",")
+        if len(items) > 5:
+            return f"<{len(items)} items>"
+        if len(value) > ARG_SUMMARY_LENGTH:
+            return value[:ARG_SUMMARY_LENGTH] + "..."
+    return value
+
+
+def _result_rows(result):
+    """Wind返回结果的行数（第一个字段的长度）"""
+    try:
+        first = result.Data[0]
+        return len(first) if isinstance(first, (list, tuple)) else 1
+    except (AttributeError, IndexError, TypeError):
+        return None
+
+
+class TracedWind:
+    """包装WindPy的 w 对象，记录每次调用的参数摘要、耗时、错误码和返回行数"""
+
+    def __init__(self, wind):
+        self._wind = wind
+
+    def __getattr__(self, name):
+        func = getattr(self._wind, name)
+        if name not in WIND_TRACED_CALLS or not callable(func):
+            return func
+
+        def traced(*args, **kwargs):
+            attrs = {"args": [_summarize(a) for a in args]}
+            if kwargs:
+                attrs["kwargs"] = {k: _summarize(v) for k, v in kwargs.items()}
+            with current_span(f"wind.{name}", kind="wind", **attrs) as span:
+                result = func(*args, **kwargs)
+                error_code = getattr(result, "ErrorCode", None)
+                span.set(error_code=error_code, rows=_result_rows(result))
+                if error_code not in (None, 0):
+                    span.fail(f"ErrorCode {error_code}")
+                return result
+
+        return traced
+
+
+def get_trace_filename():
+    """生成本次运行的trace文件名"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return os.path.join(config.TRACE_DIR, f'update_{timestamp}.jsonl')
+
+
+def cleanup_traces(retention_days=None):
+    """删除超过保留天数的trace文件"""
+    retention_days = retention_days or config.TRACE_RETENTION_DAYS
+    cutoff = time.time() - retention_days * 86400
+    for path in glob.glob(os.path.join(config.TRACE_DIR, 'update_*.jsonl')):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+# ========== 汇总 ==========
+
+def load_trace(path):
+    """读取trace文件，返回span列表"""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize_run(spans):
+    """
+    汇总一次运行
+
+    Returns:
+        dict: {"start", "total", "status", "stages": {阶段: 秒}, "wind": {接口: (次数, 秒, 失败次数)}}
+    """
+    run = next((s for s in spans if s["kind"] == "run"), None)
+    stages, wind = {}, {}
+    for s in spans:
+        if s["kind"] == "stage":
+            stages[s["name"]] = stages.get(s["name"], 0.0) + s["duration"]
+        elif s["kind"] == "wind":
+            count, total, errors = wind.get(s["name"], (0, 0.0, 0))
+            wind[s["name"]] = (count + 1, total + s["duration"], errors + (s["status"] != "ok"))
+    return {
+        "start": run["start"] if run else min((s["start"] for s in spans), default=0),
+        "total": run["duration"] if run else None,
+        "status": run["status"] if run else "incomplete",
+        "stages": stages,
+        "wind": wind,
+    }
+
+
+def _format_seconds(value):
+    return f"{value:.2f}" if value is not None else "-"
+
+
+def _format_delta(value, median):
+    if median is None or median == 0:
+        return ""
+    return f"{(value - median) / median * 100:+.0f}%"
+
+
+def print_summary(path, days=30):
+    """打印一次运行的各阶段耗时，并与近 days 天其他运行的中位数对比"""
+    current = summarize_run(load_trace(path))
+    cutoff = current["start"] - days * 86400
+
+    history = []
+    for other in glob.glob(os.path.join(os.path.dirname(path) or '.', 'update_*.jsonl')):
+        if os.path.abspath(other) == os.path.abspath(path):
+            continue
+        try:
+            summary = summarize_run(load_trace(other))
+        except (OSError, ValueError):
+            continue
+        if cutoff <= summary["start"] < current["start"]:
+            history.append(summary)
+
+    def median(values):
+        return statistics.median(values) if values else None
+
+    print(f"运行: {os.path.basename(path)}  状态: {current['status']}  "
+          f"对比: 近{days}天 {len(history)} 次运行的中位数")
+    print(f"{'阶段':<16}{'本次(s)':>10}{'中位数(s)':>12}{'变化':>8}")
+    total_median = median([h["total"] for h in history if h["total"] is not None])
+    if current["total"] is not None:
+        print(f"{'总计':<16}{current['total']:>10.2f}{_format_seconds(total_median):>12}"
+              f"{_format_delta(current['total'], total_median):>8}")
+    for name, seconds in sorted(current["stages"].items(), key=lambda kv: kv[1], reverse=True):
+        m = median([h["stages"][name] for h in history if name in h["stages"]])
+        print(f"{name:<16}{seconds:>10.2f}{_format_seconds(m):>12}{_format_delta(seconds, m):>8}")
+
+    if current["wind"]:
+        print(f"\n{'Wind接口':<16}{'次数':>6}{'本次(s)':>10}{'中位数(s)':>12}{'变化':>8}{'失败':>6}")
+        for name, (count, seconds, errors) in sorted(current["wind"].items(), key=lambda kv: kv[1][1], reverse=True):
+            m = median([h["wind"][name][1] for h in history if name in h["wind"]])
+            print(f"{name:<16}{count:>6}{seconds:>10.2f}{_format_seconds(m):>12}"
+                  f"{_format_delta(seconds, m):>8}{errors:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='每日更新耗时汇总')
+    parser.add_argument('trace', nargs='?', help='trace文件（默认最近一次运行）')
+    parser.add_argument('--days', type=int, default=30, help='对比最近N天的运行')
+    args = parser.parse_args()
+
+    path = args.trace
+    if not path:
+        traces = sorted(glob.glob(os.path.join(config.TRACE_DIR, 'update_*.jsonl')))
+        if not traces:
+            print(f"未找到trace文件: {config.TRACE_DIR}")
+            sys.exit(1)
+        path = traces[-1]
+    print_summary(path, args.days)
+
+
+if __name__ == '__main__':
+    main()
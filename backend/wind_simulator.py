@@ -0,0 +1,350 @@
+"""
+Wind模拟器 - 在没有Wind终端的机器上运行每日更新流程
+实现更新流程用到的 WindPy 接口（start/stop/isconnected/wsd/wss/wset/edb/tdays），
+返回与 WindPy 相同结构的结果（ErrorCode、Codes、Fields、Times、Data），并可配置延迟和错误注入：
+    - 交易日历：工作日
+    - A股股票池：WIND_SIM_UNIVERSE 只股票，价格为按代码固定参数的确定性序列（同一日期多次查询结果一致）
+    - 每次调用耗时 = WIND_SIM_LATENCY + WIND_SIM_LATENCY_PER_CODE × 代码数，带随机抖动
+    - 按 WIND_SIM_ERROR_RATE 的概率返回非零错误码
+
+使用方法：设置环境变量 WIND_BACKEND=simulator（见 config.py），data_fetcher 和 API 的Wind连接都会改用本模块
+"""
+import hashlib
+import math
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+import config
+
+# 错误注入时随机返回的错误码（模拟数据源侧的失败，取值仅用于区分错误类型）
+SIMULATED_ERRORS = {
+    -40520007: "没有可用数据",
+    -40521009: "数据解码失败",
+    -40522003: "请求超时",
+}
+
+# 个股收盘价的计算窗口（MA）
+MA_WINDOW_MAX = 250
+
+
+class WindData:
+    """与 WindPy 返回对象结构相同的结果"""
+
+    def __init__(self, error_code=0, codes=None, fields=None, times=None, data=None):
+        self.ErrorCode = error_code
+        self.StateCode = 0
+        self.RequestID = 0
+        self.Codes = codes or []
+        self.Fields = fields or []
+        self.Times = times or []
+        self.Data = data if data is not None else []
+
+    def __str__(self):
+        return (f".ErrorCode={self.ErrorCode}\n.Codes={self.Codes}\n.Fields={self.Fields}\n"
+                f".Times={self.Times[:5]}\n.Data={[d[:5] for d in self.Data]}")
+
+
+def _seed(*parts):
+    digest = hashlib.md5("|".join(str(p) for p in parts).encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def _parse_date(value):
+    if isinstance(value, (date, datetime)):
+        return datetime(value.year, value.month, value.day)
+    value = str(value).strip()
+    for fmt in ('%Y-%m-%d', '%Y%m%d'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    raise ValueError(f"无法解析日期: {value}")
+
+
+def _parse_options(options):
+    """'a=1;b=2' -> {'a': '1', 'b': '2'}（键小写）"""
+    result = {}
+    for part in str(options or "").split(";"):
+        if "=" in part:
+            key, value = part.split("=", 1)
+            result[key.strip().lower()] = value.strip()
+    return result
+
+
+def _fields(fields):
+    return [f.strip() for f in str(fields).split(",") if f.strip()]
+
+
+class WindSimulator:
+    """模拟的 WindPy w 对象"""
+
+    def __init__(self, latency=0.05, latency_per_code=0.0002, error_rate=0.0, universe=5300, seed=0):
+        """
+        Args:
+            latency: 每次调用的基础耗时（秒）
+            latency_per_code: 每个代码增加的耗时（秒），批量取数（wss）时明显
+            error_rate: 返回错误码的概率（0-1）
+            universe: A股股票数量
+            seed: 随机种子（影响延迟抖动和错误注入，不影响数据）
+        """
+        self.latency = latency
+        self.latency_per_code = latency_per_code
+        self.error_rate = error_rate
+        self.universe_size = universe
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._connected = False
+        self._universe = None
+        self.calls = 0
+
+    # ========== 连接 ==========
+
+    def start(self, waitTime=120, *args, **kwargs):
+        self._wait(0)
+        self._connected = True
+        return WindData(data=["OK!"])
+
+    def stop(self):
+        self._connected = False
+
+    def isconnected(self):
+        return self._connected
+
+    # ========== 行情与统计 ==========
+
+    def tdays(self, beginTime, endTime=None, options=""):
+        """交易日序列（工作日）"""
+        self._wait(0)
+        error = self._inject_error()
+        if error:
+            return error
+        days = self._trade_days(_parse_date(beginTime), _parse_date(endTime or datetime.now()))
+        return WindData(times=days, data=[days], fields=["TIME"])
+
+    def wsd(self, codes, fields, beginTime, endTime=None, options=""):
+        """日序列：单代码时 Data[字段][日期]；多代码时只支持单个字段（与 WindPy 相同），Data[代码][日期]"""
+        code_list, field_list = _fields(codes), _fields(fields)
+        if len(code_list) > 1 and len(field_list) > 1:
+            raise ValueError("wsd 多代码时只支持单个字段")
+        self._wait(len(code_list))
+        error = self._inject_error()
+        if error:
+            return error
+        days = self._trade_days(_parse_date(beginTime), _parse_date(endTime or datetime.now()))
+        opts = _parse_options(options)
+        if len(code_list) > 1:
+            return WindData(codes=code_list, fields=[field_list[0].upper()], times=days,
+                            data=self._stock_series(code_list, field_list[0], days, opts))
+        data = [[self._series_value(code_list[0], field, day, opts) for day in days] for field in field_list]
+        return WindData(codes=code_list[:1], fields=[f.upper() for f in field_list], times=days, data=data)
+
+    def wss(self, codes, fields, options=""):
+        """多代码截面：Data[字段][代码]"""
+        code_list, field_list = _fields(codes), _fields(fields)
+        self._wait(len(code_list))
+        error = self._inject_error()
+        if error:
+            return error
+        opts = _parse_options(options)
+        day = _parse_date(opts.get("tradedate", datetime.now()))
+        window = int(opts.get("ma_n", 20))
+        closes, mas = self._stock_close_and_ma(code_list, day, window)
+        data = []
+        for field in field_list:
+            name = field.lower()
+            if name == "close":
+                data.append(closes)
+            elif name == "ma":
+                data.append(mas)
+            else:
+                data.append([None] * len(code_list))
+        return WindData(codes=code_list, fields=[f.upper() for f in field_list], times=[day], data=data)
+
+    def wset(self, tablename, options=""):
+        """数据集：Data[字段][行]"""
+        opts = _parse_options(options)
+        self._wait(0)
+        error = self._inject_error()
+        if error:
+            return error
+
+        name = tablename.split("(")[0].strip().lower()
+        day = _parse_date(opts.get("date") or opts.get("startdate") or datetime.now())
+        if name == "sectorconstituent":
+            codes = self._stock_universe()
+            fields = ["date", "wind_code", "sec_name"]
+            data = [[day] * len(codes), codes, [f"股票{c[:6]}" for c in codes]]
+            return WindData(codes=[str(i) for i in range(len(codes))], fields=fields, times=[day], data=data)
+
+        # startdate/enddate 为区间时每个交易日一行
+        days = [day] if not opts.get("enddate") else self._trade_days(day, _parse_date(opts["enddate"]))
+        requested = _fields(opts.get("field", ""))
+        rows = [self._dataset_row(name, d) for d in days if d.weekday() < 5]
+        if not rows:
+            return WindData(fields=requested, data=[[] for _ in requested])
+        return WindData(codes=[str(i) for i in range(len(rows))], fields=requested, times=[r["reportdate"] for r in rows],
+                        data=[[r.get(f) for r in rows] for f in requested])
+
+    @staticmethod
+    def _dataset_row(name, day):
+        """数据集在某一天的一行"""
+        rng = np.random.default_rng(_seed(name, day.date()))
+        values = {
+            # 融资余额（元）
+            "margin_balance": float(1.5e12 * math.exp(0.15 * math.sin(day.toordinal() / 180))),
+            "reportdate": day,
+        }
+        rise, fall = int(rng.integers(300, 4500)), int(rng.integers(300, 4500))
+        values.update({
+            "risenumberofshandsz": rise,
+            "noriseorfallnumberofshandsz": int(rng.integers(50, 400)),
+            "fallnumberofshandsz": fall,
+            "limitupnumofshandsz": int(rng.integers(0, 150)),
+            "limitdownnumofshandsz": int(rng.integers(0, 80)),
+        })
+        return values
+
+    def edb(self, codes, beginTime, endTime=None, options=""):
+        """宏观指标日序列：Data[0][日期]"""
+        code_list = _fields(codes)
+        self._wait(len(code_list))
+        error = self._inject_error()
+        if error:
+            return error
+        days = self._trade_days(_parse_date(beginTime), _parse_date(endTime or datetime.now()))
+        if not days and "fill=previous" in str(options).lower():
+            days = self._trade_days(_parse_date(beginTime) - timedelta(days=7), _parse_date(beginTime))[-1:]
+        values = [self._smooth(code_list[0], "edb", day, 3.0, 0.15) for day in days]
+        return WindData(codes=code_list, fields=["CLOSE"], times=days, data=[values])
+
+    # ========== 内部 ==========
+
+    def _wait(self, codes):
+        """模拟网络和服务端耗时"""
+        with self._lock:
+            self.calls += 1
+            jitter = self._random.uniform(0.7, 1.5)
+        seconds = (self.latency + self.latency_per_code * codes) * jitter
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def _inject_error(self):
+        if self.error_rate <= 0:
+            return None
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+            code = self._random.choice(list(SIMULATED_ERRORS))
+        if not failed:
+            return None
+        return WindData(error_code=code, data=[SIMULATED_ERRORS[code]])
+
+    @staticmethod
+    def _trade_days(begin, end):
+        days, current = [], begin
+        while current <= end:
+            if current.weekday() < 5:
+                days.append(current)
+            current += timedelta(days=1)
+        return days
+
+    @staticmethod
+    def _smooth(code, field, day, level, amplitude):
+        """按代码和字段固定参数的平滑序列，叠加按日期固定的小噪声"""
+        rng = random.Random(_seed(code, field))
+        p1, p2 = rng.uniform(120, 400), rng.uniform(20, 60)
+        f1, f2 = rng.uniform(0, 2 * math.pi), rng.uniform(0, 2 * math.pi)
+        t = day.toordinal()
+        noise = random.Random(_seed(code, field, t)).gauss(0, 0.1)
+        return level * (1 + amplitude * math.sin(t / p1 + f1) + amplitude / 3 * math.sin(t / p2 + f2) + amplitude / 10 * noise)
+
+    def _series_value(self, code, field, day, options):
+        """wsd 单个字段的取值"""
+        if day.weekday() >= 5:
+            return None
+        name = field.lower()
+        if name == "close":
+            level = {config.WIND_INDEX_CODE: 4500, config.WIND_EQUITY_FUND_CODE: 9000,
+                     config.WIND_BOND_FUND_CODE: 3000}.get(code, 100)
+            return round(self._smooth(code, name, day, level, 0.2), 2)
+        if name == "free_turn_n":
+            return round(self._smooth(code, name, day, 1.6, 0.4), 4)
+        if name == "val_dividendyield3":
+            return round(self._smooth(code, name, day, 2.0, 0.2), 4)
+        if name == "pe_ttm":
+            return round(self._smooth(code, name, day, 17, 0.25), 4)
+        if name == "rsi":
+            return round(self._smooth(code, name, day, 50, 0.4), 4)
+        return round(self._smooth(code, name, day, 100, 0.1), 4)
+
+    def _stock_series(self, codes, field, days, options):
+        """多只股票的收盘价或均线日序列（取值与 wss 逐日查询一致）：Data[代码][日期]"""
+        window = int(options.get("ma_n", 20))
+        position = 1 if field.lower() == "ma" else 0
+        params = self._stock_params(codes)
+        columns = [self._stock_close_and_ma(codes, day, window, params)[position] for day in days]
+        return [list(values) for values in zip(*columns)] if columns else [[] for _ in codes]
+
+    def _stock_universe(self):
+        """A股代码（沪市6开头、深市0/3开头）"""
+        if self._universe is None:
+            rng = random.Random(_seed("universe", self.universe_size))
+            sh = [f"{c}.SH" for c in sorted(rng.sample(range(600000, 606000), self.universe_size // 2))]
+            sz = [f"{c:06d}.SZ" for c in sorted(rng.sample(list(range(1, 3000)) + list(range(300001, 301500)),
+                                                          self.universe_size - self.universe_size // 2))]
+            self._universe = sh + sz
+        return self._universe
+
+    @staticmethod
+    def _stock_params(codes):
+        """个股价格序列的固定参数（基准价、周期、相位、振幅）"""
+        return np.array([
+            [r.uniform(5, 80), r.uniform(40, 200), r.uniform(0, 2 * math.pi), r.uniform(0.05, 0.3)]
+            for r in (random.Random(_seed(code, "stock")) for code in codes)
+        ])
+
+    def _stock_close_and_ma(self, codes, day, window, params=None):
+        """个股收盘价和 window 日均线（向量化计算）"""
+        window = max(1, min(window, MA_WINDOW_MAX))
+        days = self._trade_days(day - timedelta(days=window * 2 + 10), day)[-window:]
+        t = np.array([d.toordinal() for d in days], dtype=float)
+
+        if params is None:
+            params = self._stock_params(codes)
+        base, period, phase, amplitude = params.T
+        prices = base[:, None] * (1 + amplitude[:, None] * np.sin(t[None, :] / period[:, None] + phase[:, None]))
+        closes = np.round(prices[:, -1], 2)
+        mas = prices.mean(axis=1)
+        # 约0.5%的股票停牌，返回NaN（与Wind一致）
+        suspended = np.array([_seed(code, day.date()) % 200 == 0 for code in codes])
+        closes = np.where(suspended, np.nan, closes)
+        return closes.tolist(), np.where(suspended, np.nan, mas).tolist()
+
+
+def load_wind_api():
+    """
+    按 config.WIND_BACKEND 加载Wind接口
+
+    Returns:
+        WindPy 的 w 对象，或模拟器
+
+    Raises:
+        ImportError: 使用 windpy 但未安装 WindPy
+    """
+    if config.WIND_BACKEND == "simulator":
+        return w
+    from WindPy import w as windpy
+    return windpy
+
+
+# 全局模拟器实例（参数见 config.py）
+w = WindSimulator(
+    latency=config.WIND_SIM_LATENCY,
+    latency_per_code=config.WIND_SIM_LATENCY_PER_CODE,
+    error_rate=config.WIND_SIM_ERROR_RATE,
+    universe=config.WIND_SIM_UNIVERSE,
+    seed=config.WIND_SIM_SEED,
+)
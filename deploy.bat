@@ -48,7 +48,8 @@ echo # 4. 重启Nginx
 echo sudo systemctl reload nginx
 echo.
 echo # 5. 验证GZIP
-echo curl -H "Accept-Encoding: gzip" -I http://110.40.129.184/static_data.json ^| grep -i content-encoding
+echo curl -s http://110.40.129.184/snapshot/manifest.json
+echo curl -H "Accept-Encoding: gzip" -I http://110.40.129.184/snapshot/^<分片文件名^> ^| grep -i content-encoding
 echo.
 echo ======================================================================
 echo 详细说明请查看: docs\NGINX_DEPLOY_GUIDE.md
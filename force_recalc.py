@@ -37,7 +37,7 @@ try:
     
     print("=" * 60)
     print("✅ 公式重算完成并已保存！")
-    print("现在可以重新运行自动更新来生成正确的 static_data.json")
+    print("现在可以重新运行自动更新来生成正确的静态快照（public/snapshot/）")
     print("=" * 60)
     
 except Exception as e:
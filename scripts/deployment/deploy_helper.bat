@@ -53,7 +53,7 @@ echo chmod +x /tmp/server_deploy.sh ^&^& /tmp/server_deploy.sh
 echo.
 echo 或者使用一键命令:
 echo.
-echo sudo cp /etc/nginx/conf.d/my_site.conf /etc/nginx/conf.d/my_site.conf.backup.$(date +%%Y%%m%%d_%%H%%M%%S) ^&^& sudo cp /tmp/nginx.conf /etc/nginx/conf.d/my_site.conf ^&^& sudo nginx -t ^&^& sudo systemctl reload nginx ^&^& curl -H "Accept-Encoding: gzip" -I http://110.40.129.184/static_data.json ^| grep -i content-encoding
+echo sudo cp /etc/nginx/conf.d/my_site.conf /etc/nginx/conf.d/my_site.conf.backup.$(date +%%Y%%m%%d_%%H%%M%%S) ^&^& sudo cp /tmp/nginx.conf /etc/nginx/conf.d/my_site.conf ^&^& sudo nginx -t ^&^& sudo systemctl reload nginx ^&^& curl -sI http://110.40.129.184/snapshot/manifest.json ^| grep -i cache-control
 echo.
 echo ======================================================================
 echo 📚 详细文档: QUICK_DEPLOY.md
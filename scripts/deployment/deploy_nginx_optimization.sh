@@ -61,14 +61,17 @@ echo -e "${GREEN}✓ 部署完成！${NC}"
 echo "=================================="
 echo ""
 echo "验证GZIP是否生效："
-echo "curl -H \"Accept-Encoding: gzip\" -I http://110.40.129.184/static_data.json | grep -i content-encoding"
+echo "curl -s http://110.40.129.184/snapshot/manifest.json   # 查看当前分片文件名"
+echo "curl -H \"Accept-Encoding: gzip\" -I http://110.40.129.184/snapshot/<分片文件名> | grep -i content-encoding"
 echo ""
 echo "预期看到：Content-Encoding: gzip"
 echo ""
 
 # 自动验证
 echo "正在验证..."
-GZIP_CHECK=$(curl -H "Accept-Encoding: gzip" -I http://110.40.129.184/static_data.json 2>/dev/null | grep -i "content-encoding: gzip")
+# 快照分片的文件名带内容哈希，从清单中取当前的 BOCIASI 分片（清单本身小于 gzip_min_length，不压缩）
+SHARD_URL="http://110.40.129.184/snapshot/$(curl -s http://110.40.129.184/snapshot/manifest.json | grep -o 'bociasi\.[0-9a-f]*\.json' | head -1)"
+GZIP_CHECK=$(curl -H "Accept-Encoding: gzip" -I "$SHARD_URL" 2>/dev/null | grep -i "content-encoding: gzip")
 if [ ! -z "$GZIP_CHECK" ]; then
     echo -e "${GREEN}✓ GZIP压缩已成功启用！${NC}"
 else
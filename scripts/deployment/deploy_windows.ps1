@@ -51,7 +51,8 @@ Write-Host "# 4. 重启Nginx" -ForegroundColor Gray
 Write-Host "sudo systemctl reload nginx" -ForegroundColor White
 Write-Host ""
 Write-Host "# 5. 验证GZIP" -ForegroundColor Gray
-Write-Host "curl -H 'Accept-Encoding: gzip' -I http://110.40.129.184/static_data.json | grep -i content-encoding" -ForegroundColor White
+Write-Host "curl -s http://110.40.129.184/snapshot/manifest.json   # 查看当前分片文件名" -ForegroundColor White
+Write-Host "curl -H 'Accept-Encoding: gzip' -I http://110.40.129.184/snapshot/<分片文件名> | grep -i content-encoding" -ForegroundColor White
 Write-Host ""
 
 Write-Host "=" -NoNewline -ForegroundColor Cyan
@@ -69,7 +69,9 @@ echo "✓ 步骤 5/5: 验证GZIP压缩..."
 sleep 2  # 等待Nginx完全启动
 
 # 检查GZIP
-GZIP_CHECK=$(curl -H "Accept-Encoding: gzip" -I http://110.40.129.184/static_data.json 2>/dev/null | grep -i "content-encoding: gzip")
+# 快照分片的文件名带内容哈希，从清单中取当前的 BOCIASI 分片（清单本身小于 gzip_min_length，不压缩）
+SHARD_URL="http://110.40.129.184/snapshot/$(curl -s http://110.40.129.184/snapshot/manifest.json | grep -o 'bociasi\.[0-9a-f]*\.json' | head -1)"
+GZIP_CHECK=$(curl -H "Accept-Encoding: gzip" -I "$SHARD_URL" 2>/dev/null | grep -i "content-encoding: gzip")
 
 if [ ! -z "$GZIP_CHECK" ]; then
     echo "✓ GZIP压缩已成功启用！"
@@ -82,10 +84,10 @@ echo ""
 # 显示文件大小对比
 echo "📊 文件大小对比..."
 echo "不压缩："
-curl -o /dev/null -s -w 'Size: %{size_download} bytes (%.2f MB)\n' http://110.40.129.184/static_data.json | awk '{printf "%s %.2f MB\n", $1, $3/1024/1024}'
+curl -o /dev/null -s -w 'Size: %{size_download} bytes (%.2f MB)\n' "$SHARD_URL" | awk '{printf "%s %.2f MB\n", $1, $3/1024/1024}'
 
 echo "GZIP压缩后："
-curl -H "Accept-Encoding: gzip" -o /dev/null -s -w 'Size: %{size_download} bytes (%.2f MB)\n' http://110.40.129.184/static_data.json | awk '{printf "%s %.2f MB\n", $1, $3/1024/1024}'
+curl -H "Accept-Encoding: gzip" -o /dev/null -s -w 'Size: %{size_download} bytes (%.2f MB)\n' "$SHARD_URL" | awk '{printf "%s %.2f MB\n", $1, $3/1024/1024}'
 echo ""
 
 echo "========================================================================"
@@ -100,6 +102,6 @@ echo ""
 echo "🌐 验证方法："
 echo "  1. 访问: http://110.40.129.184/"
 echo "  2. 打开开发者工具 (F12) -> Network"
-echo "  3. 刷新页面，查看 static_data.json 大小"
-echo "  4. 应该显示约 2-3MB（而不是25.88MB）"
+echo "  3. 刷新页面，查看 snapshot/manifest.json 和分片（bociasi.<哈希>.json 等）"
+echo "  4. 分片应为 gzip 压缩后的大小，再次刷新时从浏览器缓存读取"
 echo ""
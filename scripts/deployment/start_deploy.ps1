@@ -55,7 +55,7 @@ Write-Host "====================================================================
 Write-Host "或者使用一键部署命令 (在服务器上直接执行):" -ForegroundColor Cyan
 Write-Host "======================================================================" -ForegroundColor Cyan
 Write-Host ""
-Write-Host "sudo cp /etc/nginx/conf.d/my_site.conf /etc/nginx/conf.d/my_site.conf.backup.`$(date +%Y%m%d_%H%M%S) && sudo cp /tmp/nginx.conf /etc/nginx/conf.d/my_site.conf && sudo nginx -t && sudo systemctl reload nginx && echo '✓ 部署完成！' && curl -H 'Accept-Encoding: gzip' -I http://110.40.129.184/static_data.json | grep -i content-encoding" -ForegroundColor White
+Write-Host "sudo cp /etc/nginx/conf.d/my_site.conf /etc/nginx/conf.d/my_site.conf.backup.`$(date +%Y%m%d_%H%M%S) && sudo cp /tmp/nginx.conf /etc/nginx/conf.d/my_site.conf && sudo nginx -t && sudo systemctl reload nginx && echo '✓ 部署完成！' && curl -sI http://110.40.129.184/snapshot/manifest.json | grep -i cache-control" -ForegroundColor White
 Write-Host ""
 
 # 清理临时文件
@@ -1,8 +1,16 @@
-import json
-from datetime import datetime
+import os
+import sys
 
-with open(r'public\static_data.json', encoding='utf-8') as f:
-    data = json.load(f)
+sys.path.insert(0, os.path.join(os.getcwd(), 'backend'))
+import static_snapshot
+
+manifest = static_snapshot.load_manifest()
+data = {
+    'generated_at': manifest['generated_at'],
+    'bociasi': {'overview': static_snapshot.expand_bociasi_indicator(
+        static_snapshot.read_shard(static_snapshot.BOCIASI_SHARD, manifest), 'overview')},
+    'wind_2x_erp': static_snapshot.read_shard(static_snapshot.WIND2X_SHARD, manifest),
+}
 
 print("=" * 60)
 print("📊 数据完整性报告")
@@ -1,22 +1,23 @@
-from openpyxl import load_workbook
+import os
 import sys
 
+# 加入 backend 目录到 path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backend'))
+
+from excel_handler import ExcelHandler
+
 file_path = r'C:\Users\xuyaa\Desktop\BOCIASIV2.xlsx'
 sheet_name = 'A'
 
 try:
-    wb = load_workbook(file_path)
-    ws = wb[sheet_name]
-    
-    last_row = ws.max_row
-    date_val = ws.cell(row=last_row, column=1).value
+    handler = ExcelHandler(file_path, sheet_name)
+    date_val = handler.get_last_date()
     
-    print(f"Last row: {last_row}, Date: {date_val}")
+    print(f"Last row: {handler.get_next_row_number() - 1}, Date: {date_val}")
     
     # Check if date is 2026-01-27 (or match string)
     if str(date_val).startswith('2026-01-27'):
-        ws.delete_rows(last_row)
-        wb.save(file_path)
+        handler.truncate_from('2026-01-27')
         print("Successfully deleted the incomplete row for 2026-01-27")
     else:
         print("Last row is not today, skipping deletion.")
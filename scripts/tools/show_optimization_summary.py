@@ -5,14 +5,20 @@ print("📊 性能优化总结报告")
 print("=" * 70)
 print()
 
-# 读取数据文件信息
+# 读取快照清单（public/snapshot/manifest.json），统计各分片的大小（基础文件 + 增量）
 import os
-json_path = r'public\static_data.json'
-if os.path.exists(json_path):
-    size_mb = os.path.getsize(json_path) / (1024 * 1024)
-    print(f"📦 数据文件大小: {size_mb:.2f} MB")
+manifest_path = os.path.join('public', 'snapshot', 'manifest.json')
+size_mb = 0.0
+if os.path.exists(manifest_path):
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    for key, entry in manifest.get('shards', {}).items():
+        shard_bytes = entry['bytes'] + (entry['delta']['bytes'] if entry.get('delta') else 0)
+        size_mb += shard_bytes / (1024 * 1024)
+        print(f"📦 分片 {key}: {entry['file']}  {shard_bytes / (1024 * 1024):.2f} MB  {entry.get('rows', 0)} 行")
+    print(f"📦 数据文件合计: {size_mb:.2f} MB（生成时间 {manifest.get('generated_at')}）")
 else:
-    print("⚠️  未找到数据文件")
+    print("⚠️  未找到快照清单")
     
 print()
 print("🎯 优化目标：解决图表加载慢的问题（经常需要几分钟）")
@@ -23,7 +29,7 @@ print("✅ 已实施的优化（前端 - 已自动生效）")
 print("=" * 70)
 print()
 print("1. 🔄 全局数据缓存")
-print("   - 整个应用只下载一次 static_data.json")
+print("   - 整个应用只下载一次快照清单和当前视图需要的分片")
 print("   - 防止多个组件重复下载")
 print("   - 效果：切换标签时<100ms（从内存读取）")
 print()
@@ -94,14 +100,15 @@ print("=" * 70)
 print()
 print("1. 打开浏览器控制台（F12）")
 print("2. 刷新页面，应该看到：")
-print("   '📥 开始下载静态数据文件 (25MB)...'")
-print("   '✓ 静态数据加载完成，耗时 X.XX 秒'")
+print("   '📥 加载快照分片: bociasi.<哈希>.json'")
+print("   '✓ 分片加载完成，耗时 X.XX 秒'")
 print()
 print("3. 切换标签，应该看到：")
 print("   '✓ 使用缓存数据: overview'")
 print()
 print("4. 如果部署了GZIP，检查压缩：")
-print("   curl -H 'Accept-Encoding: gzip' -I http://110.40.129.184/static_data.json")
+print("   curl -s http://110.40.129.184/snapshot/manifest.json   # 查看当前分片文件名")
+print("   curl -H 'Accept-Encoding: gzip' -I http://110.40.129.184/snapshot/<分片文件名>")
 print("   应该看到: Content-Encoding: gzip")
 print()
 
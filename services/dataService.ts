@@ -14,6 +14,23 @@ export interface IndicatorData {
     last_update: string;
 }
 
+export interface BatchIndicator {
+    indicator_id: string;
+    indicator_name: string;
+    value_column: string;
+    metrics: IndicatorMetrics;
+    last_update: string;
+}
+
+/**
+ * BOCIASI 批量响应：所有子指标共享同一张底表和日期轴
+ */
+export interface IndicatorBatch {
+    columns: string[];
+    indicators: Record<string, BatchIndicator>;
+    data_points: Record<string, string | number>[];
+}
+
 export interface IndicatorInfo {
     id: string;
     name: string;
@@ -33,6 +50,9 @@ export interface ModuleInfo {
  * 数据服务类
  */
 export class DataService {
+    // 进行中的批量请求（同一日期范围的并发调用共用一次请求）
+    private batchRequests = new Map<string, Promise<IndicatorBatch>>();
+
     /**
      * 获取所有模块列表
      */
@@ -50,16 +70,66 @@ export class DataService {
 
     /**
      * 获取BOCIASI指标数据
+     * 通过批量接口获取，仪表盘同时加载多个子指标时只发一次请求
      */
     async getBOCIASIIndicatorData(
         indicatorId: string,
         startDate?: string,
         endDate?: string
     ): Promise<IndicatorData> {
-        return apiClient.get<IndicatorData>(`/bociasi/${indicatorId}/data`, {
+        const batch = await this.getBOCIASIBatch(undefined, startDate, endDate);
+        const data = this.expandBOCIASIBatch(batch, indicatorId);
+        if (!data) {
+            throw new Error(`指标不存在: ${indicatorId}`);
+        }
+        return data;
+    }
+
+    /**
+     * 批量获取BOCIASI子指标数据（ids 为空时返回全部子指标）
+     */
+    async getBOCIASIBatch(ids?: string[], startDate?: string, endDate?: string): Promise<IndicatorBatch> {
+        const idList = ids && ids.length ? ids.join(',') : undefined;
+        const key = `${idList ?? ''}|${startDate ?? ''}|${endDate ?? ''}`;
+        const pending = this.batchRequests.get(key);
+        if (pending) {
+            return pending;
+        }
+
+        const request = apiClient.get<IndicatorBatch>('/bociasi/data', {
+            ids: idList,
             start_date: startDate,
             end_date: endDate,
+        }).finally(() => this.batchRequests.delete(key));
+        this.batchRequests.set(key, request);
+        return request;
+    }
+
+    /**
+     * 从批量响应还原单个子指标：value 取自该子指标对应的列
+     */
+    expandBOCIASIBatch(batch: IndicatorBatch, indicatorId: string): IndicatorData | null {
+        const info = batch.indicators[indicatorId];
+        if (!info) {
+            return null;
+        }
+
+        const dataPoints = batch.data_points.map((row) => {
+            const point: Record<string, any> = { date: row.date };
+            for (const column of batch.columns) {
+                point[column] = row[column] ?? null;
+            }
+            point.value = row[info.value_column] ?? 0;
+            return point as DataPoint;
         });
+
+        return {
+            indicator_id: info.indicator_id,
+            indicator_name: info.indicator_name,
+            data_points: dataPoints,
+            metrics: info.metrics,
+            last_update: info.last_update,
+        };
     }
 
     /**
@@ -6,13 +6,15 @@ const LOCAL_WIND_BRIDGE_URL = 'http://110.40.129.184:8000/api';
 export class WindDataService {
   private static _cache: Map<string, { data: any[], metrics: IndicatorMetrics, timestamp: number }> = new Map();
   private static CACHE_TTL = 1000 * 60 * 30; // 延长到30分钟前端缓存（减少重复加载）
-  private static _staticDataCache: any = null; // 全局静态数据缓存
-  private static _staticDataPromise: Promise<any> | null = null; // 防止重复下载
+  private static _staticDataCache: any = null; // 快照清单缓存
+  private static _staticDataPromise: Promise<any> | null = null; // 防止重复下载清单
+  private static _shardPromises: Map<string, Promise<any>> = new Map(); // 分片只下载、解析一次
 
   public static clearCache() {
     this._cache.clear();
     this._staticDataCache = null;
     this._staticDataPromise = null;
+    this._shardPromises.clear();
   }
 
   public static async getIndicatorData(tab: SubTab | string): Promise<{ data: any[], metrics: IndicatorMetrics }> {
@@ -133,55 +135,35 @@ export class WindDataService {
   }
 
   /**
-   * 优化的静态数据加载 - 使用单例模式避免重复下载
+   * 快照目录URL（public/snapshot）
    */
-  private static async loadFullStaticData(): Promise<any> {
-    // 如果已经有缓存，直接返回
+  private static snapshotUrl(file: string): string {
+    const baseUrl = import.meta.env.BASE_URL;
+    return `${baseUrl}snapshot/${file}`.replace('//', '/');
+  }
+
+  /**
+   * 加载快照清单 - 清单很小，每次都向服务器校验；使用单例避免重复下载
+   */
+  private static async loadManifest(): Promise<any> {
     if (this._staticDataCache) {
-      console.log("✓ 使用全局静态数据缓存");
       return this._staticDataCache;
     }
-
-    // 如果正在下载中，返回同一个Promise（避免重复下载）
     if (this._staticDataPromise) {
-      console.log("⏳ 等待静态数据下载完成...");
       return this._staticDataPromise;
     }
 
-    // 开始下载
-    console.log("📥 开始下载静态数据文件 (25MB)...");
-    const startTime = performance.now();
-
     this._staticDataPromise = (async () => {
       try {
-        const baseUrl = import.meta.env.BASE_URL;
-        // 添加时间戳参数绕过浏览器缓存
-        const timestamp = new Date().getTime();
-        const jsonPath = `${baseUrl}static_data.json?v=${timestamp}`.replace('//', '/');
-
-        const response = await fetch(jsonPath, {
-          headers: {
-            'Accept-Encoding': 'gzip, deflate, br' // 请求压缩
-          },
-          cache: 'no-cache' // 不使用浏览器缓存，每次都检查更新
-        });
-
+        const response = await fetch(this.snapshotUrl('manifest.json'), { cache: 'no-cache' });
         if (!response.ok) {
-          throw new Error('Static data not found');
+          throw new Error('Static snapshot manifest not found');
         }
-
-        const fullData = await response.json();
-
-        const endTime = performance.now();
-        const loadTime = ((endTime - startTime) / 1000).toFixed(2);
-        console.log(`✓ 静态数据加载完成，耗时 ${loadTime} 秒`);
-
-        // 缓存到内存
-        this._staticDataCache = fullData;
-        return fullData;
-
+        const manifest = await response.json();
+        this._staticDataCache = manifest;
+        return manifest;
       } catch (e) {
-        console.error("❌ 静态数据加载失败", e);
+        console.error("❌ 快照清单加载失败", e);
         this._staticDataPromise = null; // 失败后清空，允许重试
         throw e;
       }
@@ -190,38 +172,106 @@ export class WindDataService {
     return this._staticDataPromise;
   }
 
-  private static async getStaticData(indicatorKey: string): Promise<{ data: any[], metrics: IndicatorMetrics }> {
-    try {
-      // 使用优化的加载函数
-      const fullData = await this.loadFullStaticData();
+  /**
+   * 下载快照目录中的一个文件（文件名带内容哈希，内容不变时直接命中浏览器缓存）
+   */
+  private static async fetchSnapshotFile(file: string): Promise<any> {
+    const response = await fetch(this.snapshotUrl(file));
+    if (!response.ok) {
+      throw new Error(`Snapshot file not found: ${file}`);
+    }
+    return response.json();
+  }
 
-      // 如果是 Wind 2X ERP
-      if (indicatorKey === 'erp_2x') {
-        const erpData = fullData.wind_2x_erp;
-        if (!erpData) return { data: [], metrics: null as any };
+  /**
+   * 把增量应用到基础分片上：按日期覆盖/追加行，并替换统计指标等字段
+   */
+  private static applyDelta(base: any, delta: any): any {
+    const merged = new Map<string, any>();
+    for (const row of base.data_points || []) {
+      merged.set(row.date, row);
+    }
+    for (const row of delta.rows || []) {
+      merged.set(row.date, row);
+    }
+    const dates = Array.from(merged.keys()).sort();
+    return {
+      ...base,
+      ...(delta.fields || {}),
+      data_points: dates.map(date => merged.get(date)),
+    };
+  }
 
-        const dataPoints = erpData.data_points || [];
-        dataPoints.sort((a: any, b: any) => new Date(b.date).getTime() - new Date(a.date).getTime());
+  /**
+   * 按需加载单个分片
+   * 基础文件长期不变（浏览器已缓存），每天只需下载很小的增量文件
+   */
+  private static loadShard(shardKey: string): Promise<any> {
+    let promise = this._shardPromises.get(shardKey);
+    if (!promise) {
+      promise = this.downloadShard(shardKey).catch(e => {
+        this._shardPromises.delete(shardKey); // 失败后允许重试
+        throw e;
+      });
+      this._shardPromises.set(shardKey, promise);
+    }
+    return promise;
+  }
 
-        const result = {
-          data: dataPoints,
-          metrics: erpData.metrics
-        };
+  private static async downloadShard(shardKey: string): Promise<any> {
+    const manifest = await this.loadManifest();
+    const shard = manifest.shards?.[shardKey];
+    if (!shard) {
+      return null;
+    }
 
-        // 缓存结果
-        this._cache.set(indicatorKey, { ...result, timestamp: Date.now() });
-        return result;
+    console.log(`📥 加载快照分片: ${shard.file}${shard.delta ? ` + ${shard.delta.file}` : ''}`);
+    const startTime = performance.now();
+    const [base, delta] = await Promise.all([
+      this.fetchSnapshotFile(shard.file),
+      shard.delta ? this.fetchSnapshotFile(shard.delta.file) : Promise.resolve(null),
+    ]);
+    const data = delta ? this.applyDelta(base, delta) : base;
+    console.log(`✓ 分片加载完成，耗时 ${((performance.now() - startTime) / 1000).toFixed(2)} 秒`);
+    return data;
+  }
+
+  /**
+   * 从 BOCIASI 分片还原单个子指标：底表所有子指标共享，value 取自该子指标对应的列
+   */
+  private static expandBociasiIndicator(shard: any, indicatorKey: string): any {
+    const info = shard?.indicators?.[indicatorKey];
+    if (!info) {
+      return null;
+    }
+
+    const columns: string[] = shard.columns || [];
+    const dataPoints = (shard.data_points || []).map((row: any) => {
+      const point: any = { date: row.date };
+      for (const column of columns) {
+        point[column] = row[column] ?? null;
       }
+      point.value = row[info.value_column] ?? 0;
+      return point;
+    });
+
+    return { ...info, data_points: dataPoints };
+  }
 
-      // 如果是 BOCIASI
-      const bociasiData = fullData.bociasi?.[indicatorKey];
-      if (bociasiData) {
-        const dataPoints = bociasiData.data_points || [];
+  private static async getStaticData(indicatorKey: string): Promise<{ data: any[], metrics: IndicatorMetrics }> {
+    try {
+      // Wind 2X ERP 单独一个分片；BOCIASI 所有子指标共享一个分片
+      const shardData = indicatorKey === 'erp_2x'
+        ? await this.loadShard('wind_2x_erp')
+        : this.expandBociasiIndicator(await this.loadShard('bociasi'), indicatorKey);
+
+      if (shardData) {
+        const dataPoints = shardData.data_points || [];
         dataPoints.sort((a: any, b: any) => new Date(b.date).getTime() - new Date(a.date).getTime());
 
         const result = {
           data: dataPoints,
-          metrics: bociasiData.metrics
+          metrics: shardData.metrics
         };
 
         // 缓存结果
@@ -229,6 +279,10 @@ export class WindDataService {
         return result;
       }
 
+      if (indicatorKey === 'erp_2x') {
+        return { data: [], metrics: null as any };
+      }
+
     } catch (e) {
       console.warn("Failed to load static snapshot", e);
     }
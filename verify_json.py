@@ -1,10 +1,21 @@
-import json
+import os
+import sys
 
-with open(r'public/static_data.json', encoding='utf-8') as f:
-    data = json.load(f)
+# 加入 backend 目录到 path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+import static_snapshot
+
+snapshot_dir = os.path.join('public', 'snapshot')
+manifest = static_snapshot.load_manifest(snapshot_dir)
+if manifest is None:
+    sys.exit(f"未找到快照清单: {os.path.join(snapshot_dir, static_snapshot.MANIFEST_NAME)}")
+
+# 基础文件 + 增量还原后的 BOCIASI 分片
+shard = static_snapshot.read_shard(static_snapshot.BOCIASI_SHARD, manifest, snapshot_dir)
 
 # 检查 fast_line
-fast = data['bociasi'].get('fast_line', {})
+fast = static_snapshot.expand_bociasi_indicator(shard, 'fast_line') or {}
 pts = fast.get('data_points', [])
 pts_sorted = sorted(pts, key=lambda x: x['date'])
 
@@ -15,7 +26,7 @@ for p in pts_sorted[-5:]:
 
 print()
 # 检查 slow_line
-slow = data['bociasi'].get('slow_line', {})
+slow = static_snapshot.expand_bociasi_indicator(shard, 'slow_line') or {}
 slow_pts = sorted(slow.get('data_points', []), key=lambda x: x['date'])
 print(f"slow_line total points: {len(slow_pts)}")
 print("Last 5:")
@@ -23,4 +34,4 @@ for p in slow_pts[-5:]:
     print(f"  {p['date']}: value={p.get('value')}")
     
 print()
-print(f"generated_at: {data.get('generated_at')}")
+print(f"generated_at: {manifest.get('generated_at')}")